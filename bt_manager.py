@@ -0,0 +1,312 @@
+"""Long-lived Bluetooth session.
+
+One ``bluetoothctl`` process is kept running for the life of the program
+instead of spawning a new one per action. A reader thread parses everything
+it prints. Property changes (``[CHG] Device ... Connected: yes``), new and
+removed devices, and agent prompts become events for listeners. Connect,
+pair and trust requests are queued and run one at a time, because
+bluetoothctl does not say which device a "Connection successful" line
+belongs to. Each call returns an ``Operation`` straight away that completes
+in the background.
+
+Failures are reported as structured ``bt_failure`` journal events and
+listener events, including incoming connections that drop within a few
+seconds. This replaces scraping ``journalctl`` for error lines.
+"""
+
+import queue
+import re
+import subprocess
+import threading
+import time
+from collections import deque
+
+import journal
+
+SESSION_COMMAND = ["bluetoothctl"]
+TIMEOUTS = {"connect": 20, "pair": 30, "trust": 5}
+# An incoming connection that drops sooner than this counts as a failure
+SHORT_CONNECTION = 5.0
+RECENT_LINES = 50
+
+ANSI_PATTERN = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]|[\x01\x02\r]")
+PROMPT_PATTERN = re.compile(r"^(?:\[[^\]\[]*\][#>] ?)+")
+CHG_PATTERN = re.compile(r"\[CHG\] Device ([0-9A-F:]{17}) (\w+): (.+)")
+DEVICE_PATTERN = re.compile(r"\[(NEW|DEL)\] Device ([0-9A-F:]{17}) ?(.*)")
+ADDRESS_PATTERN = re.compile(r"[0-9A-F]{2}(?::[0-9A-F]{2}){5}")
+
+# Lines that settle the operation in progress: (success, failure)
+RESULTS = {
+    "connect": (("Connection successful",), ("Failed to connect", "not available")),
+    "pair": (("Pairing successful", "AlreadyExists"), ("Failed to pair", "not available")),
+    "trust": (("trust succeeded",), ("trust failed", "not available")),
+}
+
+
+class Operation:
+    """A queued Bluetooth request that completes in the background."""
+
+    def __init__(self, kind, address, callback=None):
+        self.kind = kind
+        self.address = address
+        self.callback = callback
+        self.ok = None
+        self.error = None
+        self.lines = []
+        self.started = False
+        self.done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the operation finishes and return whether it succeeded."""
+        self.done.wait(timeout)
+        return self.ok
+
+    def details(self):
+        """Return the session output collected while the operation ran."""
+        return "\n".join(self.lines)
+
+    def _finish(self, ok, error=None, report=True):
+        if self.done.is_set():
+            return
+        self.ok = ok
+        self.error = error
+        self.done.set()
+        if self.kind == "connect" and not ok and self.address not in _connected_at:
+            # No disconnect will follow to clear it, so later drops count as incoming again
+            _requested.discard(self.address)
+        if not ok and report:
+            _failure(self.kind, self.address, error, self.details())
+        if self.callback:
+            try:
+                self.callback(self)
+            except Exception as e:
+                print(f"Bluetooth callback failed: {e}")
+
+
+_proc = None
+_proc_lock = threading.Lock()
+_queue = queue.Queue()
+_worker = None
+_current = None
+_listeners = []
+_recent = deque(maxlen=RECENT_LINES)
+_connected_at = {}
+_requested = set()
+_pairing_mode = False
+
+
+def add_listener(callback):
+    """Call ``callback(event)`` for device and connection events.
+
+    ``event`` is a dict with ``type`` (``connected``, ``disconnected``,
+    ``paired``, ``trusted``, ``added``, ``removed`` or ``failure``) and
+    ``address``. Failure events also carry ``op``, ``error`` and ``details``.
+    """
+    _listeners.append(callback)
+
+
+def remove_listener(callback):
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+
+def _emit(event):
+    for listener in list(_listeners):
+        try:
+            listener(event)
+        except Exception as e:
+            print(f"Bluetooth listener failed: {e}")
+
+
+def _failure(op, address, error, details):
+    journal.record("bt_failure", op=op, address=address, error=error)
+    _emit({"type": "failure", "op": op, "address": address, "error": error, "details": details})
+
+
+def _send(command):
+    with _proc_lock:
+        if _proc is None or _proc.poll() is not None:
+            _spawn()
+        _proc.stdin.write(command + "\n")
+        _proc.stdin.flush()
+
+
+def _spawn():
+    """Start bluetoothctl and its reader; callers hold ``_proc_lock``."""
+    global _proc
+    _proc = subprocess.Popen(
+        SESSION_COMMAND,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        errors="replace",
+        bufsize=1,
+    )
+    threading.Thread(target=_read, args=(_proc,), daemon=True).start()
+    # Answer pairing prompts ourselves; only confirmed while pairing is wanted
+    for command in ("power on", "agent NoInputNoOutput", "default-agent"):
+        _proc.stdin.write(command + "\n")
+    _proc.stdin.flush()
+
+
+def _read(proc):
+    for raw in proc.stdout:
+        line = PROMPT_PATTERN.sub("", ANSI_PATTERN.sub("", raw)).strip()
+        if line:
+            _recent.append(line)
+            try:
+                _handle_line(line)
+            except Exception as e:
+                print(f"Bluetooth session error: {e}")
+    op = _current
+    if op is not None:
+        op._finish(False, "bluetoothctl exited")
+
+
+def _handle_line(line):
+    op = _current
+    if op is not None:
+        # Output left over from the previous request must not settle this one,
+        # so results only count once bluetoothctl has echoed our address
+        if not op.started and op.address in line:
+            op.started = True
+        if op.started:
+            op.lines.append(line)
+
+    if "(yes/no)" in line:
+        # Passkey confirmation or service authorization from the agent. The
+        # prompt takes the next input line, so it is always answered: yes in
+        # pairing mode or for the pairing the user started, no otherwise.
+        # Prompts rarely name the device, so one naming another is refused.
+        named = ADDRESS_PATTERN.findall(line)
+        ours = (op is not None and op.kind == "pair" and op.started
+                and all(address == op.address for address in named))
+        _send("yes" if _pairing_mode or ours else "no")
+        return
+
+    m = CHG_PATTERN.search(line)
+    if m:
+        address, prop, value = m.groups()
+        _property_changed(address, prop, value.strip() == "yes")
+        if op is not None and address == op.address:
+            if (op.kind, prop) in (("connect", "Connected"), ("pair", "Paired"), ("trust", "Trusted")) and value == "yes":
+                op._finish(True)
+        return
+
+    m = DEVICE_PATTERN.search(line)
+    if m:
+        change, address, name = m.groups()
+        _emit({"type": "added" if change == "NEW" else "removed", "address": address, "name": name})
+        return
+
+    if op is not None and op.started:
+        successes, failures = RESULTS[op.kind]
+        if any(s in line for s in successes):
+            op._finish(True)
+        elif any(f in line for f in failures):
+            op._finish(False, line)
+
+
+def _property_changed(address, prop, yes):
+    if prop == "Connected":
+        if yes:
+            _connected_at[address] = time.monotonic()
+            _emit({"type": "connected", "address": address})
+        else:
+            started = _connected_at.pop(address, None)
+            _emit({"type": "disconnected", "address": address})
+            # Drops right after a connection we did not ask for are failed incoming attempts
+            if started is not None and address not in _requested and time.monotonic() - started < SHORT_CONNECTION:
+                held = time.monotonic() - started
+                _failure("incoming", address, f"disconnected after {held:.1f}s", "\n".join(_recent))
+            _requested.discard(address)
+        journal.record("bt", event="connected" if yes else "disconnected", address=address)
+    elif prop in ("Paired", "Trusted") and yes:
+        _emit({"type": prop.lower(), "address": address})
+        journal.record("bt", event=prop.lower(), address=address)
+
+
+def _work():
+    global _current
+    while True:
+        op = _queue.get()
+        _current = op
+        try:
+            _send(f"{op.kind} {op.address}")
+            if not op.done.wait(TIMEOUTS[op.kind]):
+                op._finish(False, f"{op.kind} timed out")
+        except OSError as e:
+            op._finish(False, str(e))
+        finally:
+            _current = None
+
+
+def start():
+    """Start the session and the request worker. Safe to call more than once."""
+    global _worker
+    if _worker is not None:
+        return
+    with _proc_lock:
+        _spawn()
+    _worker = threading.Thread(target=_work, daemon=True)
+    _worker.start()
+
+
+def _submit(kind, address, callback=None):
+    start()
+    op = Operation(kind, address, callback)
+    if kind == "connect":
+        _requested.add(address)
+    _queue.put(op)
+    return op
+
+
+def connect(address, callback=None):
+    """Connect to an already paired device."""
+    return _submit("connect", address, callback)
+
+
+def pair(address, callback=None):
+    """Pair with a device, confirming its passkey."""
+    return _submit("pair", address, callback)
+
+
+def trust(address, callback=None):
+    """Mark a device as trusted so it may reconnect on its own."""
+    return _submit("trust", address, callback)
+
+
+def pair_and_connect(address, callback=None):
+    """Pair, trust and connect in sequence; stops at the first step that fails."""
+    overall = Operation("pair_connect", address, callback)
+
+    def run():
+        for step in (pair, trust, connect):
+            op = step(address)
+            op.wait()
+            overall.lines.extend(op.lines)
+            if not op.ok:
+                # The step already reported its own failure
+                overall._finish(False, op.error, report=False)
+                return
+        overall._finish(True)
+
+    threading.Thread(target=run, daemon=True).start()
+    return overall
+
+
+def set_pairing_mode(on):
+    """Make the adapter discoverable and accept incoming pairing requests."""
+    global _pairing_mode
+    start()
+    _pairing_mode = on
+    state = "on" if on else "off"
+    _send(f"pairable {state}")
+    _send(f"discoverable {state}")
+
+
+def recent_output():
+    """Return the last lines printed by the session."""
+    return list(_recent)
+
@@ -0,0 +1,367 @@
+"""Index of Pico-8 carts with titles and label images.
+
+``rescan`` walks the carts directory and keeps one entry per cart in
+``cache/carts/index.json``, keyed by path and validated by size and mtime.
+Only new or changed carts are opened. For each one, the title and author
+come from the two comment lines at the top of its code. The 128x128 label
+is stored next to the index as raw RGB565 (see ``gallery_cache``):
+
+- ``.p8`` carts are text files. Their label is the ``__label__`` section.
+- ``.p8.png`` carts hide the cart data in the low two bits of each pixel.
+  The label is the picture drawn on the cartridge. The code is decompressed
+  only as far as the header comment.
+
+``entries`` answers from memory without touching the carts, so a list of
+hundreds of carts opens at once. ``refresh`` rescans in the background and
+then calls the listeners.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from PIL import Image
+
+import gallery_cache
+
+CARTS_DIR = os.environ.get("PICO8_CARTS", os.path.expanduser("~/.lexaloffle/pico-8/carts"))
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "carts")
+INDEX_PATH = os.path.join(CACHE_DIR, "index.json")
+EXTENSIONS = (".p8", ".p8.png")
+LABEL_SIZE = (128, 128)
+# Where the label sits on the 160x205 cartridge image
+PNG_LABEL_BOX = (16, 24, 144, 152)
+PNG_SIZE = (160, 205)
+CODE_OFFSET = 0x4300
+# Enough decompressed code for the header comment
+HEADER_BYTES = 512
+
+PALETTE = [
+    0x000000, 0x1D2B53, 0x7E2553, 0x008751, 0xAB5236, 0x5F574F, 0xC2C3C7, 0xFFF1E8,
+    0xFF004D, 0xFFA300, 0xFFEC27, 0x00E436, 0x29ADFF, 0x83769C, 0xFF77A8, 0xFFCCAA,
+    # Secret palette, written as g-v in __label__
+    0x291814, 0x111D35, 0x422136, 0x125359, 0x742F29, 0x49333B, 0xA28879, 0xF3EF7D,
+    0xBE1250, 0xFF6C24, 0xA8E72E, 0x00B543, 0x065AB5, 0x754665, 0xFF6E59, 0xFF9D81,
+]
+LABEL_DIGITS = "0123456789abcdefghijklmnopqrstuv"
+OLD_CODE_CHARS = "\n 0123456789abcdefghijklmnopqrstuvwxyz!#%(){}[]<>+=/*:;.,~_"
+
+_index = None
+_lock = threading.Lock()
+_scan_lock = threading.Lock()
+_listeners = []
+_scanning = False
+
+
+def add_listener(callback):
+    """Call ``callback()`` after a background rescan finishes."""
+    _listeners.append(callback)
+
+
+def is_scanning():
+    return _scanning
+
+
+def _label_file(path):
+    name = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, name + ".565")
+
+
+# --- Parsing ---
+
+def _header_comment(code):
+    """Return (title, author) from the ``--`` lines that open the code."""
+    found = []
+    for line in code.splitlines():
+        line = line.strip()
+        if not line.startswith("--"):
+            break
+        text = line.lstrip("-").strip()
+        if text:
+            found.append(text)
+        if len(found) == 2:
+            break
+    found += [None] * (2 - len(found))
+    return found[0], found[1]
+
+
+def _parse_p8(path):
+    with open(path, encoding="utf-8", errors="replace") as f:
+        text = f.read()
+    sections = {}
+    name = None
+    for line in text.splitlines():
+        if line.startswith("__") and line.endswith("__") and len(line) > 4:
+            name = line[2:-2]
+            sections[name] = []
+        elif name is not None:
+            sections[name].append(line)
+    title, author = _header_comment("\n".join(sections.get("lua", [])[:4]))
+    label = None
+    rows = sections.get("label")
+    if rows:
+        colours = [PALETTE[LABEL_DIGITS.find(ch) % len(PALETTE)] for row in rows[:128] for ch in row[:128].ljust(128, "0")]
+        colours += [0] * (128 * 128 - len(colours))
+        data = b"".join(c.to_bytes(3, "big") for c in colours)
+        label = Image.frombytes("RGB", LABEL_SIZE, data)
+    return title, author, label
+
+
+class _Bits:
+    """LSB-first bit reader over the compressed code."""
+
+    def __init__(self, data):
+        self.data = data
+        self.pos = 0
+
+    def bit(self):
+        byte = self.data[self.pos >> 3] if self.pos >> 3 < len(self.data) else 0
+        value = (byte >> (self.pos & 7)) & 1
+        self.pos += 1
+        return value
+
+    def bits(self, n):
+        value = 0
+        for i in range(n):
+            value |= self.bit() << i
+        return value
+
+
+def _decompress_pxa(data, limit):
+    """Decode the first ``limit`` bytes of PXA-compressed code (Pico-8 0.2+).
+
+    This header uses back references with 5-, 10- and 15-bit offsets:
+
+    >>> _decompress_pxa(b"\\0pxa\\0\\x19\\0\\x19\\xeb\\xc1\\xe2\\xcd'?\\x82G{9\\x80\\xa3_\\x82\\x04@\\x12", 512)
+    b'-- cat cat cat\\n-- by cat\\n'
+    """
+    length = min(int.from_bytes(data[4:6], "big"), limit)
+    reader = _Bits(data[8:])
+    mtf = list(range(256))
+    out = bytearray()
+    while len(out) < length:
+        if reader.bit():
+            # Literal: an index into a move-to-front table
+            width = 4
+            while reader.bit():
+                width += 1
+            index = reader.bits(width) + (1 << width) - 16
+            ch = mtf.pop(index)
+            mtf.insert(0, ch)
+            out.append(ch)
+            continue
+        # Back reference: 0 means a 15-bit offset, 1 then 1 or 0 means 5 or 10 bits
+        width = (5 if reader.bit() else 10) if reader.bit() else 15
+        offset = reader.bits(width) + 1
+        if width == 10 and offset == 1:
+            # Uncompressed run ending in a zero byte
+            while True:
+                ch = reader.bits(8)
+                if ch == 0:
+                    break
+                out.append(ch)
+            continue
+        count = 3
+        while True:
+            part = reader.bits(3)
+            count += part
+            if part != 7:
+                break
+        if offset > len(out):
+            raise ValueError("bad back reference")
+        for _ in range(count):
+            out.append(out[-offset])
+    return bytes(out[:limit])
+
+
+def _decompress_old(data, limit):
+    """Decode the first ``limit`` bytes of ``:c:`` compressed code (before 0.2)."""
+    length = min(int.from_bytes(data[4:6], "big"), limit)
+    out = bytearray()
+    pos = 8
+    while len(out) < length and pos < len(data):
+        b = data[pos]
+        pos += 1
+        if b == 0:
+            out.append(data[pos])
+            pos += 1
+        elif b <= len(OLD_CODE_CHARS):
+            out += OLD_CODE_CHARS[b - 1].encode()
+        else:
+            b2 = data[pos]
+            pos += 1
+            offset = (b - len(OLD_CODE_CHARS) - 1) * 16 + (b2 & 0x0F)
+            if offset == 0 or offset > len(out):
+                raise ValueError("bad back reference")
+            for _ in range((b2 >> 4) + 2):
+                out.append(out[-offset])
+    return bytes(out[:limit])
+
+
+def _png_code(img, limit=HEADER_BYTES):
+    """Return the start of the code hidden in a ``.p8.png`` cart."""
+    r, g, b, a = (band.tobytes() for band in img.split())
+    # Compressed code is at most a few KB for the header we want
+    end = min(len(r), CODE_OFFSET + 8 + limit * 4)
+    data = bytes(
+        ((a[i] & 3) << 6) | ((r[i] & 3) << 4) | ((g[i] & 3) << 2) | (b[i] & 3)
+        for i in range(CODE_OFFSET, end)
+    )
+    if data.startswith(b"\0pxa"):
+        code = _decompress_pxa(data, limit)
+    elif data.startswith(b":c:\0"):
+        code = _decompress_old(data, limit)
+    else:
+        code = data.split(b"\0", 1)[0]
+    return code.decode("latin-1")
+
+
+def _parse_png(path):
+    img = Image.open(path)
+    if img.size != PNG_SIZE:
+        raise ValueError(f"not a cart image: {img.size}")
+    img = img.convert("RGBA")
+    label = img.convert("RGB").crop(PNG_LABEL_BOX)
+    title, author = _header_comment(_png_code(img))
+    return title, author, label
+
+
+def parse(path):
+    """Return (title, author, label image or None) for one cart."""
+    if path.endswith(".p8.png"):
+        return _parse_png(path)
+    return _parse_p8(path)
+
+
+# --- Index ---
+
+def _display_name(path, carts_dir):
+    return os.path.relpath(path, carts_dir).rsplit(".p8", 1)[0]
+
+
+def _load():
+    """Read the saved index once; callers hold ``_lock``."""
+    global _index
+    if _index is None:
+        try:
+            with open(INDEX_PATH) as f:
+                _index = json.load(f)["carts"]
+        except (OSError, ValueError, KeyError):
+            _index = {}
+    return _index
+
+
+def _save(carts):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = INDEX_PATH + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"carts": carts}, f)
+        os.replace(tmp, INDEX_PATH)
+    except OSError as e:
+        print(f"Failed to save cart index: {e}")
+
+
+def _index_cart(path, st, carts_dir):
+    entry = {"path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+             "title": _display_name(path, carts_dir), "author": None, "label": False}
+    try:
+        title, author, label = parse(path)
+    except Exception as e:
+        print(f"Could not read cart {path}: {e}")
+        return entry
+    if title and title.isprintable():
+        entry["title"] = title[:40]
+    if author and author.isprintable():
+        entry["author"] = author[:40]
+    if label is not None:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(_label_file(path), "wb") as f:
+                f.write(gallery_cache.to_rgb565(label.resize(LABEL_SIZE)))
+            entry["label"] = True
+        except OSError as e:
+            print(f"Failed to cache cart label: {e}")
+    return entry
+
+
+def rescan(carts_dir=CARTS_DIR):
+    """Bring the index up to date with ``carts_dir``; returns how many carts were read."""
+    global _index
+    with _scan_lock:
+        with _lock:
+            old = dict(_load())
+        carts = {}
+        parsed = 0
+        for root, dirs, files in os.walk(carts_dir):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in files:
+                if not name.endswith(EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entry = old.get(path)
+                if entry is None or (entry["size"], entry["mtime_ns"]) != (st.st_size, st.st_mtime_ns):
+                    entry = _index_cart(path, st, carts_dir)
+                    parsed += 1
+                carts[path] = entry
+        for path in old.keys() - carts.keys():
+            try:
+                os.remove(_label_file(path))
+            except OSError:
+                pass
+        with _lock:
+            _index = carts
+        if parsed or old.keys() != carts.keys():
+            _save(carts)
+        return parsed
+
+
+def refresh(carts_dir=CARTS_DIR):
+    """Rescan on a background thread unless one is already running."""
+    global _scanning
+    with _lock:
+        if _scanning:
+            return
+        _scanning = True
+
+    def run():
+        global _scanning
+        try:
+            rescan(carts_dir)
+        except Exception as e:
+            print(f"Cart scan failed: {e}")
+        finally:
+            _scanning = False
+        for listener in list(_listeners):
+            try:
+                listener()
+            except Exception as e:
+                print(f"Cart index listener failed: {e}")
+
+    threading.Thread(target=run, daemon=True).start()
+
+
+def entries():
+    """Return indexed carts sorted by title, without scanning."""
+    with _lock:
+        carts = list(_load().values())
+    return sorted(carts, key=lambda e: (e["title"].lower(), e["path"]))
+
+
+def label(entry):
+    """Return the cart's 128x128 label, or None if it has none."""
+    if not entry.get("label"):
+        return None
+    try:
+        with open(_label_file(entry["path"]), "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if len(data) != LABEL_SIZE[0] * LABEL_SIZE[1] * 2:
+        return None
+    return gallery_cache.from_rgb565(data, LABEL_SIZE)
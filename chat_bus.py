@@ -0,0 +1,126 @@
+"""Chat history shared by the device screen, the web page and IRC.
+
+Every message goes through ``publish``. It lands in one bounded history,
+is appended to ``logs/chat.log`` and is pushed to every subscriber: the
+device's redraw hook and each open ``/chat`` WebSocket. ``post`` is what both
+UIs call to say something. It hands the text to the attached IRC client and
+publishes it under the client's current nick only if the client accepted it.
+
+The log is a rotating text file with one tab-separated line per message
+(time, kind, nick, text), so the last ``HISTORY`` lines can be read back
+cheaply after a restart. Only the process that called ``start`` writes to
+it; a standalone web server just reads the history back.
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import deque
+
+import log_sink
+
+CHAT_LOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "chat.log")
+HISTORY = 200
+
+_history = deque(maxlen=HISTORY)
+_seq = itertools.count(1)
+_lock = threading.Lock()
+_subscribers = []
+_sink = None
+_loaded = False
+_client = None
+
+
+def _load(path):
+    """Fill the history from the end of the log; callers hold ``_lock``."""
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    for line in log_sink.tail(path, HISTORY):
+        parts = line.split("\t", 3)
+        if len(parts) != 4:
+            continue
+        stamp, kind, nick, text = parts
+        try:
+            stamp = float(stamp)
+        except ValueError:
+            continue
+        _history.append({"seq": next(_seq), "time": stamp, "kind": kind, "nick": nick or None, "text": text})
+
+
+def start(path=CHAT_LOG_PATH):
+    """Load the saved history and keep appending new messages to ``path``."""
+    global _sink
+    with _lock:
+        _load(path)
+        if _sink is None:
+            _sink = log_sink.RotatingLog(path, max_bytes=128 * 1024, budget=1024 * 1024)
+
+
+def attach(client):
+    """Send posted messages through ``client.send(text)``, which returns True once queued.
+
+    Own messages are published under ``client.nick``, read at send time
+    because the client changes it when the server rejects a nick.
+    """
+    global _client
+    _client = client
+
+
+def subscribe(callback):
+    """Call ``callback(entry)`` for every new message."""
+    _subscribers.append(callback)
+
+
+def unsubscribe(callback):
+    if callback in _subscribers:
+        _subscribers.remove(callback)
+
+
+def publish(nick, text, kind="msg"):
+    """Add a message (or a ``status`` line when ``nick`` is None) and push it out."""
+    text = " ".join(text.split("\t")).replace("\n", " ")
+    with _lock:
+        _load(CHAT_LOG_PATH)
+        entry = {"seq": next(_seq), "time": time.time(), "kind": kind, "nick": nick, "text": text}
+        _history.append(entry)
+        if _sink is not None:
+            _sink.write(f"{entry['time']:.3f}\t{kind}\t{nick or ''}\t{text}\n")
+    for callback in list(_subscribers):
+        try:
+            callback(entry)
+        except Exception as e:
+            print(f"Chat subscriber failed: {e}")
+    return entry
+
+
+def status(text):
+    return publish(None, text, kind="status")
+
+
+def post(text):
+    """Send ``text`` to the channel; returns False if it could not be sent."""
+    text = text.strip()
+    if not text:
+        return False
+    if _client is None or not _client.send(text):
+        status(f"Not connected; message not sent: {text}")
+        return False
+    publish(_client.nick, text)
+    return True
+
+
+def history(since=0):
+    """Return messages newer than sequence number ``since``, oldest first."""
+    with _lock:
+        _load(CHAT_LOG_PATH)
+        return [e for e in _history if e["seq"] > since]
+
+
+def format_entry(entry):
+    """Return the one-line form used on the device screen."""
+    if entry["nick"]:
+        return f"{entry['nick']}> {entry['text']}"
+    return entry["text"]
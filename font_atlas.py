@@ -0,0 +1,164 @@
+"""Pre-rendered glyph atlases for the TrueType fonts used on the display.
+
+Every printable ASCII glyph of a (font, size) pair is rasterized once into an
+8-bit coverage strip. The strip is saved under ``cache/fonts`` and named by a
+hash of the font file contents and the size. ``text`` then blits glyphs from
+the strip instead of asking FreeType to render the string again. Coverage
+masks don't depend on color, so one atlas serves every color scheme. Strings
+with characters outside the atlas fall back to ``ImageDraw.text``.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+from PIL import Image, ImageDraw, ImageFont
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "fonts")
+CHARSET = "".join(chr(c) for c in range(32, 127))
+# Bump when the on-disk layout changes so stale atlases are rebuilt
+ATLAS_VERSION = 1
+
+_fonts = {}
+_atlases = {}
+_file_hashes = {}
+_lock = threading.Lock()
+
+
+class FontAtlas:
+    """Glyph masks and metrics for one font at one size."""
+
+    def __init__(self, strip, metrics):
+        self.advances = {}
+        self.glyphs = {}
+        for ch, (x, left, top, w, h, advance) in metrics.items():
+            self.advances[ch] = advance
+            if w and h:
+                self.glyphs[ch] = (left, top, strip.crop((x, 0, x + w, h)))
+
+    def covers(self, text):
+        return all(ch in self.advances for ch in text)
+
+    def getlength(self, text):
+        return sum(self.advances[ch] for ch in text)
+
+    def draw(self, draw, xy, text, fill):
+        """Blit ``text`` onto ``draw`` with its top-left at ``xy``."""
+        x, y = xy
+        pen = float(x)
+        for ch in text:
+            glyph = self.glyphs.get(ch)
+            if glyph:
+                left, top, mask = glyph
+                draw.bitmap((int(round(pen)) + left, y + top), mask, fill=fill)
+            pen += self.advances[ch]
+
+
+def _font_hash(path):
+    if path not in _file_hashes:
+        with open(path, "rb") as f:
+            _file_hashes[path] = hashlib.sha1(f.read()).hexdigest()
+    return _file_hashes[path]
+
+
+def atlas_key(path, size):
+    """Return the content hash that names the atlas for ``path`` at ``size``."""
+    text = f"{ATLAS_VERSION}\n{_font_hash(path)}\n{size}\n{CHARSET}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def render_atlas(font):
+    """Rasterize CHARSET into a single strip and return ``(strip, metrics)``."""
+    cells = []
+    width = height = 0
+    for ch in CHARSET:
+        left, top, right, bottom = font.getbbox(ch)
+        w, h = max(0, right - left), max(0, bottom - top)
+        cells.append((ch, left, top, w, h, font.getlength(ch)))
+        width += w
+        height = max(height, h)
+    strip = Image.new("L", (max(1, width), max(1, height)), 0)
+    draw = ImageDraw.Draw(strip)
+    metrics = {}
+    x = 0
+    for ch, left, top, w, h, advance in cells:
+        if w and h:
+            draw.text((x - left, -top), ch, font=font, fill=255)
+        metrics[ch] = [x, left, top, w, h, advance]
+        x += w
+    return strip, metrics
+
+
+def _load_or_build(font):
+    key = atlas_key(font.path, font.size)
+    png = os.path.join(CACHE_DIR, key + ".png")
+    meta = os.path.join(CACHE_DIR, key + ".json")
+    try:
+        with open(meta) as f:
+            metrics = json.load(f)
+        strip = Image.open(png)
+        strip.load()
+        return FontAtlas(strip, metrics)
+    except (OSError, ValueError):
+        pass
+    strip, metrics = render_atlas(font)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        strip.save(png + ".tmp", format="PNG")
+        with open(meta + ".tmp", "w") as f:
+            json.dump(metrics, f)
+        os.replace(png + ".tmp", png)
+        os.replace(meta + ".tmp", meta)
+    except OSError as e:
+        print(f"Failed to save font atlas: {e}")
+    return FontAtlas(strip, metrics)
+
+
+def get(font):
+    """Return the atlas for a TrueType font, or None for other font types."""
+    path = getattr(font, "path", None)
+    if not isinstance(path, str) or not hasattr(font, "size"):
+        return None
+    key = (path, font.size)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        with _lock:
+            atlas = _atlases.get(key)
+            if atlas is None:
+                try:
+                    atlas = _load_or_build(font)
+                except OSError as e:
+                    print(f"Font atlas unavailable for {path}: {e}")
+                    return None
+                _atlases[key] = atlas
+    return atlas
+
+
+def load_font(path, size):
+    """Return a cached ``ImageFont.truetype`` face so switching back is free."""
+    key = (path, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = ImageFont.truetype(path, size)
+        _fonts[key] = font
+    return font
+
+
+def text(draw, xy, text, font=None, fill=None):
+    """Drop-in for ``draw.text`` that blits from the font's atlas when it can."""
+    atlas = get(font) if font is not None else None
+    if atlas is None or "\n" in text or not atlas.covers(text):
+        draw.text(xy, text, font=font, fill=fill)
+        return
+    atlas.draw(draw, xy, text, fill)
+
+
+def prebuild(paths, sizes):
+    """Make sure an atlas exists on disk for every font path and size."""
+    for path in paths:
+        for size in sizes:
+            try:
+                get(load_font(path, size))
+            except OSError as e:
+                print(f"Skipping font atlas for {path} at {size}: {e}")
@@ -0,0 +1,123 @@
+"""Decode cache for the image gallery.
+
+Images are decoded and scaled once, then stored under ``cache/gallery`` as
+raw RGB565, the panel's native pixel format. Each cache file starts with the
+source file's mtime and size, and a mismatch means the source changed and the
+entry is rebuilt. Recently shown frames stay in a small in-memory LRU, and
+neighbours of the current image are prefetched on a background thread.
+"""
+
+import hashlib
+import os
+import queue
+import struct
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageChops
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "gallery")
+FULL_SIZE = (128, 128)
+MEMORY_ITEMS = 24
+# mtime_ns, size, width, height
+HEADER = struct.Struct("<qqHH")
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_prefetch_queue = queue.Queue()
+_prefetch_thread = None
+
+
+def _cache_file(path, size):
+    name = hashlib.sha1(f"{os.path.abspath(path)}\n{size[0]}x{size[1]}".encode("utf-8")).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, name + ".565")
+
+
+def to_rgb565(img):
+    """Pack an RGB image into little-endian RGB565 bytes."""
+    r, g, b = img.split()
+    lo = ImageChops.add(g.point(lambda v: (v & 0x1C) << 3), b.point(lambda v: v >> 3))
+    hi = ImageChops.add(r.point(lambda v: v & 0xF8), g.point(lambda v: v >> 5))
+    return Image.merge("LA", (lo, hi)).tobytes()
+
+
+def from_rgb565(data, size):
+    """Unpack little-endian RGB565 bytes into an RGB image."""
+    return Image.frombytes("RGB", size, data, "raw", "BGR;16")
+
+
+def _read_disk(cache_file, st, size):
+    try:
+        with open(cache_file, "rb") as f:
+            header = f.read(HEADER.size)
+            data = f.read()
+    except OSError:
+        return None
+    if len(header) != HEADER.size:
+        return None
+    mtime_ns, file_size, w, h = HEADER.unpack(header)
+    if (mtime_ns, file_size, w, h) != (st.st_mtime_ns, st.st_size, size[0], size[1]):
+        return None
+    if len(data) != w * h * 2:
+        return None
+    return from_rgb565(data, size)
+
+
+def _write_disk(cache_file, st, img):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp = cache_file + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(st.st_mtime_ns, st.st_size, img.width, img.height))
+            f.write(to_rgb565(img))
+        os.replace(tmp, cache_file)
+    except OSError as e:
+        print(f"Failed to cache gallery image: {e}")
+
+
+def _decode(path, size):
+    if size == FULL_SIZE:
+        return Image.open(path).convert("RGB").resize(size)
+    # Thumbnails come from the full-size frame so the source is decoded once
+    return get(path).resize(size)
+
+
+def get(path, size=FULL_SIZE):
+    """Return ``path`` scaled to ``size``, from memory, disk or a fresh decode."""
+    key = (path, size)
+    st = os.stat(path)
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None and entry[0] == (st.st_mtime_ns, st.st_size):
+            _memory.move_to_end(key)
+            return entry[1]
+    cache_file = _cache_file(path, size)
+    img = _read_disk(cache_file, st, size)
+    if img is None:
+        img = _decode(path, size)
+        _write_disk(cache_file, st, img)
+    with _lock:
+        _memory[key] = ((st.st_mtime_ns, st.st_size), img)
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_ITEMS:
+            _memory.popitem(last=False)
+    return img
+
+
+def _prefetch_worker():
+    while True:
+        path, size = _prefetch_queue.get()
+        try:
+            get(path, size)
+        except Exception as e:
+            print(f"Gallery prefetch failed for {path}: {e}")
+
+
+def prefetch(paths, size=FULL_SIZE):
+    """Warm the cache for ``paths`` on a background thread."""
+    global _prefetch_thread
+    if _prefetch_thread is None:
+        _prefetch_thread = threading.Thread(target=_prefetch_worker, daemon=True)
+        _prefetch_thread.start()
+    for path in paths:
+        _prefetch_queue.put((path, size))
@@ -1,26 +1,89 @@
-from . import (
-    snake,
-    tetris,
-    rps,
-    space_invaders,
-    vet_adventure,
-    axe,
-    trivia,
-    hack_in,
-    pico_wow,
-    gta_1997,
-    doctor_mode,
-)
-__all__ = [
-    "snake",
-    "tetris",
-    "rps",
-    "space_invaders",
-    "vet_adventure",
-    "axe",
-    "trivia",
-    "hack_in",
-    "pico_wow",
-    "gta_1997",
-    "doctor_mode",
-]
+"""Registry of the built-in games.
+
+Games are listed here by module name with their menu label and are only
+imported when launched through ``load``. ``unload`` drops a module again once
+the player returns to the menu so unused games cost nothing at boot.
+
+Every game module exposes the same entry callbacks:
+``init(display_func, fonts_tuple, quit_callback)``, ``start()`` and
+``handle_input(pin)``.
+"""
+
+import importlib
+import sys
+
+ENTRY_POINTS = {"init": "init", "start": "start", "input": "handle_input"}
+
+GAMES = {
+    "doctor_mode": {"label": "Doctor Mode", "module": "games.doctor_mode"},
+    "snake": {"label": "Snake", "module": "games.snake"},
+    "tetris": {"label": "Tetris", "module": "games.tetris"},
+    "rps": {"label": "Rock Paper Scissors", "module": "games.rps"},
+    "space_invaders": {"label": "Space Invaders", "module": "games.space_invaders"},
+    "vet_adventure": {"label": "Vet Adventure", "module": "games.vet_adventure"},
+    "axe": {"label": "Axe", "module": "games.axe"},
+    "trivia": {"label": "Trivia", "module": "games.trivia"},
+    "two_player_trivia": {"label": "Two Player Trivia", "module": "games.two_player_trivia"},
+    "hack_in": {"label": "Hack In", "module": "games.hack_in"},
+    "pico_wow": {"label": "Pico WoW", "module": "games.pico_wow"},
+    "gta_1997": {"label": "GTA 1997", "module": "games.gta_1997"},
+}
+
+
+def register(name, label, module=None, entry_points=None):
+    """Add a game to the registry. ``module`` defaults to ``games.<name>``."""
+    GAMES[name] = {
+        "label": label,
+        "module": module or f"games.{name}",
+    }
+    if entry_points:
+        GAMES[name]["entry"] = dict(ENTRY_POINTS, **entry_points)
+
+
+def labels():
+    """Return menu labels in registry order."""
+    return [info["label"] for info in GAMES.values()]
+
+
+def by_label(label):
+    """Return the registry name for a menu label, or None."""
+    for name, info in GAMES.items():
+        if info["label"] == label:
+            return name
+    return None
+
+
+def is_loaded(name):
+    """Return True if the game's module is currently imported."""
+    info = GAMES.get(name)
+    return bool(info) and info["module"] in sys.modules
+
+
+def load(name):
+    """Import a game on demand and return its module."""
+    return importlib.import_module(GAMES[name]["module"])
+
+
+def entry(name, callback):
+    """Return one of the game's entry callbacks (``init``, ``start`` or ``input``)."""
+    attr = GAMES[name].get("entry", ENTRY_POINTS)[callback]
+    return getattr(load(name), attr)
+
+
+def unload(name):
+    """Forget a loaded game module so its memory can be reclaimed."""
+    info = GAMES.get(name)
+    if not info:
+        return
+    module_name = info["module"]
+    sys.modules.pop(module_name, None)
+    package, _, attr = module_name.rpartition(".")
+    parent = sys.modules.get(package)
+    if parent is not None and getattr(parent, attr, None) is not None:
+        try:
+            delattr(parent, attr)
+        except AttributeError:
+            pass
+
+
+__all__ = ["GAMES", "register", "labels", "by_label", "is_loaded", "load", "entry", "unload"]
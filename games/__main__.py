@@ -0,0 +1,58 @@
+"""Measure what the game registry costs at boot versus importing every game.
+
+Run ``python3 -m games`` on the device. Each measurement happens in a fresh
+interpreter so earlier imports don't hide later costs.
+"""
+
+import subprocess
+import sys
+
+PROBE = """
+import os, time
+def rss_kb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") // 1024
+    except Exception:
+        return 0
+base = rss_kb()
+t0 = time.perf_counter()
+import games
+{extra}
+elapsed = (time.perf_counter() - t0) * 1000
+print(f"{{elapsed:.1f}} {{rss_kb() - base}}")
+"""
+
+
+def measure(extra=""):
+    try:
+        out = subprocess.check_output(
+            [sys.executable, "-c", PROBE.format(extra=extra)],
+            text=True,
+            stderr=subprocess.DEVNULL,
+        )
+    except subprocess.CalledProcessError:
+        return None
+    ms, kb = out.split()
+    return float(ms), int(kb)
+
+
+def main():
+    from . import GAMES
+
+    rows = [("registry only (lazy boot)", measure())]
+    eager = "\n".join(f"games.load({name!r})" for name in GAMES)
+    rows.append(("all games (old eager boot)", measure(eager)))
+    for name in GAMES:
+        rows.append((f"  {name}", measure(f"games.load({name!r})")))
+    print(f"{'import':32} {'ms':>8} {'RSS KB':>8}")
+    for label, result in rows:
+        if result is None:
+            print(f"{label:32} {'failed':>8}")
+        else:
+            ms, kb = result
+            print(f"{label:32} {ms:8.1f} {kb:8d}")
+
+
+if __name__ == "__main__":
+    main()
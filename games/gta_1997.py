@@ -3,6 +3,8 @@ import threading
 import time
 from PIL import Image, ImageDraw
 
+from .spatial import SpatialGrid
+
 CELL_SIZE = 8
 GRID_W = 16
 GRID_H = 16
@@ -15,6 +17,9 @@ map_grid = []
 player = [7, 7]
 star = (0, 0)
 enemies = []
+# Enemy cars are indexed by their position in ``enemies``
+enemy_grid = SpatialGrid(4)
+grid_lock = threading.Lock()
 score = 0
 lives = 3
 running = False
@@ -32,6 +37,10 @@ def spawn_enemies():
         [7, 0, 0, 1],
         [8, GRID_H - 1, 0, -1],
     ]
+    with grid_lock:
+        enemy_grid.clear()
+        for i, e in enumerate(enemies):
+            enemy_grid.insert(i, e[0], e[1])
 
 def init(display_func, fonts_tuple, quit_callback):
     global thread_safe_display, fonts, exit_cb
@@ -106,9 +115,7 @@ def place_star():
     while True:
         sx = random.randint(1, GRID_W - 2)
         sy = random.randint(1, GRID_H - 2)
-        if map_grid[sy][sx] == 0 and [sx, sy] != player and all([
-            sx != e[0] or sy != e[1] for e in enemies
-        ]):
+        if map_grid[sy][sx] == 0 and [sx, sy] != player and not enemy_grid.at(sx, sy):
             star = (sx, sy)
             break
 
@@ -120,24 +127,26 @@ def increase_score():
 
 def move_enemies():
     """Advance enemy cars along their paths."""
-    for e in enemies:
-        e[0] = (e[0] + e[2]) % GRID_W
-        e[1] = (e[1] + e[3]) % GRID_H
+    with grid_lock:
+        for i, e in enumerate(enemies):
+            e[0] = (e[0] + e[2]) % GRID_W
+            e[1] = (e[1] + e[3]) % GRID_H
+            enemy_grid.move(i, e[0], e[1])
 
 
 def check_player_collisions():
     """Handle collisions between the player and enemies or pickups."""
     global lives, running
-    for e in enemies:
-        if player[0] == e[0] and player[1] == e[1]:
-            lives -= 1
-            player[0], player[1] = 7, 7
-            if lives <= 0:
-                running = False
-                draw_game_over()
-                time.sleep(2)
-                exit_cb()
-            return
+    with grid_lock:
+        hit = bool(enemy_grid.at(player[0], player[1]))
+    if hit:
+        lives -= 1
+        player[0], player[1] = 7, 7
+        if lives <= 0:
+            running = False
+            draw_game_over()
+            time.sleep(2)
+            exit_cb()
 
 def stop():
     global running
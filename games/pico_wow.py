@@ -6,6 +6,8 @@ import time
 import random
 from PIL import Image, ImageDraw
 
+from .spatial import SpatialGrid
+
 # Constants
 TILE_SIZE = 8
 GRID_W = 16
@@ -38,6 +40,17 @@ class Enemy:
         self.speed = random.choice([1, 1, 2])
 
 enemies = []
+enemy_grid = SpatialGrid(4)
+# Input callbacks and the game loop both touch the grid
+grid_lock = threading.Lock()
+
+
+def _spawn_enemy():
+    """Create an enemy and register it with the spatial grid."""
+    enemy = Enemy()
+    enemies.append(enemy)
+    enemy_grid.insert(enemy, enemy.x, enemy.y)
+    return enemy
 
 
 def init(display_func, fonts_tuple, quit_callback):
@@ -56,7 +69,10 @@ def start():
     score = 0
     level = 1
     heart_pos = None
-    enemies = [Enemy() for _ in range(3)]
+    enemies = []
+    enemy_grid.clear()
+    for _ in range(3):
+        _spawn_enemy()
     running = True
     update_thread = threading.Thread(target=_game_loop, daemon=True)
     update_thread.start()
@@ -103,17 +119,21 @@ def _move_player(dx, dy):
 
 
 def _attack():
-    global score, enemies, level
-    for enemy in enemies:
-        if abs(enemy.x - player_pos[0]) + abs(enemy.y - player_pos[1]) == 1:
+    global score, level
+    px, py = player_pos
+    with grid_lock:
+        for enemy in enemy_grid.neighbors(px, py, 1):
+            if abs(enemy.x - px) + abs(enemy.y - py) != 1:
+                continue
             enemy.hp -= 1
             if enemy.hp <= 0:
                 score += 1
                 enemies.remove(enemy)
-                enemies.append(Enemy())
+                enemy_grid.remove(enemy)
+                _spawn_enemy()
                 if score % LEVEL_THRESH == 0:
                     level += 1
-                    enemies.append(Enemy())
+                    _spawn_enemy()
                     _maybe_spawn_heart(force=True)
             break
 
@@ -121,14 +141,14 @@ def _attack():
 def _game_loop():
     global player_hp, running
     while running and player_hp > 0:
-        for enemy in list(enemies):
-            for _ in range(enemy.speed):
-                _move_enemy(enemy)
-            if enemy.x == player_pos[0] and enemy.y == player_pos[1]:
-                player_hp -= 1
-                if player_hp <= 0:
-                    break
-        _maybe_spawn_heart()
+        with grid_lock:
+            for enemy in list(enemies):
+                for _ in range(enemy.speed):
+                    _move_enemy(enemy)
+                enemy_grid.move(enemy, enemy.x, enemy.y)
+            hits = len(enemy_grid.at(*player_pos))
+            player_hp = max(0, player_hp - hits)
+            _maybe_spawn_heart()
         draw()
         delay = max(0.5 - (level - 1) * 0.05, 0.2)
         time.sleep(delay)
@@ -160,7 +180,7 @@ def _maybe_spawn_heart(force=False):
     if heart_pos is None and (force or random.random() < 0.1):
         while True:
             pos = (random.randint(0, GRID_W - 1), random.randint(0, GRID_H - 1))
-            if pos != tuple(player_pos) and all((e.x, e.y) != pos for e in enemies):
+            if pos != tuple(player_pos) and not enemy_grid.at(*pos):
                 heart_pos = pos
                 break
 
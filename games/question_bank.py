@@ -0,0 +1,153 @@
+"""On-disk trivia question bank shared by the device games and web quiz.
+
+Questions live in ``questions.jsonl``, one JSON object per line with the keys
+``topic``, ``q``, ``opts`` and ``a``. A small index of byte offsets per topic
+is kept next to the bank so a quiz only parses the questions it draws instead
+of loading the whole bank at import time.
+"""
+
+import hashlib
+import json
+import os
+import random
+import threading
+
+BANK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "questions.jsonl")
+INDEX_PATH = BANK_PATH + ".idx"
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def question_key(q):
+    """Return a stable key for a question that survives edits elsewhere in the bank."""
+    text = f"{q.get('topic', '')}\n{q.get('q', '')}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+def build_index(path=BANK_PATH):
+    """Scan the bank once and record the offset of every question by topic."""
+    topics = {}
+    keys = {}
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.strip():
+                try:
+                    q = json.loads(line)
+                except ValueError:
+                    q = None
+                if q is not None:
+                    topics.setdefault(q.get("topic", ""), []).append(offset)
+                    keys[question_key(q)] = offset
+            offset += len(line)
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime": st.st_mtime, "topics": topics, "keys": keys}
+
+
+def _index_is_current(index, st):
+    return (
+        index is not None
+        and index.get("size") == st.st_size
+        and index.get("mtime") == st.st_mtime
+    )
+
+
+def load_index():
+    """Return the topic index, rebuilding it when the bank file has changed."""
+    global _index
+    with _index_lock:
+        try:
+            st = os.stat(BANK_PATH)
+        except OSError:
+            _index = {"size": 0, "mtime": 0, "topics": {}, "keys": {}}
+            return _index
+        if _index_is_current(_index, st):
+            return _index
+        index = None
+        try:
+            with open(INDEX_PATH) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            index = None
+        if not _index_is_current(index, st) or "keys" not in index:
+            index = build_index()
+            try:
+                tmp = INDEX_PATH + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump(index, f)
+                os.replace(tmp, INDEX_PATH)
+            except OSError as e:
+                print(f"Failed to save question index: {e}")
+        _index = index
+        return _index
+
+
+def topics():
+    """Return the topic names available in the bank."""
+    return list(load_index()["topics"].keys())
+
+
+def count(topic):
+    """Return how many questions exist for ``topic``."""
+    return len(load_index()["topics"].get(topic, []))
+
+
+def _read_at(f, offset):
+    f.seek(offset)
+    q = json.loads(f.readline())
+    q["id"] = offset
+    q["key"] = question_key(q)
+    return q
+
+
+def get(question_id):
+    """Load a single question by id (its byte offset in the bank)."""
+    try:
+        question_id = int(question_id)
+        with open(BANK_PATH, "rb") as f:
+            return _read_at(f, question_id)
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+def get_many(question_ids):
+    """Load several questions by id, preserving order and skipping bad ids."""
+    found = []
+    try:
+        with open(BANK_PATH, "rb") as f:
+            for question_id in question_ids:
+                try:
+                    found.append(_read_at(f, int(question_id)))
+                except (ValueError, TypeError):
+                    continue
+    except OSError:
+        pass
+    return found
+
+
+def keys(topic):
+    """Return the stable keys of every question in ``topic``."""
+    index = load_index()
+    offsets = set(index["topics"].get(topic, []))
+    return [key for key, offset in index["keys"].items() if offset in offsets]
+
+
+def get_by_keys(question_keys):
+    """Load questions by stable key, preserving order and skipping unknown keys."""
+    index = load_index()
+    offsets = [index["keys"][k] for k in question_keys if k in index["keys"]]
+    return get_many(offsets)
+
+
+def sample(topic, k=15):
+    """Return up to ``k`` random questions from ``topic``.
+
+    Only the chosen lines are read and parsed. Each question carries an ``id``
+    so callers can refer back to it later.
+    """
+    offsets = load_index()["topics"].get(topic, [])
+    chosen = random.sample(offsets, min(k, len(offsets)))
+    # Read in file order to keep seeks short on the SD card, then shuffle back
+    questions = {q["id"]: q for q in get_many(sorted(chosen))}
+    return [questions[o] for o in chosen if o in questions]
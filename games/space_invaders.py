@@ -1,12 +1,18 @@
+import random
 import threading
 import time
 from PIL import Image, ImageDraw
 
+from .spatial import SpatialGrid
+
 CELL_SIZE = 8
 INV_COLS = 8
 INV_ROWS = 3
 SCREEN_W = 128
 SCREEN_H = 128
+MAX_BULLETS = 3
+ENEMY_FIRE_CHANCE = 0.15
+MAX_LIVES = 3
 
 thread_safe_display = None
 fonts = None
@@ -14,8 +20,11 @@ exit_cb = None
 
 ship_x = SCREEN_W // 2
 invaders = []
-bullet = None
+bullets = []
+enemy_bullets = []
+lives = MAX_LIVES
 move_dir = 1
+invader_grid = SpatialGrid(CELL_SIZE * 2)
 running = False
 update_thread = None
 
@@ -28,9 +37,11 @@ def init(display_func, fonts_tuple, quit_callback):
 
 
 def start():
-    global invaders, ship_x, bullet, move_dir, running
+    global invaders, ship_x, bullets, enemy_bullets, lives, move_dir, running
     ship_x = SCREEN_W // 2
-    bullet = None
+    bullets = []
+    enemy_bullets = []
+    lives = MAX_LIVES
     move_dir = 1
     invaders = [(x * 12 + 16, y * 10 + 10) for y in range(INV_ROWS) for x in range(INV_COLS)]
     running = True
@@ -47,37 +58,90 @@ def start_thread():
 
 
 def handle_input(pin):
-    global ship_x, bullet
+    global ship_x
     if pin == "JOY_LEFT":
         ship_x = max(0, ship_x - 8)
     elif pin == "JOY_RIGHT":
         ship_x = min(SCREEN_W - CELL_SIZE, ship_x + 8)
     elif pin in ("JOY_PRESS", "KEY1"):
-        if bullet is None:
-            bullet = [ship_x + CELL_SIZE // 2, SCREEN_H - 12]
+        if len(bullets) < MAX_BULLETS:
+            bullets.append([ship_x + CELL_SIZE // 2, SCREEN_H - 12])
     elif pin == "KEY2":
         stop()
     draw()
 
 
+def index_invaders():
+    """Rebuild the spatial grid after the formation moves."""
+    invader_grid.clear()
+    for inv in invaders:
+        invader_grid.insert(inv, inv[0], inv[1], CELL_SIZE + 1, CELL_SIZE + 1)
+
+
+def move_bullets():
+    """Advance player shots and remove any invaders they hit."""
+    global bullets
+    remaining = []
+    for b in list(bullets):
+        b[1] -= 8
+        if b[1] < 0:
+            continue
+        # Bullet box matches the rectangle drawn in draw()
+        hits = invader_grid.query(b[0] - 1, b[1], 3, 5)
+        if hits:
+            hit = hits[0]
+            invader_grid.remove(hit)
+            invaders.remove(hit)
+            continue
+        remaining.append(b)
+    bullets = remaining
+
+
+def enemy_fire():
+    """Let a random invader from the bottom of a column drop a shot."""
+    if not invaders or random.random() >= ENEMY_FIRE_CHANCE:
+        return
+    shooter = random.choice(invaders)
+    below = invader_grid.query(shooter[0], shooter[1] + CELL_SIZE + 1, CELL_SIZE + 1, SCREEN_H)
+    if not below:
+        enemy_bullets.append([shooter[0] + CELL_SIZE // 2, shooter[1] + CELL_SIZE])
+
+
+def move_enemy_bullets():
+    """Advance invader shots and return True if one hits the ship."""
+    global enemy_bullets
+    hit = False
+    remaining = []
+    for b in enemy_bullets:
+        b[1] += 6
+        if b[1] >= SCREEN_H:
+            continue
+        if (
+            ship_x <= b[0] <= ship_x + CELL_SIZE
+            and b[1] + 4 >= SCREEN_H - 8
+        ):
+            hit = True
+            continue
+        remaining.append(b)
+    enemy_bullets = remaining
+    return hit
+
+
 def game_loop():
-    global bullet, invaders, move_dir, running
+    global invaders, move_dir, running, lives, enemy_bullets
+    index_invaders()
     while running:
         time.sleep(0.2)
-        # move bullet
-        if bullet is not None:
-            bullet[1] -= 8
-            if bullet[1] < 0:
-                bullet = None
-            else:
-                hit = None
-                for inv in invaders:
-                    if abs(bullet[0] - inv[0]) < CELL_SIZE and abs(bullet[1] - inv[1]) < CELL_SIZE:
-                        hit = inv
-                        break
-                if hit:
-                    invaders.remove(hit)
-                    bullet = None
+        move_bullets()
+        if move_enemy_bullets():
+            lives -= 1
+            enemy_bullets = []
+            if lives <= 0:
+                running = False
+                draw_game_over()
+                time.sleep(2)
+                exit_cb()
+                return
         # move invaders
         edge_hit = False
         for i, inv in enumerate(invaders):
@@ -87,6 +151,8 @@ def game_loop():
         if edge_hit:
             move_dir *= -1
             invaders = [(x, y + 4) for (x, y) in invaders]
+        index_invaders()
+        enemy_fire()
         if any(y >= SCREEN_H - 20 for x, y in invaders):
             running = False
             draw_game_over()
@@ -118,8 +184,13 @@ def draw():
     # draw invaders
     for x, y in invaders:
         d.rectangle([x, y, x + CELL_SIZE, y + CELL_SIZE], fill=(255, 0, 0))
-    if bullet is not None:
-        d.rectangle([bullet[0] - 1, bullet[1], bullet[0] + 1, bullet[1] + 4], fill=(255, 255, 255))
+    for bx, by in list(bullets):
+        d.rectangle([bx - 1, by, bx + 1, by + 4], fill=(255, 255, 255))
+    for bx, by in list(enemy_bullets):
+        d.rectangle([bx - 1, by, bx + 1, by + 4], fill=(255, 255, 0))
+    # remaining lives as small pips so they don't cover the formation
+    for i in range(lives):
+        d.rectangle([2 + i * 5, 1, 4 + i * 5, 3], fill=(0, 255, 0))
     thread_safe_display(img)
 
 
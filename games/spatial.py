@@ -0,0 +1,114 @@
+# Uniform-grid spatial index shared by the action games.
+# Entities register an axis-aligned box and the grid buckets them by the cells
+# that box covers, so collision checks only look at nearby entities instead of
+# scanning every enemy each tick.
+
+
+class SpatialGrid:
+    """Bucket hashable items into fixed-size cells for fast overlap queries.
+
+    Boxes are half-open: an item at ``(x, y)`` with size ``(w, h)`` covers
+    ``x <= px < x + w`` and ``y <= py < y + h``. Tile based games can use a
+    ``cell_size`` of 1 and the default 1x1 box.
+    """
+
+    def __init__(self, cell_size=8):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.boxes = {}
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def __contains__(self, item):
+        return item in self.boxes
+
+    def _cell_range(self, x, y, w, h):
+        cs = self.cell_size
+        x0 = int(x // cs)
+        y0 = int(y // cs)
+        x1 = int((x + max(w, 1) - 1) // cs)
+        y1 = int((y + max(h, 1) - 1) // cs)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                yield (cx, cy)
+
+    def clear(self):
+        """Remove every item from the grid."""
+        self.cells.clear()
+        self.boxes.clear()
+
+    def insert(self, item, x, y, w=1, h=1):
+        """Register ``item`` with the given box, replacing any previous box."""
+        if item in self.boxes:
+            self.remove(item)
+        self.boxes[item] = (x, y, w, h)
+        for key in self._cell_range(x, y, w, h):
+            self.cells.setdefault(key, set()).add(item)
+
+    def remove(self, item):
+        """Forget ``item``. Unknown items are ignored."""
+        box = self.boxes.pop(item, None)
+        if box is None:
+            return
+        for key in self._cell_range(*box):
+            bucket = self.cells.get(key)
+            if bucket is not None:
+                bucket.discard(item)
+                if not bucket:
+                    del self.cells[key]
+
+    def move(self, item, x, y, w=None, h=None):
+        """Update the position of ``item``, keeping its size unless given."""
+        old = self.boxes.get(item)
+        if old is None:
+            self.insert(item, x, y, w or 1, h or 1)
+            return
+        w = old[2] if w is None else w
+        h = old[3] if h is None else h
+        old_keys = set(self._cell_range(*old))
+        new_keys = set(self._cell_range(x, y, w, h))
+        self.boxes[item] = (x, y, w, h)
+        if old_keys == new_keys:
+            return
+        for key in old_keys - new_keys:
+            bucket = self.cells.get(key)
+            if bucket is not None:
+                bucket.discard(item)
+                if not bucket:
+                    del self.cells[key]
+        for key in new_keys - old_keys:
+            self.cells.setdefault(key, set()).add(item)
+
+    def box(self, item):
+        """Return the ``(x, y, w, h)`` box registered for ``item``."""
+        return self.boxes.get(item)
+
+    def query(self, x, y, w=1, h=1):
+        """Return items whose boxes overlap the given box."""
+        found = []
+        seen = set()
+        for key in self._cell_range(x, y, w, h):
+            for item in self.cells.get(key, ()):
+                if item in seen:
+                    continue
+                seen.add(item)
+                ix, iy, iw, ih = self.boxes[item]
+                if ix < x + w and x < ix + iw and iy < y + h and y < iy + ih:
+                    found.append(item)
+        return found
+
+    def at(self, x, y):
+        """Return items covering the point ``(x, y)``."""
+        return self.query(x, y, 1, 1)
+
+    def overlapping(self, item):
+        """Return other items whose boxes overlap the box of ``item``."""
+        box = self.boxes.get(item)
+        if box is None:
+            return []
+        return [other for other in self.query(*box) if other != item]
+
+    def neighbors(self, x, y, radius=1):
+        """Return items overlapping the square of ``radius`` around ``(x, y)``."""
+        return self.query(x - radius, y - radius, 2 * radius + 1, 2 * radius + 1)
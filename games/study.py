@@ -0,0 +1,171 @@
+"""Spaced-repetition study scheduler for the trivia question bank.
+
+Every answer is appended to a per-user history in SQLite and updates an SM-2
+style card for the question (ease factor, interval and next due time). Quizzes
+are assembled from due cards first, then weak cards, then unseen questions, so
+regular short sessions concentrate on what still needs practice. The ``cards``
+table is indexed by due time and ease so selection stays fast as the history
+grows.
+"""
+
+import os
+import random
+import sqlite3
+import threading
+import time
+
+from . import question_bank
+
+DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "study.db")
+DEFAULT_USER = "default"
+DAY = 24 * 60 * 60
+# Missed questions come back within the same study session
+RELEARN_DELAY = 10 * 60
+MIN_EASE = 1.3
+START_EASE = 2.5
+WEAK_EASE = 2.2
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _connect():
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(DB_PATH, check_same_thread=False)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS answers (
+                user TEXT NOT NULL,
+                qkey TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                answered_at REAL NOT NULL,
+                quality INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS cards (
+                user TEXT NOT NULL,
+                qkey TEXT NOT NULL,
+                topic TEXT NOT NULL,
+                ease REAL NOT NULL,
+                interval REAL NOT NULL,
+                reps INTEGER NOT NULL,
+                lapses INTEGER NOT NULL,
+                due REAL NOT NULL,
+                PRIMARY KEY (user, qkey)
+            );
+            CREATE INDEX IF NOT EXISTS cards_due ON cards (user, topic, due);
+            CREATE INDEX IF NOT EXISTS cards_ease ON cards (user, topic, ease);
+            """
+        )
+    return _conn
+
+
+def schedule(ease, interval, reps, lapses, quality):
+    """Apply one SM-2 review and return ``(ease, interval_days, reps, lapses)``.
+
+    ``quality`` ranges from 0 (no answer) to 5 (instant, confident answer).
+    A quality below 3 counts as a lapse and restarts the repetition count.
+    """
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < 3:
+        return ease, 0, 0, lapses + 1
+    if reps == 0:
+        interval = 1
+    elif reps == 1:
+        interval = 6
+    else:
+        interval = interval * ease
+    return ease, interval, reps + 1, lapses
+
+
+def quality_for(correct, time_left=None, time_limit=15):
+    """Map a quiz result to an SM-2 quality score."""
+    if time_left is not None and time_left <= 0:
+        return 0
+    if not correct:
+        return 1
+    if time_left is not None and time_left >= time_limit * 2 / 3:
+        return 5
+    return 4
+
+
+def record_answer(question, quality, user=DEFAULT_USER, now=None):
+    """Append an answer to the history and reschedule its card."""
+    now = time.time() if now is None else now
+    key = question.get("key") or question_bank.question_key(question)
+    topic = question.get("topic", "")
+    with _lock:
+        db = _connect()
+        row = db.execute(
+            "SELECT ease, interval, reps, lapses FROM cards WHERE user=? AND qkey=?",
+            (user, key),
+        ).fetchone()
+        ease, interval, reps, lapses = row if row else (START_EASE, 0, 0, 0)
+        ease, interval, reps, lapses = schedule(ease, interval, reps, lapses, quality)
+        due = now + (interval * DAY if interval else RELEARN_DELAY)
+        db.execute(
+            "INSERT INTO answers (user, qkey, topic, answered_at, quality) VALUES (?, ?, ?, ?, ?)",
+            (user, key, topic, now, quality),
+        )
+        db.execute(
+            "INSERT OR REPLACE INTO cards (user, qkey, topic, ease, interval, reps, lapses, due)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (user, key, topic, ease, interval, reps, lapses, due),
+        )
+        db.commit()
+
+
+def pick_questions(topic, k=15, user=DEFAULT_USER, now=None):
+    """Return up to ``k`` questions: due first, then weak, then new, then the rest."""
+    now = time.time() if now is None else now
+    with _lock:
+        db = _connect()
+        due = [r[0] for r in db.execute(
+            "SELECT qkey FROM cards WHERE user=? AND topic=? AND due<=? ORDER BY due LIMIT ?",
+            (user, topic, now, k),
+        )]
+        weak = [r[0] for r in db.execute(
+            "SELECT qkey FROM cards WHERE user=? AND topic=? AND due>? AND ease<?"
+            " ORDER BY ease LIMIT ?",
+            (user, topic, now, WEAK_EASE, k),
+        )]
+        seen = {r[0] for r in db.execute(
+            "SELECT qkey FROM cards WHERE user=? AND topic=?", (user, topic)
+        )}
+        upcoming = [r[0] for r in db.execute(
+            "SELECT qkey FROM cards WHERE user=? AND topic=? AND due>? ORDER BY due LIMIT ?",
+            (user, topic, now, k),
+        )]
+
+    chosen = []
+    for key in due + weak:
+        if key not in chosen:
+            chosen.append(key)
+    if len(chosen) < k:
+        unseen = [key for key in question_bank.keys(topic) if key not in seen]
+        chosen.extend(random.sample(unseen, min(k - len(chosen), len(unseen))))
+    for key in upcoming:
+        if len(chosen) >= k:
+            break
+        if key not in chosen:
+            chosen.append(key)
+    questions = question_bank.get_by_keys(chosen[:k])
+    random.shuffle(questions)
+    return questions
+
+
+def stats(topic, user=DEFAULT_USER, now=None):
+    """Return counts of due, learned and total questions for a topic."""
+    now = time.time() if now is None else now
+    with _lock:
+        db = _connect()
+        due = db.execute(
+            "SELECT COUNT(*) FROM cards WHERE user=? AND topic=? AND due<=?",
+            (user, topic, now),
+        ).fetchone()[0]
+        seen = db.execute(
+            "SELECT COUNT(*) FROM cards WHERE user=? AND topic=?", (user, topic)
+        ).fetchone()[0]
+    return {"due": due, "seen": seen, "total": question_bank.count(topic)}
@@ -1,9 +1,9 @@
 import time
-import random
 import threading
 from PIL import Image, ImageDraw
 
-from .trivia import QUESTIONS, wrap_text
+from . import question_bank, study
+from .trivia import layout_question
 
 thread_safe_display = None
 fonts = None
@@ -19,6 +19,7 @@ alphabet = list("ABCDEFGHIJKLMNOPQRSTUVWXYZ ")
 current_topic = None
 question_idx = 0
 quiz_questions = []
+quiz_layouts = []
 
 buzzed_player = None
 reveal_thread = None
@@ -48,7 +49,7 @@ def start():
 
 def handle_input(pin):
     global state, current_name, name_idx, player_names, current_topic
-    global quiz_questions, question_idx, buzzed_player
+    global quiz_questions, quiz_layouts, question_idx, buzzed_player
 
     if pin == "JOY_PRESS":
         stop_reveal()
@@ -84,7 +85,10 @@ def handle_input(pin):
             current_topic = "Veterinary Internal Medicine"
         else:
             return
-        quiz_questions = random.sample(QUESTIONS[current_topic], min(15, len(QUESTIONS[current_topic])))
+        quiz_questions = question_bank.sample(current_topic, 15)
+        if not quiz_questions:
+            return
+        quiz_layouts = [layout_question(q, fonts[0]) for q in quiz_questions]
         question_idx = 0
         player_scores[0] = 0
         player_scores[1] = 0
@@ -172,21 +176,22 @@ def stop_reveal():
 
 
 def draw_question(partial=False):
+    """Draw the question from its cached layout, revealing it letter by letter."""
     img = Image.new("RGB", (128, 128), "black")
     d = ImageDraw.Draw(img)
-    q = quiz_questions[question_idx]
-    text = q["q"]
+    layout = quiz_layouts[question_idx]
     if partial:
-        text = text[:question_display_len]
-    lines = wrap_text(text, fonts[0], 118, d)
-    y = 5
-    for line in lines:
-        d.text((5, y), line, font=fonts[0], fill=(255, 255, 0))
-        y += fonts[0].getbbox("A")[3] + 2
-    if not partial:
-        for idx, opt in enumerate(q["opts"], 1):
-            d.text((5, y), f"{idx}={opt}", font=fonts[0], fill=(0, 255, 255))
-            y += fonts[0].getbbox("A")[3] + 2
+        # Walk the pre-wrapped lines so revealed text never reflows
+        remaining = question_display_len
+        y = 5
+        for line in layout["lines"]:
+            if remaining <= 0:
+                break
+            d.text((5, y), line[:remaining], font=fonts[0], fill=(255, 255, 0))
+            remaining -= len(line) + 1
+            y += layout["line_h"]
+    else:
+        img.paste(layout["body"], (0, 5))
     d.text((5, 110), f"{player_names[0]}: {player_scores[0]}", font=fonts[0], fill=(0,255,0))
     d.text((70, 110), f"{player_names[1]}: {player_scores[1]}", font=fonts[0], fill=(0,255,0))
     thread_safe_display(img)
@@ -199,6 +204,12 @@ def check_answer(choice):
     correct_opt = q["opts"][q["a"]]
     if correct and buzzed_player is not None:
         player_scores[buzzed_player] += 1
+    if buzzed_player is not None:
+        # Each player's answers feed their own study history
+        try:
+            study.record_answer(q, study.quality_for(correct), user=player_names[buzzed_player])
+        except Exception as e:
+            print(f"Failed to record answer: {e}")
     draw_feedback(correct, correct_opt)
     time.sleep(1)
     question_idx += 1
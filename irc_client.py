@@ -0,0 +1,243 @@
+"""Single-channel IRC client driven by a selector loop.
+
+One background thread owns the socket. It connects without blocking, splits
+incoming data into lines in a ``bytearray``, answers PINGs and passes channel
+messages and connection status to callbacks. When the connection drops or goes
+silent it reconnects with exponential backoff. Other threads only queue
+outgoing lines and wake the loop through a socket pair.
+
+``on_message(nick, text)`` is called for each channel message and
+``on_status(text)`` when the connection is lost or comes back. History is
+kept by the caller (see ``chat_bus``).
+"""
+
+import errno
+import selectors
+import socket
+import threading
+import time
+
+import journal
+
+CONNECT_TIMEOUT = 10
+BACKOFF_START = 2
+BACKOFF_MAX = 300
+# Send a PING after this much silence and give up on the connection after twice as long
+IDLE_PING = 180
+MAX_LINE = 4096
+
+
+class IRCClient:
+    """Keeps one connection to ``channel`` alive and reports its messages."""
+
+    def __init__(self, server, port, nick, channel, on_message=None, on_status=None):
+        self.server = server
+        self.port = port
+        self.nick = nick
+        self.channel = channel
+        self.on_message = on_message
+        self.on_status = on_status
+        self.connected = False
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, "wake")
+        self._sock = None
+        self._inbuf = bytearray()
+        self._outbuf = bytearray()
+        self._out_lock = threading.Lock()
+        self._backoff = BACKOFF_START
+        self._next_attempt = 0.0
+        self._connect_started = 0.0
+        self._last_rx = 0.0
+        self._pinged = False
+        self._reported_failure = False
+        self._thread = None
+
+    # --- Public API, safe from any thread ---
+
+    def start(self):
+        """Start the connection loop. Safe to call more than once."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def send(self, text):
+        """Queue a message for the channel; returns False while not connected."""
+        if not text or not self.connected:
+            return False
+        self._queue(f"PRIVMSG {self.channel} :{text}")
+        return True
+
+    def reconnect_now(self):
+        """Skip the remaining backoff, e.g. once the network is back."""
+        self._backoff = BACKOFF_START
+        self._next_attempt = 0.0
+        self._wake()
+
+    # --- Loop internals ---
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except OSError:
+            pass
+
+    def _queue(self, line):
+        with self._out_lock:
+            self._outbuf += line.encode("utf-8", "replace") + b"\r\n"
+        self._wake()
+
+    def _call(self, callback, *args):
+        if callback:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"IRC callback failed: {e}")
+
+    def _open(self):
+        self._inbuf.clear()
+        with self._out_lock:
+            self._outbuf.clear()
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.setblocking(False)
+        err = sock.connect_ex((self.server, self.port))
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            sock.close()
+            raise OSError(err, errno.errorcode.get(err, "connect failed"))
+        self._sock = sock
+        self._connect_started = time.monotonic()
+        self._selector.register(sock, selectors.EVENT_WRITE, "connecting")
+
+    def _established(self):
+        err = self._sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+        if err:
+            raise OSError(err, errno.errorcode.get(err, "connect failed"))
+        journal.record("net", host=self.server, port=self.port, ok=True,
+                       ms=round((time.monotonic() - self._connect_started) * 1000, 2))
+        self._selector.modify(self._sock, selectors.EVENT_READ, "irc")
+        self._last_rx = time.monotonic()
+        self._pinged = False
+        self._queue(f"NICK {self.nick}")
+        self._queue(f"USER {self.nick} 0 * :{self.nick}")
+
+    def _drop(self, reason):
+        if self._sock is not None:
+            try:
+                self._selector.unregister(self._sock)
+            except (KeyError, ValueError):
+                pass
+            self._sock.close()
+            self._sock = None
+        was_connected = self.connected
+        self.connected = False
+        if was_connected or not self._reported_failure:
+            # Report the first failure of an outage, not every retry
+            self._call(self.on_status, f"IRC disconnected: {reason}; retrying")
+            self._reported_failure = True
+        print(f"IRC connection lost: {reason}; retry in {self._backoff}s")
+        journal.record("net", host=self.server, port=self.port, ok=False, error=str(reason))
+        self._next_attempt = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, BACKOFF_MAX)
+
+    def _read(self):
+        data = self._sock.recv(4096)
+        if not data:
+            raise OSError("server closed the connection")
+        self._last_rx = time.monotonic()
+        self._pinged = False
+        self._inbuf += data
+        while True:
+            end = self._inbuf.find(b"\n")
+            if end < 0:
+                break
+            line = bytes(self._inbuf[:end]).rstrip(b"\r")
+            del self._inbuf[:end + 1]
+            self._handle(line.decode("utf-8", "replace"))
+        if len(self._inbuf) > MAX_LINE:
+            # No line ending in sight; drop the garbage rather than grow forever
+            self._inbuf.clear()
+
+    def _write(self):
+        with self._out_lock:
+            if not self._outbuf:
+                return
+            sent = self._sock.send(self._outbuf)
+            del self._outbuf[:sent]
+
+    def _handle(self, line):
+        if line.startswith("PING"):
+            token = line.split(":", 1)[1] if ":" in line else ""
+            self._queue(f"PONG :{token}")
+            return
+        parts = line.split()
+        if len(parts) < 2:
+            return
+        command = parts[1]
+        if command == "001":
+            # Registered: join and reset the backoff for the next outage
+            self.connected = True
+            self._backoff = BACKOFF_START
+            if self._reported_failure:
+                self._call(self.on_status, "IRC connected")
+                self._reported_failure = False
+            self._queue(f"JOIN {self.channel}")
+        elif command == "433":
+            # Nick in use; try again with an underscore
+            self.nick += "_"
+            self._queue(f"NICK {self.nick}")
+        elif command == "PRIVMSG" and len(parts) >= 4 and parts[2] == self.channel:
+            prefix = parts[0]
+            message = line.split(" :", 1)[1] if " :" in line else ""
+            nick = prefix.split("!")[0][1:] if prefix.startswith(":") else prefix
+            self._call(self.on_message, nick, message)
+
+    def _tick(self, now):
+        """Start connection attempts and notice dead or stuck connections."""
+        if self._sock is None:
+            if now >= self._next_attempt:
+                try:
+                    self._open()
+                except OSError as e:
+                    self._drop(e)
+            return
+        key = self._selector.get_key(self._sock)
+        if key.data == "connecting":
+            if now - self._connect_started > CONNECT_TIMEOUT:
+                self._drop("connect timed out")
+        elif now - self._last_rx > IDLE_PING * 2:
+            self._drop("no reply from server")
+        elif now - self._last_rx > IDLE_PING and not self._pinged:
+            self._pinged = True
+            self._queue(f"PING :{self.server}")
+
+    def _run(self):
+        while True:
+            now = time.monotonic()
+            self._tick(now)
+            if self._sock is not None and self._selector.get_key(self._sock).data == "irc":
+                with self._out_lock:
+                    pending = bool(self._outbuf)
+                events = selectors.EVENT_READ | (selectors.EVENT_WRITE if pending else 0)
+                self._selector.modify(self._sock, events, "irc")
+            timeout = 1.0 if self._sock is not None else max(0.0, min(1.0, self._next_attempt - now))
+            for key, mask in self._selector.select(timeout):
+                if key.data == "wake":
+                    try:
+                        self._wake_r.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                if key.fileobj is not self._sock:
+                    # Dropped earlier in this pass
+                    continue
+                try:
+                    if key.data == "connecting":
+                        self._established()
+                    else:
+                        if mask & selectors.EVENT_READ:
+                            self._read()
+                        if mask & selectors.EVENT_WRITE and self._sock is not None:
+                            self._write()
+                except OSError as e:
+                    self._drop(e)
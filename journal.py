@@ -0,0 +1,159 @@
+"""In-process structured event journal.
+
+``record`` appends a tuple to a fixed-size ring buffer. It takes no lock and
+does no formatting or I/O, so it is cheap enough for GPIO callbacks and the
+display path. Each event carries a sequence number and a monotonic timestamp
+in nanoseconds. A background thread converts new events to JSON lines in
+batches and hands them to a ``log_sink.RotatingLog``, so the on-disk journal
+is rotated and kept within a disk budget like the console log.
+
+``query`` filters the in-memory ring for the web server. ``load`` reads
+recent events back from disk when no events are in memory, for example when
+the web server runs as a separate process.
+"""
+
+import itertools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import log_sink
+
+JOURNAL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "events.jsonl")
+RING_SIZE = 4096
+FLUSH_INTERVAL = 5.0
+
+# Wall clock at the monotonic origin, so events can be shown as local time
+_mono_origin = time.monotonic_ns()
+_wall_origin = time.time()
+
+_ring = deque(maxlen=RING_SIZE)
+_seq = itertools.count(1)
+_flushed_seq = 0
+_dropped = 0
+_sink = None
+_flush_thread = None
+_stop = threading.Event()
+
+
+def record(kind, **fields):
+    """Append one event to the ring buffer."""
+    _ring.append((next(_seq), time.monotonic_ns(), kind, fields))
+
+
+@contextmanager
+def timed(kind, **fields):
+    """Record ``kind`` with its duration in ms and whether it raised."""
+    start = time.monotonic_ns()
+    ok = True
+    try:
+        yield fields
+    except BaseException:
+        ok = False
+        raise
+    finally:
+        fields["ms"] = round((time.monotonic_ns() - start) / 1e6, 2)
+        fields["ok"] = ok
+        _ring.append((next(_seq), start, kind, fields))
+
+
+def _as_dict(event):
+    seq, mono_ns, kind, fields = event
+    entry = {
+        "seq": seq,
+        "t": round(mono_ns / 1e9, 6),
+        "wall": round(_wall_origin + (mono_ns - _mono_origin) / 1e9, 3),
+        "kind": kind,
+    }
+    entry.update(fields)
+    return entry
+
+
+def flush():
+    """Write events recorded since the last flush to the journal file."""
+    global _flushed_seq, _dropped
+    if _sink is None:
+        return
+    pending = [e for e in list(_ring) if e[0] > _flushed_seq]
+    if not pending:
+        return
+    # Anything between the last flushed event and the oldest one left in the ring was overwritten
+    _dropped += max(0, pending[0][0] - _flushed_seq - 1)
+    _flushed_seq = pending[-1][0]
+    lines = []
+    for event in pending:
+        try:
+            lines.append(json.dumps(_as_dict(event), default=str))
+        except (TypeError, ValueError):
+            continue
+    _sink.write("\n".join(lines) + "\n")
+
+
+def _run():
+    while not _stop.wait(FLUSH_INTERVAL):
+        try:
+            flush()
+        except Exception as e:
+            print(f"Journal flush failed: {e}")
+
+
+def start(path=JOURNAL_PATH):
+    """Start writing the journal to disk in the background."""
+    global _sink, _flush_thread
+    if _flush_thread is not None:
+        return
+    _sink = log_sink.RotatingLog(path, max_bytes=512 * 1024, budget=8 * 1024 * 1024)
+    _flush_thread = threading.Thread(target=_run, daemon=True)
+    _flush_thread.start()
+
+
+def stop():
+    """Flush remaining events and stop the background writer."""
+    _stop.set()
+    flush()
+    if _sink is not None:
+        _sink.close()
+
+
+def query(kind=None, since=None, limit=200):
+    """Return recent in-memory events, oldest first.
+
+    ``kind`` may be a single kind or a comma-separated list. ``since`` is a
+    sequence number; only newer events are returned, so callers can poll.
+    """
+    kinds = set(kind.split(",")) if kind else None
+    matched = []
+    for event in reversed(list(_ring)):
+        if since is not None and event[0] <= since:
+            break
+        if kinds and event[2] not in kinds:
+            continue
+        matched.append(event)
+        if len(matched) >= limit:
+            break
+    return [_as_dict(e) for e in reversed(matched)]
+
+
+def load(path=JOURNAL_PATH, kind=None, since=None, limit=200):
+    """Read recent events back from the journal file and its rotated segments."""
+    kinds = set(kind.split(",")) if kind else None
+    events = []
+    for line in log_sink.tail(path, max(limit * 4, 1000)):
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        if since is not None and entry.get("seq", 0) <= since:
+            continue
+        if kinds and entry.get("kind") not in kinds:
+            continue
+        events.append(entry)
+    return events[-limit:]
+
+
+def stats():
+    """Return ring usage and how many events never reached disk."""
+    return {"buffered": len(_ring), "capacity": RING_SIZE, "flushed_seq": _flushed_seq, "dropped": _dropped}
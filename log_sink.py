@@ -0,0 +1,177 @@
+"""Buffered, rotating log files for long-running console sessions.
+
+``RotatingLog.write`` only appends to an in-memory buffer. A background
+thread flushes the buffer every few seconds, or sooner once it grows large,
+so callers never wait on the SD card. A segment is rotated when it passes
+``max_bytes`` or has been open for ``max_age`` seconds. Rotated segments are
+renamed with a timestamp and optionally gzipped. The oldest segments are
+removed once all of them together exceed ``budget`` bytes. ``tail`` reads the
+newest lines across the live file and its rotated segments.
+"""
+
+import atexit
+import glob
+import gzip
+import os
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+
+class RotatingLog:
+    """Append-only text log with background flushing and rotation."""
+
+    def __init__(self, path, max_bytes=256 * 1024, max_age=24 * 60 * 60, compress=True,
+                 budget=4 * 1024 * 1024, flush_interval=2.0, flush_bytes=16 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.compress = compress
+        self.budget = budget
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self._buffer = []
+        self._buffered = 0
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._opened_at = _segment_started(path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, text):
+        """Queue ``text`` for writing; never blocks on disk I/O."""
+        with self._lock:
+            self._buffer.append(text)
+            self._buffered += len(text)
+            if self._buffered >= self.flush_bytes:
+                self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Log flush failed for {self.path}: {e}")
+
+    def flush(self):
+        """Write buffered text to disk and rotate if the segment is full or old."""
+        with self._lock:
+            pending = "".join(self._buffer)
+            self._buffer = []
+            self._buffered = 0
+        with self._io_lock:
+            if pending:
+                with open(self.path, "a") as f:
+                    f.write(pending)
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return
+            if size >= self.max_bytes or (size and time.time() - self._opened_at >= self.max_age):
+                self._rotate()
+
+    def _rotate(self):
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        rotated = f"{self.path}.{stamp}"
+        suffix = 1
+        while os.path.exists(rotated) or os.path.exists(rotated + ".gz"):
+            rotated = f"{self.path}.{stamp}-{suffix}"
+            suffix += 1
+        os.replace(self.path, rotated)
+        self._opened_at = time.time()
+        if self.compress:
+            with open(rotated, "rb") as src, gzip.open(rotated + ".gz.tmp", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(rotated + ".gz.tmp", rotated + ".gz")
+            os.remove(rotated)
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        segments = rotated_segments(self.path)
+        total = sum(os.path.getsize(p) for p in segments)
+        try:
+            total += os.path.getsize(self.path)
+        except OSError:
+            pass
+        # Oldest segments go first; the live file is never removed
+        for seg in segments:
+            if total <= self.budget:
+                break
+            total -= os.path.getsize(seg)
+            os.remove(seg)
+
+    def close(self):
+        """Flush anything still buffered and stop the background thread."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        try:
+            self.flush()
+        except Exception as e:
+            print(f"Log flush failed for {self.path}: {e}")
+
+
+def rotated_segments(path):
+    """Return rotated segments of ``path``, oldest first."""
+    segments = [p for p in glob.glob(glob.escape(path) + ".*") if not p.endswith(".tmp")]
+    return sorted(segments, key=lambda p: (os.path.getmtime(p), p))
+
+
+def _segment_started(path):
+    """Return when the live file at ``path`` was started, so its age survives restarts.
+
+    The last rotation started it when there is one; otherwise the file's own
+    timestamps are the best guess. A missing file starts now.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return time.time()
+    segments = rotated_segments(path)
+    if segments:
+        try:
+            return os.path.getmtime(segments[-1])
+        except OSError:
+            pass
+    return getattr(st, "st_birthtime", min(st.st_mtime, st.st_ctime))
+
+
+def _tail_file(path, lines):
+    """Return up to ``lines`` last lines of a plain file, reading from the end."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b""
+        while pos > 0 and data.count(b"\n") <= lines:
+            step = min(8192, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return data.decode(errors="replace").splitlines()[-lines:]
+
+
+def tail(path, lines=50):
+    """Return the newest ``lines`` lines across the live log and its rotated segments."""
+    collected = []
+    for source in [path] + rotated_segments(path)[::-1]:
+        if len(collected) >= lines:
+            break
+        try:
+            if source.endswith(".gz"):
+                with gzip.open(source, "rt", errors="replace") as f:
+                    chunk = list(deque(f.read().splitlines(), maxlen=lines))
+            else:
+                chunk = _tail_file(source, lines)
+        except OSError:
+            continue
+        collected = chunk + collected
+    return collected[-lines:]
@@ -1,22 +1,38 @@
 #!/usr/bin/env python3
 
-import RPi.GPIO as GPIO
 import time
+# Boot timing starts before anything slow is imported
+BOOT_START = time.monotonic()
+
+import RPi.GPIO as GPIO
 import subprocess
 from datetime import datetime
 import os
 import random
 import threading
-import requests
 import re
-import select
-import webbrowser
 import shutil
-import socket
 import json
-import pexpect
-# Games were previously imported here to provide a variety of built-in demos.
-# The menu has been simplified so these modules are no longer referenced.
+# requests, pexpect, socket and webbrowser are imported where they are used
+# so they don't delay the first frame
+# Games are listed in a registry and only imported when launched
+import games
+import font_atlas
+from text_surface import TextSurface
+import gallery_cache
+import notes_store
+import log_sink
+import journal
+import profiler
+import metrics
+import metrics_store
+import radio_scan
+import bt_manager
+import net_monitor
+import irc_client
+import chat_bus
+import pico8_supervisor
+import cart_index
 
 # Luma.lcd imports and setup
 from luma.core.interface.serial import spi
@@ -53,10 +69,76 @@ device = st7735(serial_interface, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT, bg
 
 # Ensure display access is thread-safe
 display_lock = threading.Lock()
+# While another program owns the panel, frames are kept but not sent
+display_released = False
+last_frame = None
 
 def thread_safe_display(img):
+    global last_frame
     with display_lock:
+        last_frame = img
+        if display_released:
+            return
+        start = time.monotonic_ns()
         device.display(img)
+        elapsed = time.monotonic_ns() - start
+    journal.record("frame", ms=round(elapsed / 1e6, 2))
+
+
+# --- Boot ---
+# A splash frame goes up as soon as the panel is ready. The menu follows once
+# fonts and settings are loaded, and network services start in the background.
+BOOT_LOG = os.path.join(os.path.dirname(__file__), "logs", "boot.log")
+boot_times = {}
+
+
+def mark_boot(stage):
+    """Record milliseconds since process start for a boot stage."""
+    if stage not in boot_times:
+        boot_times[stage] = round((time.monotonic() - BOOT_START) * 1000, 1)
+        journal.record("boot", stage=stage, ms=boot_times[stage])
+
+
+def show_splash():
+    """Draw a minimal splash frame using only the built-in bitmap font."""
+    img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), "black")
+    d = ImageDraw.Draw(img)
+    font = ImageFont.load_default()
+    font_atlas.text(d, (36, 52), "Mini OS", font=font, fill=(0, 255, 255))
+    font_atlas.text(d, (34, 68), "Starting...", font=font, fill=(255, 255, 255))
+    thread_safe_display(img)
+    mark_boot("first_frame")
+
+
+def boot_version():
+    """Return the git revision of the running code, or "unknown"."""
+    try:
+        return subprocess.check_output(
+            ["git", "describe", "--always", "--dirty"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            stderr=subprocess.DEVNULL,
+            text=True,
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def save_boot_times():
+    """Append this boot's stage timings to logs/boot.log as one JSON line."""
+    entry = {
+        "time": datetime.now().isoformat(timespec="seconds"),
+        "version": boot_version(),
+    }
+    entry.update(boot_times)
+    try:
+        os.makedirs(os.path.dirname(BOOT_LOG), exist_ok=True)
+        with open(BOOT_LOG, "a") as f:
+            f.write(json.dumps(entry) + "\n")
+    except Exception as e:
+        print(f"Failed to save boot times: {e}")
+
+
+show_splash()
 
 # --- Joystick and Button Configuration ---
 # GPIO setup using BCM numbering. Buttons are active LOW (pressed = low).
@@ -72,6 +154,16 @@ BUTTON_PINS = {
 for pin_name, pin_num in BUTTON_PINS.items():
     GPIO.setup(pin_num, GPIO.IN, pull_up_down=GPIO.PUD_UP)
 
+
+def attach_buttons(callback):
+    """Route edges on every button pin to ``callback``."""
+    for pin_num in BUTTON_PINS.values():
+        GPIO.remove_event_detect(pin_num)
+        # Detect both rising and falling edges to track press/release for robustness
+        GPIO.add_event_detect(pin_num, GPIO.BOTH, callback=callback, bouncetime=100)
+        # bouncetime in ms helps filter out noise.
+
+
 # Global dictionary to track button states (updated by callback)
 button_states = {name: False for name in BUTTON_PINS.keys()}
 last_event_time = {name: 0.0 for name in BUTTON_PINS.keys()}  # For basic debounce
@@ -134,10 +226,11 @@ def update_fonts():
     sizes = TEXT_SIZE_MAP.get(current_text_size, TEXT_SIZE_MAP["Medium"])
     font_path = AVAILABLE_FONTS.get(current_font_name, list(AVAILABLE_FONTS.values())[0])
     try:
-        font_small = ImageFont.truetype(font_path, sizes[0])
-        font_medium = ImageFont.truetype(font_path, sizes[1])
-        font_large = ImageFont.truetype(font_path, sizes[2])
-        font_tiny = ImageFont.truetype(font_path, TINY_FONT_SIZE)
+        # Faces are cached by font_atlas so switching back to a font is instant
+        font_small = font_atlas.load_font(font_path, sizes[0])
+        font_medium = font_atlas.load_font(font_path, sizes[1])
+        font_large = font_atlas.load_font(font_path, sizes[2])
+        font_tiny = font_atlas.load_font(font_path, TINY_FONT_SIZE)
     except IOError:
         print("Defaulting to built-in fonts.")
         font_small = ImageFont.load_default()
@@ -146,6 +239,14 @@ def update_fonts():
         font_tiny = ImageFont.load_default()
 
 
+def font_sizes():
+    """Return every point size the display can use."""
+    sizes = {TINY_FONT_SIZE}
+    for group in TEXT_SIZE_MAP.values():
+        sizes.update(group)
+    return sorted(sizes)
+
+
 update_fonts()
 
 # --- Color Schemes ---
@@ -247,25 +348,33 @@ def apply_color_scheme(name):
             menu_instance.draw()
 
 # --- Wi-Fi Status ---
-wifi_connected = False
-_wifi_check_time = 0
+# Menus that show the Wi-Fi icon and are redrawn when it changes
+STATUS_ICON_SCREENS = ("main_menu", "settings", "utilities", "games", "notes_menu", "bluetooth_menu")
 
 
 def is_wifi_connected():
     """Return True if the system is connected to Wi-Fi."""
-    global wifi_connected, _wifi_check_time
-    if time.time() - _wifi_check_time > 5:
-        _wifi_check_time = time.time()
-        try:
-            output = subprocess.check_output(
-                ["iwgetid", "-r"], stderr=subprocess.DEVNULL
-            ).decode().strip()
-            wifi_connected = bool(output)
-        except Exception:
-            wifi_connected = False
-    return wifi_connected
+    return net_monitor.is_connected()
 
 
+def wifi_bars():
+    """Return 0-4 signal bars for the status icon, or None when offline."""
+    state = net_monitor.state()
+    if not state["connected"]:
+        return None
+    return min(4, (state["signal"] or 0) // 20 + (1 if state["signal"] else 0))
+
+
+def on_network_change(state):
+    """Refresh the status icon and bring chat back once Wi-Fi returns."""
+    if menu_instance and menu_instance.current_screen in STATUS_ICON_SCREENS:
+        menu_instance.draw()
+    if state["connected"] and not irc.connected:
+        irc.reconnect_now()
+
+
+net_monitor.add_listener(on_network_change)
+
 
 # --- Backlight Control ---
 brightness_level = 100  # Percentage 0-100
@@ -335,6 +444,9 @@ IMAGES_DIR = os.path.join(os.path.dirname(__file__), "images")
 os.makedirs(IMAGES_DIR, exist_ok=True)
 gallery_images = []
 gallery_index = 0
+GALLERY_GRID_COLS = 4  # 4x4 thumbnails per page
+GALLERY_CELL = DISPLAY_WIDTH // GALLERY_GRID_COLS
+GALLERY_THUMB_SIZE = (GALLERY_CELL - 2, GALLERY_CELL - 2)
 
 # --- Notes Directory ---
 NOTES_DIR = os.path.join(os.path.dirname(__file__), "notes")
@@ -371,9 +483,10 @@ IRC_SERVER = "192.168.0.81"
 IRC_PORT = 6667
 IRC_CHANNEL = "#pet"
 IRC_NICK = "birdie"
-irc_socket = None
-irc_thread = None
-chat_messages = []
+# Bursts of messages within this many seconds are drawn as one frame
+CHAT_REDRAW_DELAY = 0.05
+chat_redraw_timer = None
+chat_redraw_lock = threading.Lock()
 
 # IRC typing state
 irc_typing = False
@@ -382,7 +495,6 @@ IRC_KEY_LAYOUTS = None  # defined after keyboard layouts
 irc_keyboard_state = 0
 
 # --- Bluetooth Pairing ---
-bt_pairing_proc = None
 bt_pairing_result = None
 bt_pairing_cancel = False
 
@@ -393,6 +505,10 @@ message_offset = 0
 message_max_offset = 0
 message_render = None
 
+# Text window shared by the scrolling note, story and message views
+SCROLL_VIEW_TOP = 25
+SCROLL_VIEW_H = DISPLAY_HEIGHT - 35
+
 
 def wrap_text(text, font, max_width, draw):
     """Return a list of lines wrapped to fit within max_width."""
@@ -435,12 +551,28 @@ def wrap_text(text, font, max_width, draw):
     return lines
 
 
+# Line heights and rendered menu pieces are cached per font and color scheme
+# so moving the selection only pastes strips that were drawn before.
+MENU_TOP = 25
+MENU_CACHE_SIZE = 256
+_line_heights = {}
+_menu_chrome = {}
+_menu_strips = {}
+
+
+def font_line_height(font):
+    """Return the height of a line of text ("Ag") in the given font."""
+    height = _line_heights.get(font)
+    if height is None:
+        height = font.getbbox("Ag")[3]
+        _line_heights[font] = height
+    return height
+
+
 def compute_max_visible_items(font):
     """Return the number of menu items that fit on the screen with the given font."""
-    dummy_img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT))
-    dummy_draw = ImageDraw.Draw(dummy_img)
-    line_height = dummy_draw.textbbox((0, 0), "Ag", font=font)[3]
-    available_height = DISPLAY_HEIGHT - 25  # Header height + initial offset
+    line_height = font_line_height(font)
+    available_height = DISPLAY_HEIGHT - MENU_TOP  # Header height + initial offset
     return max(1, available_height // (line_height + 4))
 
 
@@ -448,20 +580,65 @@ def compute_max_visible_items_from_lines(lines_list, font):
     """Return a safe item count given wrapped lines for each item."""
     if not lines_list:
         return compute_max_visible_items(font)
-    dummy_img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT))
-    dummy_draw = ImageDraw.Draw(dummy_img)
-    line_height = dummy_draw.textbbox((0, 0), "Ag", font=font)[3]
+    line_height = font_line_height(font)
     max_lines = max(len(lines) for lines in lines_list)
-    available_height = DISPLAY_HEIGHT - 25
+    available_height = DISPLAY_HEIGHT - MENU_TOP
     return max(1, available_height // (line_height * max_lines + 4))
 
 
+def menu_chrome(header_text, bars=None):
+    """Return the menu background with its header, separator and Wi-Fi icon drawn."""
+    key = (current_color_scheme_name, font_large, header_text, bars)
+    img = _menu_chrome.get(key)
+    if img is None:
+        img = Image.new('RGB', (DISPLAY_WIDTH, DISPLAY_HEIGHT), color=current_color_scheme["background"])
+        draw = ImageDraw.Draw(img)
+        font_atlas.text(draw, (5, 2), header_text, font=font_large, fill=current_color_scheme["header"])
+        draw.line([(0, 18), (DISPLAY_WIDTH, 18)], fill=current_color_scheme["text"])  # Separator line
+        if bars is not None:
+            for i in range(4):
+                x = DISPLAY_WIDTH - 12 + i * 3
+                color = current_color_scheme["header"] if i < bars else current_color_scheme["text"]
+                draw.rectangle((x, 14 - 3 * i, x + 1, 15), fill=color if i < bars else None, outline=color)
+        if len(_menu_chrome) >= MENU_CACHE_SIZE:
+            _menu_chrome.clear()
+        _menu_chrome[key] = img
+    return img
+
+
+def menu_strip(lines, font, selected):
+    """Return one rendered menu row, including the highlight when selected.
+
+    The strip starts 2px above the text so it covers the highlight box.
+    """
+    key = (current_color_scheme_name, font, lines, selected)
+    strip = _menu_strips.get(key)
+    if strip is None:
+        line_height = font_line_height(font)
+        height = line_height * len(lines) + 5
+        strip = Image.new('RGB', (DISPLAY_WIDTH, height), color=current_color_scheme["background"])
+        draw = ImageDraw.Draw(strip)
+        text_color = current_color_scheme["text"]
+        if selected:
+            text_color = current_color_scheme["highlight_text"]
+            draw.rectangle([(2, 0), (DISPLAY_WIDTH - 2, height - 1)], fill=current_color_scheme["highlight_bg"])
+        y_line = 2
+        for line in lines:
+            font_atlas.text(draw, (5, y_line), line, font=font, fill=text_color)
+            y_line += line_height
+        if len(_menu_strips) >= MENU_CACHE_SIZE:
+            _menu_strips.clear()
+        _menu_strips[key] = strip
+    return strip
+
+
 # --- Menu System ---
 class Menu:
     def __init__(self, items, font=font_medium):
         self.items = items
         self.selected_item = 0
         self.font = font
+        self._screen = None
         self.current_screen = "main_menu"  # Tracks which menu/screen is active
         self.view_start = 0  # First visible item index
         # Calculate how many items actually fit on the screen for the given font
@@ -469,69 +646,70 @@ class Menu:
         # Optional pre-wrapped item text for variable-height lists
         self.item_lines = None
 
+    @property
+    def current_screen(self):
+        return self._screen
+
+    @current_screen.setter
+    def current_screen(self, name):
+        # Every screen change goes through here, so it is journaled once
+        if name != self._screen:
+            journal.record("screen", name=name, previous=self._screen)
+        self._screen = name
+
     def draw(self):
         if self.current_screen == "font_menu":
             self.draw_font_menu()
             return
 
-        # Create a new blank image using the active background color
-        img = Image.new('RGB', (DISPLAY_WIDTH, DISPLAY_HEIGHT), color=current_color_scheme["background"])
-        draw = ImageDraw.Draw(img)
-
-        # Draw header
         header_text = "Mini-OS Menu"
         if self.current_screen in ("nyt_list", "nyt_headline"):
             header_text = "NYT Top Stories"
-        draw.text((5, 2), header_text, font=font_large, fill=current_color_scheme["header"])
-        # Draw a separator line under the header
-        draw.line([(0, 18), (DISPLAY_WIDTH, 18)], fill=current_color_scheme["text"])  # Separator line
-
-        y_offset = 25
-        line_height = draw.textbbox((0, 0), "Ag", font=self.font)[3]
-
+        elif self.current_screen == "wifi_list":
+            header_text = "Scanning..." if radio_scan.is_scanning("wifi") else "Wi-Fi Networks"
+        elif self.current_screen == "bluetooth_list":
+            header_text = "Scanning..." if radio_scan.is_scanning("bt") else "Bluetooth"
+        elif self.current_screen == "pico8_carts":
+            header_text = "Indexing..." if cart_index.is_scanning() else "Pico-8 Carts"
+        # Start from the cached header and paste one cached strip per row
+        bars = wifi_bars() if self.current_screen in STATUS_ICON_SCREENS else None
+        img = menu_chrome(header_text, bars).copy()
+        line_height = font_line_height(self.font)
+
+        rows = []
+        y_offset = MENU_TOP
         if self.current_screen == "bluetooth_list" and self.item_lines:
             for i in range(self.view_start, len(self.items)):
-                lines = self.item_lines[i]
+                lines = tuple(self.item_lines[i])
                 item_height = line_height * len(lines) + 4
                 if y_offset + item_height - 4 > DISPLAY_HEIGHT:
                     break
-                selected = i == self.selected_item
-                text_color = (
-                    current_color_scheme["highlight_text"] if selected else current_color_scheme["text"]
-                )
-                if selected:
-                    draw.rectangle(
-                        [(2, y_offset - 2), (DISPLAY_WIDTH - 2, y_offset + item_height - 2)],
-                        fill=current_color_scheme["highlight_bg"],
-                    )
-                y_line = y_offset
-                for line in lines:
-                    draw.text((5, y_line), line, font=self.font, fill=text_color)
-                    y_line += line_height
+                rows.append((i, lines, y_offset))
                 y_offset += item_height
         else:
             visible_items = self.items[self.view_start:self.view_start + self.max_visible_items]
             for idx, item in enumerate(visible_items):
-                i = self.view_start + idx
-                text_color = current_color_scheme["text"]
-
-                if i == self.selected_item:
-                    text_color = current_color_scheme["highlight_text"]
-                    draw.rectangle(
-                        [(2, y_offset - 2), (DISPLAY_WIDTH - 2, y_offset + line_height + 2)],
-                        fill=current_color_scheme["highlight_bg"],
-                    )
-
-                draw.text((5, y_offset), item, font=self.font, fill=text_color)
+                rows.append((self.view_start + idx, (item,), y_offset))
                 y_offset += line_height + 4  # Consistent line spacing
 
+        # The highlight box overlaps its neighbours by a pixel, so it goes last
+        selected_row = None
+        for i, lines, y in rows:
+            if i == self.selected_item:
+                selected_row = (lines, y)
+            else:
+                img.paste(menu_strip(lines, self.font, False), (0, y - 2))
+        if selected_row:
+            lines, y = selected_row
+            img.paste(menu_strip(lines, self.font, True), (0, y - 2))
+
         thread_safe_display(img) # Send the PIL image to the display
 
     def draw_font_menu(self):
         """Draw font selection menu with sample text."""
         img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color=current_color_scheme["background"])
         draw = ImageDraw.Draw(img)
-        draw.text((5, 2), "Select Font", font=font_large, fill=current_color_scheme["header"])
+        font_atlas.text(draw, (5, 2), "Select Font", font=font_large, fill=current_color_scheme["header"])
         draw.line([(0, 18), (DISPLAY_WIDTH, 18)], fill=current_color_scheme["text"])
 
         y_offset = 25
@@ -542,7 +720,7 @@ class Menu:
             sample_font = self.font
             if name in AVAILABLE_FONTS:
                 try:
-                    sample_font = ImageFont.truetype(
+                    sample_font = font_atlas.load_font(
                         AVAILABLE_FONTS[name],
                         TEXT_SIZE_MAP.get(current_text_size, TEXT_SIZE_MAP["Medium"])[1],
                     )
@@ -558,7 +736,7 @@ class Menu:
                 text = name
             else:
                 text = f"{name}: The quick brown fox"
-            draw.text((5, y_offset), text, font=sample_font, fill=text_color)
+            font_atlas.text(draw, (5, y_offset), text, font=sample_font, fill=text_color)
             y_offset += line_height + 4
 
         thread_safe_display(img)
@@ -581,13 +759,13 @@ class Menu:
     def display_message_screen(self, title, message, delay=3, clear_after=True):
         img = Image.new('RGB', (DISPLAY_WIDTH, DISPLAY_HEIGHT), color=current_color_scheme["background"])
         draw = ImageDraw.Draw(img)
-        draw.text((5, 5), title, font=font_large, fill=current_color_scheme["title"])
+        font_atlas.text(draw, (5, 5), title, font=font_large, fill=current_color_scheme["title"])
         max_width = DISPLAY_WIDTH - 10
         lines = wrap_text(message, font_medium, max_width, draw)
         y = 25
         line_height = draw.textbbox((0, 0), "A", font=font_medium)[3]
         for line in lines:
-            draw.text((5, y), line, font=font_medium, fill=current_color_scheme["text"])
+            font_atlas.text(draw, (5, y), line, font=font_medium, fill=current_color_scheme["text"])
             y += line_height + 2
         thread_safe_display(img)
         time.sleep(delay)
@@ -615,6 +793,7 @@ def button_event_handler(channel):
     if GPIO.input(channel) == GPIO.LOW:
         button_states[pin_name] = True
         press_start_time[pin_name] = current_time
+        journal.record("button", pin=pin_name, screen=menu_instance.current_screen)
         # print(f"[{datetime.now().strftime('%H:%M:%S')}] {pin_name} PRESSED!") # For debugging
 
         # Perform action based on the pressed button
@@ -700,19 +879,32 @@ def button_event_handler(channel):
                 )
             elif pin_name == "KEY1":
                 start_console()
+        elif menu_instance.current_screen == "pico8_carts":
+            if pin_name == "JOY_UP":
+                navigate_list("up")
+            elif pin_name == "JOY_DOWN":
+                navigate_list("down")
+            elif pin_name == "JOY_PRESS":
+                handle_pico8_carts_selection()
+            elif pin_name == "KEY2":
+                show_cart_label()
+            elif pin_name == "KEY1":
+                show_main_menu()
+        elif menu_instance.current_screen == "pico8_cart_label":
+            handle_cart_label_input(pin_name)
         elif menu_instance.current_screen == "wifi_list":
             if pin_name == "JOY_UP":
-                menu_instance.navigate("up")
+                navigate_list("up")
             elif pin_name == "JOY_DOWN":
-                menu_instance.navigate("down")
+                navigate_list("down")
             elif pin_name == "JOY_PRESS":
-                selection = menu_instance.get_selected_item()
-                if selection == "Back" or selection == "No Networks Found":
-                    show_settings_menu()
+                ssid, _ = radio_list_selection()
+                if ssid is None:
+                    leave_list(show_settings_menu)
                 else:
-                    connect_to_wifi(selection)
+                    leave_list(connect_to_wifi, ssid)
             elif pin_name == "KEY1":
-                show_settings_menu()
+                leave_list(show_settings_menu)
         elif menu_instance.current_screen == "bluetooth_menu":
             if pin_name == "JOY_UP":
                 menu_instance.navigate("up")
@@ -724,25 +916,19 @@ def button_event_handler(channel):
                 show_settings_menu()
         elif menu_instance.current_screen == "bluetooth_list":
             if pin_name == "JOY_UP":
-                menu_instance.navigate("up")
+                navigate_list("up")
             elif pin_name == "JOY_DOWN":
-                menu_instance.navigate("down")
-            elif pin_name == "JOY_PRESS":
-                selection = menu_instance.get_selected_item()
-                if selection == "Back" or selection == "No Devices Found":
-                    show_settings_menu()
-            elif pin_name == "KEY1":
-                selection = menu_instance.get_selected_item()
-                if selection == "Back" or selection == "No Devices Found":
-                    show_settings_menu()
-                else:
-                    connect_bluetooth_device(selection)
-            elif pin_name == "KEY2":
-                selection = menu_instance.get_selected_item()
-                if selection == "Back" or selection == "No Devices Found":
-                    show_settings_menu()
-                else:
-                    connect_bluetooth_device_with_pin(selection)
+                navigate_list("down")
+            elif pin_name in ("JOY_PRESS", "KEY1", "KEY2"):
+                address, label = radio_list_selection()
+                if address is None:
+                    leave_list(show_settings_menu)
+                elif pin_name in ("KEY1", "KEY2"):
+                    connect = connect_bluetooth_device if pin_name == "KEY1" else connect_bluetooth_device_with_pin
+                    leave_list(connect, label)
+                    if menu_instance.current_screen == "leaving_list":
+                        # Connected; nothing else took over the screen
+                        show_radio_list("bt", keep_selection=True)
         elif menu_instance.current_screen == "bluetooth_pairing":
             if pin_name == "KEY1":
                 global bt_pairing_cancel
@@ -765,6 +951,9 @@ def button_event_handler(channel):
                 handle_utilities_selection(menu_instance.get_selected_item())
             elif pin_name == "KEY1":
                 show_main_menu()
+        elif menu_instance.current_screen == "profiler":
+            if pin_name in BUTTON_PINS:
+                handle_profiler_input(pin_name)
         elif menu_instance.current_screen == "weather":
             if pin_name in BUTTON_PINS:
                 handle_weather_input(pin_name)
@@ -789,6 +978,9 @@ def button_event_handler(channel):
                 view_note(menu_instance.get_selected_item())
             elif pin_name == "KEY3":
                 show_main_menu()
+        elif menu_instance.current_screen == "notes_search":
+            if pin_name in BUTTON_PINS:
+                handle_notes_search_input(pin_name)
         elif menu_instance.current_screen == "note_view":
             if pin_name == "JOY_UP":
                 scroll_note(-1)
@@ -797,8 +989,7 @@ def button_event_handler(channel):
             elif pin_name == "KEY1":
                 if current_note_file:
                     try:
-                        with open(os.path.join(NOTES_DIR, current_note_file), "r") as f:
-                            text = f.read()
+                        text = notes_store.read(current_note_file)
                     except Exception:
                         text = ""
                     start_notes(text, current_note_file)
@@ -834,42 +1025,9 @@ def button_event_handler(channel):
         elif menu_instance.current_screen == "launch_codes":
             if pin_name in BUTTON_PINS:
                 handle_launch_input(pin_name)
-        elif menu_instance.current_screen == "snake":
-            if pin_name in BUTTON_PINS:
-                handle_snake_input(pin_name)
-        elif menu_instance.current_screen == "tetris":
-            if pin_name in BUTTON_PINS:
-                handle_tetris_input(pin_name)
-        elif menu_instance.current_screen == "rps":
-            if pin_name in BUTTON_PINS:
-                handle_rps_input(pin_name)
-        elif menu_instance.current_screen == "space_invaders":
+        elif active_game and menu_instance.current_screen == active_game:
             if pin_name in BUTTON_PINS:
-                handle_space_invaders_input(pin_name)
-        elif menu_instance.current_screen == "vet_adventure":
-            if pin_name in BUTTON_PINS:
-                handle_vet_adventure_input(pin_name)
-        elif menu_instance.current_screen == "axe":
-            if pin_name in BUTTON_PINS:
-                handle_axe_input(pin_name)
-        elif menu_instance.current_screen == "trivia":
-            if pin_name in BUTTON_PINS:
-                handle_trivia_input(pin_name)
-        elif menu_instance.current_screen == "two_player_trivia":
-            if pin_name in BUTTON_PINS:
-                handle_two_player_trivia_input(pin_name)
-        elif menu_instance.current_screen == "hack_in":
-            if pin_name in BUTTON_PINS:
-                handle_hack_in_input(pin_name)
-        elif menu_instance.current_screen == "pico_wow":
-            if pin_name in BUTTON_PINS:
-                handle_pico_wow_input(pin_name)
-        elif menu_instance.current_screen == "gta_1997":
-            if pin_name in BUTTON_PINS:
-                handle_gta_1997_input(pin_name)
-        elif menu_instance.current_screen == "doctor_mode":
-            if pin_name in BUTTON_PINS:
-                handle_doctor_mode_input(pin_name)
+                handle_game_module_input(pin_name)
         elif menu_instance.current_screen == "notes":
             if pin_name in BUTTON_PINS:
                 handle_notes_input(pin_name)
@@ -883,8 +1041,11 @@ def button_event_handler(channel):
             if pin_name in BUTTON_PINS:
                 handle_sudo_password_input(pin_name)
         elif menu_instance.current_screen == "image_gallery":
-            if pin_name in ["JOY_LEFT", "JOY_RIGHT", "JOY_PRESS"]:
+            if pin_name in ["JOY_LEFT", "JOY_RIGHT", "JOY_PRESS", "KEY1"]:
                 handle_gallery_input(pin_name)
+        elif menu_instance.current_screen == "gallery_grid":
+            if pin_name in BUTTON_PINS:
+                handle_gallery_grid_input(pin_name)
         elif menu_instance.current_screen == "scroll_message":
             if pin_name == "JOY_UP":
                 scroll_message(-1)
@@ -990,6 +1151,8 @@ def start_image_gallery():
     gallery_index = 0
     menu_instance.current_screen = "image_gallery"
     show_gallery_image()
+    # Build thumbnails in the background so the grid opens without decoding
+    gallery_cache.prefetch([os.path.join(IMAGES_DIR, f) for f in gallery_images], GALLERY_THUMB_SIZE)
 
 
 def show_gallery_image():
@@ -998,12 +1161,36 @@ def show_gallery_image():
         return
     path = os.path.join(IMAGES_DIR, gallery_images[gallery_index])
     try:
-        img = Image.open(path).convert("RGB")
-        img = img.resize((DISPLAY_WIDTH, DISPLAY_HEIGHT))
+        img = gallery_cache.get(path, (DISPLAY_WIDTH, DISPLAY_HEIGHT))
     except Exception:
         img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), "black")
         draw = ImageDraw.Draw(img)
-        draw.text((5, 5), "Load error", font=font_small, fill=(255, 0, 0))
+        font_atlas.text(draw, (5, 5), "Load error", font=font_small, fill=(255, 0, 0))
+    thread_safe_display(img)
+    # Warm the images a left or right press will show next
+    count = len(gallery_images)
+    neighbours = [(gallery_index + step) % count for step in (1, -1, 2, -2)]
+    gallery_cache.prefetch(
+        [os.path.join(IMAGES_DIR, gallery_images[i]) for i in dict.fromkeys(neighbours) if i != gallery_index]
+    )
+
+
+def draw_gallery_grid():
+    """Show a page of thumbnails with the current image outlined."""
+    per_page = GALLERY_GRID_COLS * GALLERY_GRID_COLS
+    size = GALLERY_CELL
+    page_start = (gallery_index // per_page) * per_page
+    img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), "black")
+    draw = ImageDraw.Draw(img)
+    for slot, name in enumerate(gallery_images[page_start:page_start + per_page]):
+        x = (slot % GALLERY_GRID_COLS) * size
+        y = (slot // GALLERY_GRID_COLS) * size
+        try:
+            img.paste(gallery_cache.get(os.path.join(IMAGES_DIR, name), GALLERY_THUMB_SIZE), (x + 1, y + 1))
+        except Exception:
+            draw.line([(x + 1, y + 1), (x + size - 2, y + size - 2)], fill=(255, 0, 0))
+        if page_start + slot == gallery_index:
+            draw.rectangle([(x, y), (x + size - 1, y + size - 1)], outline=current_color_scheme["highlight_text"])
     thread_safe_display(img)
 
 
@@ -1016,19 +1203,47 @@ def handle_gallery_input(pin_name):
     elif pin_name == "JOY_RIGHT":
         gallery_index = (gallery_index + 1) % len(gallery_images)
         show_gallery_image()
+    elif pin_name == "KEY1":
+        menu_instance.current_screen = "gallery_grid"
+        draw_gallery_grid()
     elif pin_name == "JOY_PRESS":
         show_main_menu()
 
 
+def handle_gallery_grid_input(pin_name):
+    """Move the grid selection, open an image, or go back to the menu."""
+    global gallery_index
+    count = len(gallery_images)
+    if pin_name == "JOY_LEFT":
+        gallery_index = (gallery_index - 1) % count
+    elif pin_name == "JOY_RIGHT":
+        gallery_index = (gallery_index + 1) % count
+    elif pin_name == "JOY_UP":
+        gallery_index = (gallery_index - GALLERY_GRID_COLS) % count
+    elif pin_name == "JOY_DOWN":
+        gallery_index = (gallery_index + GALLERY_GRID_COLS) % count
+    elif pin_name in ("JOY_PRESS", "KEY1"):
+        menu_instance.current_screen = "image_gallery"
+        show_gallery_image()
+        return
+    elif pin_name == "KEY3":
+        show_main_menu()
+        return
+    draw_gallery_grid()
+
+
 def show_top_stories():
     """Fetch NYT top stories and show the first headline."""
+    import requests
     stop_scrolling()
     global nyt_stories
     try:
-        resp = requests.get(
-            f"https://api.nytimes.com/svc/topstories/v2/home.json?api-key={NYT_API_KEY}",
-            timeout=5,
-        )
+        with journal.timed("net", host="api.nytimes.com") as event:
+            resp = requests.get(
+                f"https://api.nytimes.com/svc/topstories/v2/home.json?api-key={NYT_API_KEY}",
+                timeout=5,
+            )
+            event["status"] = resp.status_code
         data = resp.json()
         nyt_stories = data.get("results", [])[:20]
     except Exception:
@@ -1054,13 +1269,13 @@ def draw_headline(index):
     max_width = DISPLAY_WIDTH - 10
     lines = wrap_text(title, font_medium, max_width, draw)
     line_h = draw.textbbox((0, 0), "A", font=font_medium)[3] + 2
-    draw.text((5, 5), "NYT Top Stories", font=font_large, fill=(255, 255, 0))
+    font_atlas.text(draw, (5, 5), "NYT Top Stories", font=font_large, fill=(255, 255, 0))
     y = 25
     for line in lines:
-        draw.text((5, y), line, font=font_medium, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, y), line, font=font_medium, fill=(255, 255, 255))
         y += line_h
     footer = f"{index + 1}/{len(nyt_stories)} 1=Read 3=Back"
-    draw.text((5, DISPLAY_HEIGHT - 10), footer, font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), footer, font=font_small, fill=(0, 255, 255))
     device.display(img)
 
 
@@ -1080,19 +1295,18 @@ def draw_story_detail(index):
     story_lines = wrap_text(text, font_small, max_width, dummy_draw)
     story_line_h = dummy_draw.textbbox((0, 0), "A", font=font_small)[3] + 2
     story_offset = 0
-    available_h = DISPLAY_HEIGHT - 35
-    story_max_offset = max(0, len(story_lines) * story_line_h - available_h)
+    surface = TextSurface(story_lines, font_small, story_line_h, DISPLAY_WIDTH)
+    story_max_offset = surface.max_offset(SCROLL_VIEW_H)
+
+    # Title and footer are drawn once; each step only repaints the text window
+    img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
+    draw = ImageDraw.Draw(img)
+    font_atlas.text(draw, (5, 5), header, font=font_large, fill=(255, 255, 0))
+    # Only show the back hint; opening a link isn't supported here
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "1=Menu 3=Back", font=font_small, fill=(0, 255, 255))
 
     def render():
-        img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
-        draw = ImageDraw.Draw(img)
-        draw.text((5, 5), header, font=font_large, fill=(255, 255, 0))
-        y = 25 - story_offset
-        for line in story_lines:
-            draw.text((5, y), line, font=font_small, fill=(255, 255, 255))
-            y += story_line_h
-        # Only show the back hint; opening a link isn't supported here
-        draw.text((5, DISPLAY_HEIGHT - 10), "1=Menu 3=Back", font=font_small, fill=(0, 255, 255))
+        surface.paste_window(img, (0, SCROLL_VIEW_TOP), story_offset, SCROLL_VIEW_H)
         device.display(img)
 
     story_render = render
@@ -1114,6 +1328,7 @@ def scroll_story(direction):
 
 def open_current_story():
     """Open the currently displayed story URL in a browser."""
+    import webbrowser
     if not nyt_stories:
         return
     story = nyt_stories[current_story_index]
@@ -1125,128 +1340,160 @@ def open_current_story():
             pass
 
 
-def show_wifi_networks():
-    """Scan for Wi-Fi networks and display them in a menu."""
-    stop_scrolling()
+RADIO_LIST_SCREENS = {"wifi": "wifi_list", "bt": "bluetooth_list"}
+# SSID or address for each row of the Wi-Fi/Bluetooth list, None for Back
+radio_list_ids = []
+radio_list_drawn = 0.0
+# Held while a list is rebuilt by a background listener (scan results, cart
+# index) and while the button handler reads or moves the selection
+list_lock = threading.RLock()
 
-    def scan_networks():
-        nets = []
-        try:
-            # Trigger a fresh scan then list SSIDs with NetworkManager
-            subprocess.run([
-                "nmcli",
-                "device",
-                "wifi",
-                "rescan",
-            ], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
-            output = subprocess.check_output([
-                "nmcli",
-                "-t",
-                "-f",
-                "ssid",
-                "device",
-                "wifi",
-                "list",
-            ], stderr=subprocess.DEVNULL).decode()
-            nets = [line for line in output.splitlines() if line]
-        except Exception:
-            # Fallback to iwlist if nmcli isn't available
-            try:
-                output = subprocess.check_output(
-                    ["iwlist", "wlan0", "scan"], stderr=subprocess.DEVNULL
-                ).decode()
-                nets = re.findall(r'ESSID:"([^"]+)"', output)
-            except Exception:
-                nets = []
-        return sorted(set(nets))
 
-    networks = scan_networks()
+def navigate_list(direction):
+    with list_lock:
+        menu_instance.navigate(direction)
 
-    if not networks:
-        networks = ["No Networks Found"]
 
-    networks.append("Back")
-    menu_instance.items = networks
-    menu_instance.selected_item = 0
-    menu_instance.view_start = 0
-    menu_instance.current_screen = "wifi_list"
+def leave_list(action, *args):
+    """Move off a list screen under ``list_lock``, then run ``action(*args)``.
+
+    Once the screen has changed, a scan update that was about to rebuild
+    the list sees that and leaves the display to ``action``.
+    """
+    with list_lock:
+        menu_instance.current_screen = "leaving_list"
+    action(*args)
+
+
+def radio_list_selection():
+    """Return (id, label) of the highlighted Wi-Fi/Bluetooth row, read together."""
+    with list_lock:
+        index = menu_instance.selected_item
+        return radio_list_ids[index], menu_instance.items[index]
+
+
+def format_age(seconds):
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    return f"{int(seconds // 60)}m"
+
+
+def radio_list_items(kind):
+    """Build menu labels and matching ids from the scan cache."""
+    entries = radio_scan.results(kind)
+    items, ids = [], []
+    for e in entries:
+        age = f" {format_age(e['age'])}" if e["age"] >= 30 else ""
+        if kind == "wifi":
+            strength = f" {e['strength']}%" if e["strength"] is not None else ""
+            items.append(f"{e['name']}{strength}{age}")
+        else:
+            strength = f" {e['strength']}dBm" if e["strength"] is not None else ""
+            # The address stays last; the connect helpers parse it from the label
+            items.append(f"{e['name']}{strength}{age} ({e['id']})")
+        ids.append(e["id"])
+    if not items:
+        if radio_scan.is_scanning(kind):
+            items.append("Searching...")
+        else:
+            items.append("No Networks Found" if kind == "wifi" else "No Devices Found")
+        ids.append(None)
+    items.append("Back")
+    ids.append(None)
+    return items, ids
+
+
+def show_radio_list(kind, keep_selection=False):
+    """Show cached scan results for ``kind``, keeping the highlighted entry in place."""
+    with list_lock:
+        _show_radio_list(kind, keep_selection)
+
+
+def _show_radio_list(kind, keep_selection):
+    global radio_list_ids, radio_list_drawn
+    selected_id = None
+    if keep_selection and radio_list_ids and menu_instance.selected_item < len(radio_list_ids):
+        selected_id = radio_list_ids[menu_instance.selected_item]
+    items, radio_list_ids = radio_list_items(kind)
+    menu_instance.items = items
+    if selected_id in radio_list_ids:
+        menu_instance.selected_item = radio_list_ids.index(selected_id)
+    else:
+        menu_instance.selected_item = min(menu_instance.selected_item if keep_selection else 0, len(items) - 1)
+    if kind == "bt":
+        menu_instance.font = font_small
+        dummy_img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT))
+        dummy_draw = ImageDraw.Draw(dummy_img)
+        menu_instance.item_lines = [
+            wrap_text(d, menu_instance.font, DISPLAY_WIDTH - 10, dummy_draw) for d in items
+        ]
+        menu_instance.max_visible_items = compute_max_visible_items_from_lines(
+            menu_instance.item_lines, menu_instance.font
+        )
+    else:
+        menu_instance.max_visible_items = compute_max_visible_items(menu_instance.font)
+    if not keep_selection:
+        menu_instance.view_start = 0
+    if menu_instance.selected_item < menu_instance.view_start:
+        menu_instance.view_start = menu_instance.selected_item
+    elif menu_instance.selected_item >= menu_instance.view_start + menu_instance.max_visible_items:
+        menu_instance.view_start = menu_instance.selected_item - menu_instance.max_visible_items + 1
+    menu_instance.current_screen = RADIO_LIST_SCREENS[kind]
+    radio_list_drawn = time.monotonic()
     menu_instance.draw()
 
 
+def on_radio_results(kind):
+    """Refresh an open Wi-Fi or Bluetooth list as scan results arrive."""
+    with list_lock:
+        if menu_instance.current_screen != RADIO_LIST_SCREENS[kind]:
+            return
+        # Results can arrive in bursts; redraw at most a few times a second
+        if radio_scan.is_scanning(kind) and time.monotonic() - radio_list_drawn < 0.3:
+            return
+        show_radio_list(kind, keep_selection=True)
+
+
+radio_scan.add_listener(on_radio_results)
+
+
+def show_wifi_networks():
+    """List Wi-Fi networks from the scan cache and refresh it in the background."""
+    stop_scrolling()
+    radio_scan.scan("wifi")
+    show_radio_list("wifi")
+
+
 def show_bluetooth_devices():
-    """Scan for Bluetooth devices and display them in a menu."""
+    """List Bluetooth devices from the scan cache and refresh it in the background."""
     stop_scrolling()
+    radio_scan.scan("bt")
+    show_radio_list("bt")
 
-    def scan_devices():
-        devs = {}
-        # Attempt a bluetoothctl scan first for better compatibility
-        try:
-            output = subprocess.check_output(
-                ["bluetoothctl", "--timeout", "5", "scan", "on"],
-                stderr=subprocess.STDOUT,
-            ).decode()
-            output += subprocess.check_output(["bluetoothctl", "devices"]).decode()
-            for line in output.splitlines():
-                m = re.search(r"Device\s+([0-9A-F:]{17})\s+(.+)", line.strip())
-                if m:
-                    addr, name = m.groups()
-                    devs[addr] = name
-        except Exception:
-            # Fallback to hcitool if bluetoothctl is unavailable
-            try:
-                output = subprocess.check_output(
-                    ["hcitool", "scan"], stderr=subprocess.DEVNULL
-                ).decode()
-                for line in output.splitlines():
-                    m = re.search(r"([0-9A-F:]{17})\s+(.+)", line.strip())
-                    if m:
-                        addr, name = m.groups()
-                        devs[addr] = name
-            except Exception:
-                devs = {}
-        # Display device names before their addresses for easier identification
-        # Sort the list alphabetically by device name for convenience
-        return [f"{name} ({addr})" for addr, name in sorted(devs.items(), key=lambda item: item[1])]
-
-    devices = []
-
-    def do_scan():
-        nonlocal devices
-        devices = scan_devices()
-
-    scan_thread = threading.Thread(target=do_scan)
-    scan_thread.start()
 
+def wait_for_bluetooth(op, message):
+    """Animate ``message`` on screen until a Bluetooth operation finishes."""
     dot_cycle = ["", ".", "..", "..."]
     idx = 0
-    while scan_thread.is_alive():
-        msg = f"Searching for bluetooth devices{dot_cycle[idx % len(dot_cycle)]}"
-        menu_instance.display_message_screen("Bluetooth", msg, delay=0.5, clear_after=False)
+    while not op.done.is_set():
+        menu_instance.display_message_screen(
+            "Bluetooth", f"{message}{dot_cycle[idx % len(dot_cycle)]}", delay=0.5, clear_after=False
+        )
         idx += 1
-    scan_thread.join()
+    return op.ok
 
-    if not devices:
-        devices = ["No Devices Found"]
 
-    devices.append("Back")
-    menu_instance.items = devices
-    menu_instance.selected_item = 0
-    menu_instance.view_start = 0
-    menu_instance.font = font_small
-    dummy_img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT))
-    dummy_draw = ImageDraw.Draw(dummy_img)
-    menu_instance.item_lines = [
-        wrap_text(d, menu_instance.font, DISPLAY_WIDTH - 10, dummy_draw) for d in devices
-    ]
-    menu_instance.max_visible_items = compute_max_visible_items_from_lines(
-        menu_instance.item_lines, menu_instance.font
-    )
-    menu_instance.current_screen = "bluetooth_list"
-    menu_instance.draw()
+def report_bluetooth_result(op, device):
+    if op.ok:
+        menu_instance.display_message_screen("Bluetooth", f"Connected to {device}", delay=3)
+        return
+    details = f"Failed to connect to {device}.\n{op.error or ''}\n{op.details()}".strip()
+    save_bt_failure(details)
+    show_scroll_message("Bluetooth Error", details)
 
 
 def connect_bluetooth_device(device):
-    """Attempt to connect to the selected Bluetooth device using bluetoothctl.
+    """Connect to the selected Bluetooth device through the Bluetooth session.
 
     The device must already be paired or the connection will likely fail.
     Use ``connect_bluetooth_device_with_pin`` to pair and trust new devices.
@@ -1255,35 +1502,9 @@ def connect_bluetooth_device(device):
     if not m:
         menu_instance.display_message_screen("Bluetooth", "Invalid device", delay=2)
         return
-    addr = m.group(1)
-    bt_commands = f"connect {addr}\nquit\n"
-    try:
-        result = subprocess.run(
-            ["bluetoothctl"],
-            input=bt_commands,
-            text=True,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        output = result.stdout.strip()
-        if "Connection successful" in output:
-            menu_instance.display_message_screen("Bluetooth", f"Connected to {device}", delay=3)
-        else:
-            details = output or "Connection attempt did not return a success message."
-            details = f"Failed to connect to {device}.\n{details}"
-            save_bt_failure(details)
-            show_scroll_message("Bluetooth Error", details)
-    except subprocess.CalledProcessError as e:
-        stdout = e.stdout.decode().strip() if e.stdout else ""
-        stderr = e.stderr.decode().strip() if e.stderr else ""
-        details = "\n".join(filter(None, [stdout, stderr])).strip()
-        if not details:
-            details = "Failed to connect. Ensure the device is in pairing mode and in range."
-        else:
-            details = f"Failed to connect to {device}.\n{details}"
-        save_bt_failure(details)
-        show_scroll_message("Bluetooth Error", details)
+    op = bt_manager.connect(m.group(1))
+    wait_for_bluetooth(op, "Connecting")
+    report_bluetooth_result(op, device)
 
 
 def connect_bluetooth_device_with_pin(device):
@@ -1292,129 +1513,64 @@ def connect_bluetooth_device_with_pin(device):
     if not m:
         menu_instance.display_message_screen("Bluetooth", "Invalid device", delay=2)
         return
-    addr = m.group(1)
-    # Prepare a bluetoothctl command sequence that confirms the passkey
-    bt_commands = f"pair {addr}\nyes\ntrust {addr}\nconnect {addr}\nquit\n"
-    try:
-        result = subprocess.run(
-            ["bluetoothctl"],
-            input=bt_commands,
-            text=True,
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
-        output = result.stdout.strip()
-        if "Connection successful" in output:
-            menu_instance.display_message_screen("Bluetooth", f"Connected to {device}", delay=3)
-        else:
-            details = output or "Connection attempt did not return a success message."
-            details = f"Failed to connect to {device}.\n{details}"
-            save_bt_failure(details)
-            show_scroll_message("Bluetooth Error", details)
-    except subprocess.CalledProcessError as e:
-        stdout = e.stdout.decode().strip() if e.stdout else ""
-        stderr = e.stderr.decode().strip() if e.stderr else ""
-        details = "\n".join(filter(None, [stdout, stderr])).strip()
-        if not details:
-            details = "Failed to connect. Ensure the device is in pairing mode and in range."
-        else:
-            details = f"Failed to connect to {device}.\n{details}"
-        save_bt_failure(details)
-        show_scroll_message("Bluetooth Error", details)
+    op = bt_manager.pair_and_connect(m.group(1))
+    wait_for_bluetooth(op, "Pairing")
+    report_bluetooth_result(op, device)
 
 
 def start_bluetooth_pairing():
     """Make the device discoverable and wait for an incoming Bluetooth connection."""
     stop_scrolling()
-    global bt_pairing_proc, bt_pairing_result, bt_pairing_cancel
+    global bt_pairing_result, bt_pairing_cancel
     bt_pairing_result = None
     bt_pairing_cancel = False
 
-    def pair_thread():
-        """Run bluetoothctl and monitor output until a connection or cancel."""
-        global bt_pairing_proc, bt_pairing_result
-        try:
-            bt_pairing_proc = subprocess.Popen(
-                ["bluetoothctl"],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
-                bufsize=1,
-            )
-            setup_cmds = (
-                "power on\n"
-                "agent NoInputNoOutput\n"
-                "default-agent\n"
-                "pairable on\n"
-                "discoverable on\n"
-            )
-            bt_pairing_proc.stdin.write(setup_cmds)
-            bt_pairing_proc.stdin.flush()
-
-            last_addr = None
-            while True:
-                if bt_pairing_cancel:
-                    break
-                rlist, _, _ = select.select([bt_pairing_proc.stdout], [], [], 0.5)
-                if rlist:
-                    line = bt_pairing_proc.stdout.readline()
-                    if not line:
-                        break
-                    line = line.strip()
-                    m = re.search(r"([0-9A-F:]{17})", line)
-                    if m:
-                        last_addr = m.group(1)
-                    lower = line.lower()
-                    if any(x in lower for x in ["confirm passkey", "request confirmation", "authorize service"]):
-                        try:
-                            bt_pairing_proc.stdin.write("yes\n")
-                            bt_pairing_proc.stdin.flush()
-                        except Exception:
-                            pass
-                    if "connection successful" in lower or "pairing successful" in lower or "paired: yes" in lower:
-                        if last_addr:
-                            try:
-                                bt_pairing_proc.stdin.write(f"trust {last_addr}\n")
-                                bt_pairing_proc.stdin.flush()
-                            except Exception:
-                                pass
-                        bt_pairing_result = True
-                        break
-                    elif any(word in lower for word in ["failed", "error"]):
-                        bt_pairing_result = False
-                        break
-        except Exception:
+    # Connections only count once they outlast SHORT_CONNECTION; a quicker
+    # drop is reported by bt_manager as a failed incoming attempt instead
+    connected_at = {}
+
+    def succeed(address):
+        global bt_pairing_result
+        # Trust the new device so it can reconnect without pairing mode
+        bt_manager.trust(address)
+        bt_pairing_result = True
+
+    def on_event(event):
+        global bt_pairing_result
+        if event["type"] == "paired":
+            succeed(event["address"])
+        elif event["type"] == "connected":
+            connected_at[event["address"]] = time.monotonic()
+        elif event["type"] == "disconnected":
+            connected_at.pop(event["address"], None)
+        elif event["type"] == "failure" and event["op"] == "incoming":
             bt_pairing_result = False
-        finally:
-            if bt_pairing_proc and bt_pairing_proc.poll() is None:
-                try:
-                    bt_pairing_proc.stdin.write(
-                        "discoverable off\npairable off\nquit\n"
-                    )
-                    bt_pairing_proc.stdin.flush()
-                except Exception:
-                    pass
-                bt_pairing_proc.terminate()
-            bt_pairing_proc = None
-
-    t = threading.Thread(target=pair_thread)
-    t.start()
 
+    bt_manager.add_listener(on_event)
+    bt_manager.set_pairing_mode(True)
     menu_instance.current_screen = "bluetooth_pairing"
     dot_cycle = ["", ".", "..", "..."]
     idx = 0
-    while t.is_alive() and not bt_pairing_cancel:
-        msg = (
-            f"Waiting for connection{dot_cycle[idx % len(dot_cycle)]}\n"
-            "Press KEY1 to cancel"
-        )
-        menu_instance.display_message_screen(
-            "Bluetooth", msg, delay=0.5, clear_after=False
-        )
-        idx += 1
-    t.join()
+    try:
+        while bt_pairing_result is None and not bt_pairing_cancel:
+            for address, since in list(connected_at.items()):
+                if time.monotonic() - since >= bt_manager.SHORT_CONNECTION:
+                    connected_at.pop(address, None)
+                    succeed(address)
+                    break
+            if bt_pairing_result is not None:
+                break
+            msg = (
+                f"Waiting for connection{dot_cycle[idx % len(dot_cycle)]}\n"
+                "Press KEY1 to cancel"
+            )
+            menu_instance.display_message_screen(
+                "Bluetooth", msg, delay=0.5, clear_after=False
+            )
+            idx += 1
+    finally:
+        bt_manager.remove_listener(on_event)
+        bt_manager.set_pairing_mode(False)
 
     if bt_pairing_cancel:
         menu_instance.display_message_screen("Bluetooth", "Pairing cancelled", delay=2)
@@ -1426,17 +1582,39 @@ def start_bluetooth_pairing():
     show_settings_menu()
 
 
+def run_nmcli(args, message):
+    """Run nmcli in the background while animating ``message``; return (ok, error text)."""
+    proc = subprocess.Popen(["nmcli"] + args, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    dot_cycle = ["", ".", "..", "..."]
+    idx = 0
+    while proc.poll() is None:
+        menu_instance.display_message_screen(
+            "Wi-Fi", f"{message}{dot_cycle[idx % len(dot_cycle)]}", delay=0.5, clear_after=False
+        )
+        idx += 1
+    _, err = proc.communicate()
+    return proc.returncode == 0, err.strip()
+
+
 def connect_to_wifi(ssid):
     """Attempt to connect to the given SSID using nmcli."""
     password = os.environ.get("MINI_OS_WIFI_PASSWORD")
-    cmd = ["nmcli", "device", "wifi", "connect", ssid]
+    args = ["device", "wifi", "connect", ssid]
     if password:
-        cmd.extend(["password", password])
+        args.extend(["password", password])
 
     try:
-        subprocess.run(cmd, check=True)
-        menu_instance.display_message_screen("Wi-Fi", f"Connected to {ssid}", delay=3)
-    except Exception:
+        ok, _ = run_nmcli(args, f"Connecting to {ssid}")
+    except OSError:
+        ok = False
+    if ok:
+        # nmcli returns once associated; the monitor reports the address when DHCP finishes
+        deadline = time.time() + 10
+        while time.time() < deadline and not (net_monitor.is_connected() and net_monitor.state()["ssid"] == ssid):
+            time.sleep(0.2)
+        ip = net_monitor.state()["ip"] or "no address yet"
+        menu_instance.display_message_screen("Wi-Fi", f"Connected to {ssid}\n{ip}", delay=3)
+    else:
         menu_instance.display_message_screen("Wi-Fi", f"Failed to connect to {ssid}", delay=3)
 
     show_wifi_networks()
@@ -1444,21 +1622,15 @@ def connect_to_wifi(ssid):
 
 def toggle_wifi():
     """Toggle the Wi-Fi radio state using nmcli."""
+    new_state = "off" if net_monitor.radio_enabled() else "on"
     try:
-        status = subprocess.check_output(["nmcli", "radio", "wifi"]).decode().strip()
-        new_state = "off" if status == "enabled" else "on"
-        subprocess.run(
-            ["nmcli", "radio", "wifi", new_state],
-            check=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-        )
+        ok, err = run_nmcli(["radio", "wifi", new_state], f"Turning Wi-Fi {new_state}")
+    except OSError as e:
+        ok, err = False, str(e)
+    if ok:
         menu_instance.display_message_screen("Wi-Fi", f"Wi-Fi {new_state}", delay=2)
-    except subprocess.CalledProcessError as e:
-        err = e.stderr.decode().strip() if e.stderr else str(e)
+    else:
         show_scroll_message("Wi-Fi Error", err or "Toggle failed")
-    except Exception as e:
-        show_scroll_message("Wi-Fi Error", str(e))
 
 
 def show_scroll_message(title, message):
@@ -1472,18 +1644,17 @@ def show_scroll_message(title, message):
     message_lines = wrap_text(message, font_small, max_width, dummy_draw)
     message_line_h = dummy_draw.textbbox((0, 0), "A", font=font_small)[3] + 2
     message_offset = 0
-    available_h = DISPLAY_HEIGHT - 35
-    message_max_offset = max(0, len(message_lines) * message_line_h - available_h)
+    surface = TextSurface(message_lines, font_small, message_line_h, DISPLAY_WIDTH)
+    message_max_offset = surface.max_offset(SCROLL_VIEW_H)
+
+    # Title and footer are drawn once; each step only repaints the text window
+    img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
+    draw = ImageDraw.Draw(img)
+    font_atlas.text(draw, (5, 5), title, font=font_large, fill=(255, 255, 0))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "1=Menu 3=Back", font=font_small, fill=(0, 255, 255))
 
     def render():
-        img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
-        draw = ImageDraw.Draw(img)
-        draw.text((5, 5), title, font=font_large, fill=(255, 255, 0))
-        y = 25 - message_offset
-        for line in message_lines:
-            draw.text((5, y), line, font=font_small, fill=(255, 255, 255))
-            y += message_line_h
-        draw.text((5, DISPLAY_HEIGHT - 10), "1=Menu 3=Back", font=font_small, fill=(0, 255, 255))
+        surface.paste_window(img, (0, SCROLL_VIEW_TOP), message_offset, SCROLL_VIEW_H)
         thread_safe_display(img)
 
     message_render = render
@@ -1505,66 +1676,41 @@ def scroll_message(direction):
 # --- IRC Chat Functions ---
 
 def connect_irc():
-    """Connect to the IRC server and start listener thread."""
-    global irc_socket, irc_thread
-    try:
-        irc_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        irc_socket.connect((IRC_SERVER, IRC_PORT))
-        irc_socket.sendall(f"NICK {IRC_NICK}\r\n".encode())
-        irc_socket.sendall(f"USER {IRC_NICK} 0 * :{IRC_NICK}\r\n".encode())
-        irc_socket.sendall(f"JOIN {IRC_CHANNEL}\r\n".encode())
-    except Exception as e:
-        err_msg = f"IRC connection failed: {e}"
-        print(err_msg)
-        chat_messages.append(err_msg)
-        if len(chat_messages) > 100:
-            chat_messages.pop(0)
-        irc_socket = None
-        return
+    """Start the IRC client and the shared chat history it feeds."""
+    chat_bus.start()
+    irc.start()
 
-    def listen():
-        buffer = ""
-        while True:
-            try:
-                data = irc_socket.recv(4096)
-                if not data:
-                    break
-                buffer += data.decode(errors="ignore")
-                while "\r\n" in buffer:
-                    line, buffer = buffer.split("\r\n", 1)
-                    handle_irc_line(line)
-            except Exception as e:
-                err_msg = f"IRC listener error: {e}"
-                print(err_msg)
-                chat_messages.append(err_msg)
-                if len(chat_messages) > 100:
-                    chat_messages.pop(0)
-                break
 
-    irc_thread = threading.Thread(target=listen, daemon=True)
-    irc_thread.start()
+def redraw_chat():
+    global chat_redraw_timer
+    with chat_redraw_lock:
+        chat_redraw_timer = None
+    if menu_instance and menu_instance.current_screen == "irc_chat" and not irc_typing:
+        draw_chat_screen()
 
 
-def handle_irc_line(line):
-    """Process a single line received from IRC."""
-    if line.startswith("PING"):
-        token = line.split(":", 1)[1] if ":" in line else ""
-        try:
-            irc_socket.sendall(f"PONG :{token}\r\n".encode())
-        except Exception as e:
-            print(f"Failed to send PONG: {e}")
-        return
+def request_chat_redraw():
+    """Schedule one chat redraw for everything that arrives in the next moment."""
+    global chat_redraw_timer
+    with chat_redraw_lock:
+        if chat_redraw_timer is not None:
+            return
+        chat_redraw_timer = threading.Timer(CHAT_REDRAW_DELAY, redraw_chat)
+        chat_redraw_timer.daemon = True
+        chat_redraw_timer.start()
 
-    parts = line.split()
-    if len(parts) >= 4 and parts[1] == "PRIVMSG" and parts[2] == IRC_CHANNEL:
-        prefix = parts[0]
-        message = line.split(" :", 1)[1] if " :" in line else ""
-        nick = prefix.split("!")[0][1:] if prefix.startswith(":") else prefix
-        chat_messages.append(f"{nick}> {message}")
-        if len(chat_messages) > 100:
-            chat_messages.pop(0)
-        if menu_instance and menu_instance.current_screen == "irc_chat":
-            draw_chat_screen()
+
+irc = irc_client.IRCClient(IRC_SERVER, IRC_PORT, IRC_NICK, IRC_CHANNEL,
+                           on_message=chat_bus.publish, on_status=chat_bus.status)
+
+
+def on_chat_message(entry):
+    request_chat_redraw()
+
+
+# Registered once here; connect_irc runs again each time chat is opened
+chat_bus.attach(irc)
+chat_bus.subscribe(on_chat_message)
 
 
 def draw_chat_screen():
@@ -1577,18 +1723,19 @@ def draw_chat_screen():
     available_h = DISPLAY_HEIGHT - 15
 
     lines = []
-    for msg in chat_messages:
-        lines.extend(wrap_text(msg, font_small, max_width, draw))
+    # Only wrap what can be shown; the history holds far more than one screen
+    for entry in chat_bus.history()[-(available_h // line_h):]:
+        lines.extend(wrap_text(chat_bus.format_entry(entry), font_small, max_width, draw))
 
     max_lines = available_h // line_h
     visible = lines[-max_lines:]
 
     y = 5
     for line in visible:
-        draw.text((5, y), line, font=font_small, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, y), line, font=font_small, fill=(255, 255, 255))
         y += line_h
 
-    draw.text((5, DISPLAY_HEIGHT - 10), "Press=Type 3=Back", font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "Press=Type 3=Back", font=font_small, fill=(0, 255, 255))
     thread_safe_display(img)
 
 
@@ -1606,7 +1753,7 @@ def draw_irc_input_screen():
     start = max(0, len(lines) - max_lines)
     y = 5
     for line in lines[start:]:
-        draw.text((5, y), line, font=font_medium, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, y), line, font=font_medium, fill=(255, 255, 255))
         y += line_h
 
     row_h = (DISPLAY_HEIGHT - kb_y - tips_height) // len(IRC_KEY_LAYOUT)
@@ -1631,10 +1778,10 @@ def draw_irc_input_screen():
             bbox = draw.textbbox((0, 0), ch, font=font_small)
             tx = x + (this_key_w - (bbox[2] - bbox[0])) // 2
             ty = y + (row_h - (bbox[3] - bbox[1])) // 2
-            draw.text((tx, ty), ch, font=font_small, fill=text_color)
+            font_atlas.text(draw, (tx, ty), ch, font=font_small, fill=text_color)
 
     tips = "Press=Send 1=Select 2=Shift 3=Cancel"
-    draw.text((5, DISPLAY_HEIGHT - tips_height + 2), tips, font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - tips_height + 2), tips, font=font_small, fill=(0, 255, 255))
 
     thread_safe_display(img)
 
@@ -1654,16 +1801,7 @@ def start_irc_input():
 
 def send_irc_message(msg):
     """Send a message to the IRC channel."""
-    if not msg:
-        return
-    try:
-        if irc_socket:
-            irc_socket.sendall(f"PRIVMSG {IRC_CHANNEL} :{msg}\r\n".encode())
-    except Exception as e:
-        chat_messages.append(f"Send failed: {e}")
-    chat_messages.append(f"{IRC_NICK}> {msg}")
-    if len(chat_messages) > 100:
-        chat_messages.pop(0)
+    chat_bus.post(msg)
 
 
 def handle_irc_chat_input(pin_name):
@@ -1712,84 +1850,177 @@ def handle_irc_chat_input(pin_name):
 def start_chat():
     """Enter the IRC chat view."""
     stop_scrolling()
-    if irc_socket is None:
-        connect_irc()
+    connect_irc()
     menu_instance.current_screen = "irc_chat"
     global irc_typing, irc_input_text
     irc_typing = False
     irc_input_text = ""
     draw_chat_screen()
 
+def sparkline(draw, box, values, lo=None, hi=None, fill=(0, 255, 0)):
+    """Draw ``values`` as a line chart inside ``box`` (x0, y0, x1, y1)."""
+    x0, y0, x1, y1 = box
+    draw.rectangle(box, outline=(60, 60, 60))
+    values = values[-(x1 - x0 - 1):]
+    if len(values) < 2:
+        return
+    lo = min(values) if lo is None else lo
+    hi = max(values) if hi is None else hi
+    span = (hi - lo) or 1
+    height = y1 - y0 - 2
+    points = [
+        (x0 + 1 + i, y1 - 1 - round(height * (min(max(v, lo), hi) - lo) / span))
+        for i, v in enumerate(values)
+    ]
+    draw.line(points, fill=fill)
+
+
+def core_bars(draw, box, usage, fill=(0, 200, 255)):
+    """Draw one vertical utilization bar per CPU core inside ``box``."""
+    x0, y0, x1, y1 = box
+    if not usage:
+        return
+    width = (x1 - x0) // len(usage)
+    for i, pct in enumerate(usage):
+        left = x0 + i * width
+        draw.rectangle((left, y0, left + width - 2, y1), outline=(60, 60, 60))
+        top = y1 - round((y1 - y0) * min(pct, 100) / 100)
+        if top < y1:
+            draw.rectangle((left + 1, top, left + width - 3, y1 - 1), fill=fill)
+
+
+def draw_system_monitor():
+    """Render the latest metrics with short histories and per-core load."""
+    values = metrics.latest()
+    img = Image.new('RGB', (DISPLAY_WIDTH, DISPLAY_HEIGHT), color='black')
+    draw = ImageDraw.Draw(img)
+    font_atlas.text(draw, (5, 5), "System Monitor", font=font_large, fill=(255, 255, 0))
+    rows = [
+        ("temp_c", "T", "{:.1f}C", 30, 85, (255, 128, 0)),
+        ("cpu_pct", "CPU", "{:.0f}%", 0, 100, (0, 255, 0)),
+        ("mem_pct", "Mem", "{:.0f}%", 0, 100, (0, 200, 255)),
+        ("freq_mhz", "", "{:.0f}MHz", None, None, (255, 0, 255)),
+    ]
+    y = 24
+    for name, label, fmt, lo, hi, color in rows:
+        value = values.get(name)
+        text = fmt.format(value) if value is not None else "N/A"
+        font_atlas.text(draw, (5, y), f"{label} {text}".strip(), font=font_small, fill=(255, 255, 255))
+        sparkline(draw, (68, y, DISPLAY_WIDTH - 5, y + 10), metrics.history(name), lo, hi, color)
+        y += 14
+    load = values.get("load1")
+    disk = values.get("disk_used_gb")
+    status = f"Ld {load:.2f}" if load is not None else "Ld N/A"
+    if disk is not None:
+        status += f" Dsk {disk:.0f}/{values['disk_total_gb']:.0f}G"
+    font_atlas.text(draw, (5, y), status, font=font_small, fill=(255, 255, 255))
+    core_bars(draw, (5, y + 13, DISPLAY_WIDTH - 5, DISPLAY_HEIGHT - 14), metrics.cores())
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "3=Back", font=font_small, fill=(0, 255, 255))
+    thread_safe_display(img)
+
+
 def run_system_monitor():
-    """Continuously display CPU temperature, load and memory usage until the user exits."""
-    next_update = 0
+    """Show live system metrics until KEY3 is pressed.
+
+    The metrics collector samples in the background, so this loop only
+    redraws when a new sample has arrived.
+    """
+    metrics.start()
+    shown = None
     while True:
         if button_states.get("KEY3"):
             break
-        now = time.time()
-        if now >= next_update:
-            next_update = now + 1
-            # CPU temperature using vcgencmd if available
-            try:
-                output = subprocess.check_output(["vcgencmd", "measure_temp"]).decode()
-                temp = output.strip().replace("temp=", "").replace("'C", "")
-            except Exception:
-                temp = "N/A"
+        stamp = metrics.latest().get("time")
+        if stamp != shown:
+            shown = stamp
+            draw_system_monitor()
+        time.sleep(0.1)
+    menu_instance.clear_display()
+    show_utilities_menu()
 
-            # CPU load (1 minute average)
-            try:
-                load = os.getloadavg()[0]
-            except Exception:
-                load = 0.0
+# --- Profiler ---
+PROFILE_DIR = os.path.join(os.path.dirname(__file__), "logs")
+PROFILE_SAMPLE_SECONDS = 10
+profiler_sort = "total"
+profiler_sampling = False
 
-            # Current CPU frequency in MHz
-            try:
-                with open("/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq") as f:
-                    cpu_freq = int(f.read().strip()) / 1000  # kHz -> MHz
-            except Exception:
-                cpu_freq = None
 
-            # Disk usage for root filesystem
-            try:
-                usage = shutil.disk_usage("/")
-                disk_str = f"{usage.used // (1024**3)}/{usage.total // (1024**3)}GB"
-            except Exception:
-                disk_str = "N/A"
-
-            # Memory usage from /proc/meminfo
-            mem_total = 0
-            mem_available = 0
-            try:
-                with open("/proc/meminfo") as f:
-                    for line in f:
-                        if line.startswith("MemTotal"):
-                            mem_total = int(line.split()[1])
-                        elif line.startswith("MemAvailable"):
-                            mem_available = int(line.split()[1])
-            except Exception:
-                pass
-            mem_used = mem_total - mem_available
-            if mem_total:
-                mem_str = f"{mem_used//1024}/{mem_total//1024}MB"
-            else:
-                mem_str = "N/A"
+def draw_profiler_screen():
+    """Show the hottest timed functions."""
+    img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
+    draw = ImageDraw.Draw(img)
+    state = "on" if profiler.enabled() else "off"
+    font_atlas.text(draw, (5, 5), f"Profiler ({state})", font=font_large, fill=(255, 255, 0))
+    line_h = font_line_height(font_small) + 1
+    y = 25
+    key = {"total": "total_ms", "mean": "mean_ms", "max": "max_ms"}[profiler_sort]
+    font_atlas.text(draw, (5, y), f"by {profiler_sort} ms", font=font_small, fill=(0, 255, 0))
+    y += line_h
+    rows = profiler.report(top=(DISPLAY_HEIGHT - 12 - y) // line_h, sort=profiler_sort)
+    if not rows:
+        font_atlas.text(draw, (5, y), "No samples yet", font=font_small, fill=(255, 255, 255))
+    for row in rows:
+        value = f"{row[key]:.1f}"
+        name = row["name"][: 20 - len(value)]
+        font_atlas.text(draw, (5, y), name, font=font_small, fill=(255, 255, 255))
+        width = draw.textlength(value, font=font_small)
+        font_atlas.text(draw, (DISPLAY_WIDTH - 5 - width, y), value, font=font_small, fill=(255, 255, 255))
+        y += line_h
+    footer = "Sampling..." if profiler_sampling else "1=On/Off 2=Reset P=Sample"
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), footer, font=font_small, fill=(0, 255, 255))
+    thread_safe_display(img)
+
+
+def show_profiler():
+    """Enter the profiler screen."""
+    stop_scrolling()
+    menu_instance.current_screen = "profiler"
+    draw_profiler_screen()
 
-            img = Image.new('RGB', (DISPLAY_WIDTH, DISPLAY_HEIGHT), color='black')
-            draw = ImageDraw.Draw(img)
-            draw.text((5, 5), "System Monitor", font=font_large, fill=(255, 255, 0))
-            draw.text((5, 25), f"Temp: {temp}C", font=font_medium, fill=(255, 255, 255))
-            draw.text((5, 40), f"Load: {load:.2f}", font=font_medium, fill=(255, 255, 255))
-            if cpu_freq is not None:
-                draw.text((5, 55), f"Freq: {cpu_freq:.0f}MHz", font=font_medium, fill=(255, 255, 255))
-            else:
-                draw.text((5, 55), "Freq: N/A", font=font_medium, fill=(255, 255, 255))
-            draw.text((5, 70), f"Mem: {mem_str}", font=font_medium, fill=(255, 255, 255))
-            draw.text((5, 85), f"Disk: {disk_str}", font=font_medium, fill=(255, 255, 255))
-            draw.text((5, DISPLAY_HEIGHT - 10), "3=Back", font=font_small, fill=(0, 255, 255))
-            thread_safe_display(img)
-        time.sleep(0.1)
-    menu_instance.clear_display()
-    show_utilities_menu()
+
+def sample_profile():
+    """Record folded stacks for a few seconds in the background and save them under logs/."""
+    global profiler_sampling
+    if profiler_sampling:
+        return
+    profiler_sampling = True
+
+    def task():
+        global profiler_sampling
+        try:
+            folded = profiler.sample(PROFILE_SAMPLE_SECONDS)
+            os.makedirs(PROFILE_DIR, exist_ok=True)
+            path = os.path.join(PROFILE_DIR, datetime.now().strftime("profile-%Y%m%d-%H%M%S.folded"))
+            with open(path, "w") as f:
+                f.write(folded)
+            journal.record("profile_sample", path=path, seconds=PROFILE_SAMPLE_SECONDS)
+        except Exception as e:
+            print(f"Profile sample failed: {e}")
+        finally:
+            profiler_sampling = False
+        if menu_instance.current_screen == "profiler":
+            draw_profiler_screen()
+
+    threading.Thread(target=task, daemon=True).start()
+
+
+def handle_profiler_input(pin_name):
+    """Toggle timing, change sort order, reset or take a stack sample."""
+    global profiler_sort
+    if pin_name == "KEY1":
+        profiler.set_enabled(not profiler.enabled())
+    elif pin_name == "KEY2":
+        profiler.reset()
+    elif pin_name in ("JOY_LEFT", "JOY_RIGHT"):
+        orders = ["total", "mean", "max"]
+        step = 1 if pin_name == "JOY_RIGHT" else -1
+        profiler_sort = orders[(orders.index(profiler_sort) + step) % len(orders)]
+    elif pin_name == "JOY_PRESS":
+        sample_profile()
+    elif pin_name == "KEY3":
+        show_utilities_menu()
+        return
+    draw_profiler_screen()
 
 def show_info():
     menu_instance.display_message_screen("System Info", "Raspberry Pi Mini-OS\nVersion 1.0\nST7735S Display", delay=4)
@@ -1804,15 +2035,15 @@ def show_date_time(duration=10):
         now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         img = Image.new('RGB', (DISPLAY_WIDTH, DISPLAY_HEIGHT), color='black')
         draw = ImageDraw.Draw(img)
-        draw.text((5, 5), "Date & Time", font=font_large, fill=(255, 255, 0))
+        font_atlas.text(draw, (5, 5), "Date & Time", font=font_large, fill=(255, 255, 0))
         max_width = DISPLAY_WIDTH - 10
         lines = wrap_text(now, font_medium, max_width, draw)
         y = 30
         line_height = draw.textbbox((0, 0), "A", font=font_medium)[3]
         for line in lines:
-            draw.text((5, y), line, font=font_medium, fill=(255, 255, 255))
+            font_atlas.text(draw, (5, y), line, font=font_medium, fill=(255, 255, 255))
             y += line_height + 2
-        draw.text((5, DISPLAY_HEIGHT - 10), "3=Back", font=font_small, fill=(0, 255, 255))
+        font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "3=Back", font=font_small, fill=(0, 255, 255))
         thread_safe_display(img)
         time.sleep(1)
     menu_instance.clear_display()
@@ -1821,8 +2052,11 @@ def show_date_time(duration=10):
 
 def fetch_weather_data(zip_code):
     """Fetch weather information for the given US ZIP code."""
+    import requests
     try:
-        r = requests.get(f"https://api.zippopotam.us/us/{zip_code}", timeout=5)
+        with journal.timed("net", host="api.zippopotam.us") as event:
+            r = requests.get(f"https://api.zippopotam.us/us/{zip_code}", timeout=5)
+            event["status"] = r.status_code
         loc = r.json()
         place = loc["places"][0]
         lat = place["latitude"]
@@ -1836,7 +2070,10 @@ def fetch_weather_data(zip_code):
         "&timezone=America%2FLos_Angeles"
     )
     try:
-        data = requests.get(url, timeout=5).json()
+        with journal.timed("net", host="api.open-meteo.com") as event:
+            resp = requests.get(url, timeout=5)
+            event["status"] = resp.status_code
+        data = resp.json()
     except Exception:
         return None
 
@@ -1880,18 +2117,19 @@ def draw_weather_screen():
     img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
     draw = ImageDraw.Draw(img)
     line_h = draw.textbbox((0, 0), "A", font=font_medium)[3]
-    draw.text((5, 5), f"Weather {zip_code}", font=font_large, fill=(255, 255, 0))
+    font_atlas.text(draw, (5, 5), f"Weather {zip_code}", font=font_large, fill=(255, 255, 0))
     y = 25
     if data and data["temp"] is not None:
-        draw.text((5, y), f"Temp: {data['temp']:.1f}F", font=font_medium, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, y), f"Temp: {data['temp']:.1f}F", font=font_medium, fill=(255, 255, 255))
     else:
-        draw.text((5, y), "Temp: N/A", font=font_medium, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, y), "Temp: N/A", font=font_medium, fill=(255, 255, 255))
     y += line_h + 2
     if data:
-        draw.text((5, y), data["desc"], font=font_medium, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, y), data["desc"], font=font_medium, fill=(255, 255, 255))
         y += line_h + 2
         if data["high"] is not None and data["low"] is not None:
-            draw.text(
+            font_atlas.text(
+                draw,
                 (5, y),
                 f"H:{data['high']:.1f}F L:{data['low']:.1f}F",
                 font=font_medium,
@@ -1901,14 +2139,15 @@ def draw_weather_screen():
         if data.get("forecast"):
             for fc in data["forecast"][1:3]:
                 date = fc["date"][5:]
-                draw.text(
+                font_atlas.text(
+                    draw,
                     (5, y),
                     f"{date} {fc['high']:.0f}/{fc['low']:.0f}F",
                     font=font_small,
                     fill=(255, 255, 255),
                 )
                 y += draw.textbbox((0, 0), "A", font=font_small)[3] + 2
-    draw.text((5, DISPLAY_HEIGHT - 10), "R=Next 1=Add 3=Back", font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "R=Next 1=Add 3=Back", font=font_small, fill=(0, 255, 255))
     thread_safe_display(img)
 
 
@@ -1916,8 +2155,8 @@ def draw_zip_entry_screen():
     """Render the numeric keypad for adding a ZIP code."""
     img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
     draw = ImageDraw.Draw(img)
-    draw.text((5, 5), "New ZIP", font=font_large, fill=(255, 255, 0))
-    draw.text((5, 25), zip_input_text, font=font_medium, fill=(255, 255, 255))
+    font_atlas.text(draw, (5, 5), "New ZIP", font=font_large, fill=(255, 255, 0))
+    font_atlas.text(draw, (5, 25), zip_input_text, font=font_medium, fill=(255, 255, 255))
 
     start_y = 45
     row_h = (DISPLAY_HEIGHT - start_y - 15) // len(ZIP_KEYPAD)
@@ -1937,9 +2176,9 @@ def draw_zip_entry_screen():
             bbox = draw.textbbox((0, 0), ch, font=font_medium)
             tx = x + (key_w - (bbox[2] - bbox[0])) // 2
             ty = y + (row_h - (bbox[3] - bbox[1])) // 2
-            draw.text((tx, ty), ch, font=font_medium, fill=color)
+            font_atlas.text(draw, (tx, ty), ch, font=font_medium, fill=color)
 
-    draw.text((5, DISPLAY_HEIGHT - 10), "1=Del 2=OK 3=Cancel", font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "1=Del 2=OK 3=Cancel", font=font_small, fill=(0, 255, 255))
     thread_safe_display(img)
 
 
@@ -2003,38 +2242,27 @@ def handle_weather_input(pin_name):
         show_main_menu()
 
 def show_network_info():
-    """Display basic network information until the user exits."""
-    try:
-        ip_output = subprocess.check_output(["hostname", "-I"]).decode().strip()
-        ip_addr = ip_output if ip_output else "N/A"
-    except Exception:
-        ip_addr = "N/A"
-
-    try:
-        ssid_output = subprocess.check_output(["iwgetid", "-r"]).decode().strip()
-        ssid = ssid_output if ssid_output else "N/A"
-    except Exception:
-        ssid = "N/A"
-
-    next_update = 0
+    """Display the cached network state until the user exits, redrawing when it changes."""
+    shown = None
     while True:
         if button_states.get("KEY3"):
             break
-        now = time.time()
-        if now >= next_update:
-            next_update = now + 1
+        state = net_monitor.state()
+        if state["changed"] != shown or shown is None:
+            shown = state["changed"]
+            ip_addr = state["ip"] or "N/A"
+            ssid = state["ssid"] or "N/A"
+            signal = f"{state['signal']}%" if state["signal"] is not None else "N/A"
             img = Image.new('RGB', (DISPLAY_WIDTH, DISPLAY_HEIGHT), color='black')
             draw = ImageDraw.Draw(img)
-            draw.text((5, 5), "Network Info", font=font_large, fill=(255, 255, 0))
+            font_atlas.text(draw, (5, 5), "Network Info", font=font_large, fill=(255, 255, 0))
             max_width = DISPLAY_WIDTH - 10
             y = 25
-            for line in wrap_text(f"IP: {ip_addr}", font_small, max_width, draw):
-                draw.text((5, y), line, font=font_small, fill=(255, 255, 255))
-                y += draw.textbbox((0, 0), line, font=font_small)[3] + 2
-            for line in wrap_text(f"SSID: {ssid}", font_small, max_width, draw):
-                draw.text((5, y), line, font=font_small, fill=(255, 255, 255))
-                y += draw.textbbox((0, 0), line, font=font_small)[3] + 2
-            draw.text((5, DISPLAY_HEIGHT - 10), "3=Back", font=font_small, fill=(0, 255, 255))
+            for text in (f"IP: {ip_addr}", f"SSID: {ssid}", f"Signal: {signal}"):
+                for line in wrap_text(text, font_small, max_width, draw):
+                    font_atlas.text(draw, (5, y), line, font=font_small, fill=(255, 255, 255))
+                    y += draw.textbbox((0, 0), line, font=font_small)[3] + 2
+            font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "3=Back", font=font_small, fill=(0, 255, 255))
             thread_safe_display(img)
         time.sleep(0.1)
 
@@ -2064,6 +2292,7 @@ def start_web_server():
 
 def start_mini_games():
     """Launch the web-based mini games."""
+    import webbrowser
     try:
         ip_output = subprocess.check_output(["hostname", "-I"]).decode().strip()
         ip_addr = ip_output.split()[0] if ip_output else "localhost"
@@ -2092,22 +2321,22 @@ def draw_game_screen(prompt, time_left=None):
     """Display the current round prompt and countdown timer."""
     img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
     draw = ImageDraw.Draw(img)
-    draw.text((5, 5), f"Round {game_round+1}", font=font_medium, fill=(255, 255, 255))
-    draw.text((5, 20), f"Score: {game_score}", font=font_medium, fill=(255, 255, 255))
+    font_atlas.text(draw, (5, 5), f"Round {game_round+1}", font=font_medium, fill=(255, 255, 255))
+    font_atlas.text(draw, (5, 20), f"Score: {game_score}", font=font_medium, fill=(255, 255, 255))
 
     if time_left is not None:
         timer_text = str(int(time_left))
         bbox = draw.textbbox((0, 0), timer_text, font=font_large)
-        draw.text((DISPLAY_WIDTH - bbox[2] - 5, 5), timer_text, font=font_large, fill=(255, 0, 0))
+        font_atlas.text(draw, (DISPLAY_WIDTH - bbox[2] - 5, 5), timer_text, font=font_large, fill=(255, 0, 0))
 
     max_width = DISPLAY_WIDTH - 10
     y = 45
     line_height = draw.textbbox((0, 0), "A", font=font_large)[3] + 2
     for line in wrap_text(prompt, font_large, max_width, draw):
-        draw.text((5, y), line, font=font_large, fill=(0, 255, 0))
+        font_atlas.text(draw, (5, y), line, font=font_large, fill=(0, 255, 0))
         y += line_height
 
-    draw.text((5, DISPLAY_HEIGHT - 10), "1=Quit", font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "1=Quit", font=font_small, fill=(0, 255, 255))
     thread_safe_display(img)
 
 
@@ -2234,21 +2463,22 @@ def draw_launch_code(show_sequence=False):
     """Display either the code to memorize or the input prompt."""
     img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
     draw = ImageDraw.Draw(img)
-    draw.text(
+    font_atlas.text(
+        draw,
         (5, 5),
         f"Round {launch_round}/{TOTAL_LAUNCH_ROUNDS}",
         font=font_medium,
         fill=(255, 255, 255),
     )
     if show_sequence:
-        draw.text((5, 30), "Code:", font=font_large, fill=(255, 255, 0))
-        draw.text((5, 55), " ".join(launch_sequence), font=font_large, fill=(0, 255, 0))
-        draw.text((5, DISPLAY_HEIGHT - 10), "Press=Quit", font=font_small, fill=(0, 255, 255))
+        font_atlas.text(draw, (5, 30), "Code:", font=font_large, fill=(255, 255, 0))
+        font_atlas.text(draw, (5, 55), " ".join(launch_sequence), font=font_large, fill=(0, 255, 0))
+        font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "Press=Quit", font=font_small, fill=(0, 255, 255))
     else:
-        draw.text((5, 30), "Enter:", font=font_large, fill=(255, 255, 0))
-        draw.text((5, 55), launch_input, font=font_large, fill=(0, 255, 0))
-        draw.text((5, 90), "Up=Submit Down=Clear", font=font_small, fill=(255, 255, 255))
-        draw.text((5, DISPLAY_HEIGHT - 10), "Press=Quit", font=font_small, fill=(0, 255, 255))
+        font_atlas.text(draw, (5, 30), "Enter:", font=font_large, fill=(255, 255, 0))
+        font_atlas.text(draw, (5, 55), launch_input, font=font_large, fill=(0, 255, 0))
+        font_atlas.text(draw, (5, 90), "Up=Submit Down=Clear", font=font_small, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "Press=Quit", font=font_small, fill=(0, 255, 255))
     thread_safe_display(img)
 
 
@@ -2300,150 +2530,48 @@ def handle_launch_input(pin_name):
             return
     draw_launch_code()
 
-# --- Additional Games ---
-
-def start_snake():
-    stop_scrolling()
-    snake.init(thread_safe_display, (font_small, font_medium, font_large), show_main_menu)
-    menu_instance.current_screen = "snake"
-    snake.start()
-
-
-def handle_snake_input(pin_name):
-    snake.handle_input(pin_name)
-
-
-def start_tetris():
-    stop_scrolling()
-    tetris.init(thread_safe_display, (font_small, font_medium, font_large), show_main_menu)
-    menu_instance.current_screen = "tetris"
-    tetris.start()
-
-
-def handle_tetris_input(pin_name):
-    tetris.handle_input(pin_name)
-
-
-def start_rps():
-    stop_scrolling()
-    rps.init(thread_safe_display, (font_small, font_medium, font_large), show_main_menu)
-    menu_instance.current_screen = "rps"
-    rps.start()
-
+# --- Registered Games ---
 
-def handle_rps_input(pin_name):
-    rps.handle_input(pin_name)
+active_game = None  # registry name of the running game module
 
 
-def start_space_invaders():
+def start_game(name):
+    """Import a registered game on demand and hand it the display."""
+    global active_game
     stop_scrolling()
-    space_invaders.init(
-        thread_safe_display, (font_small, font_medium, font_large), show_main_menu
+    try:
+        games.load(name)
+    except Exception as e:
+        menu_instance.display_message_screen("Games", f"Failed to load: {e}", delay=3)
+        show_games_menu()
+        return
+    active_game = name
+    # Time each game's per-tick work (drawing and movement) and its input handler
+    profiler.wrap_globals(
+        vars(games.load(name)),
+        lambda n: n == "handle_input" or n.lstrip("_").startswith(("draw", "move", "update", "check")),
+        prefix=f"{name}.",
     )
-    menu_instance.current_screen = "space_invaders"
-    space_invaders.start()
-
-
-def handle_space_invaders_input(pin_name):
-    space_invaders.handle_input(pin_name)
-
-# --- Veterinary Adventure ---
-
-def start_vet_adventure():
-    stop_scrolling()
-    vet_adventure.init(
-        thread_safe_display, (font_small, font_medium, font_large), show_main_menu
+    games.entry(name, "init")(
+        thread_safe_display, (font_small, font_medium, font_large), exit_game
     )
-    menu_instance.current_screen = "vet_adventure"
-    vet_adventure.start()
-
-
-def handle_vet_adventure_input(pin_name):
-    vet_adventure.handle_input(pin_name)
-
-# --- Axe Game ---
-
-def start_axe():
-    stop_scrolling()
-    axe.init(thread_safe_display, (font_small, font_medium, font_large), show_main_menu)
-    menu_instance.current_screen = "axe"
-    axe.start()
-
-
-def handle_axe_input(pin_name):
-    axe.handle_input(pin_name)
+    menu_instance.current_screen = name
+    games.entry(name, "start")()
 
-# --- Trivia Game ---
 
-def start_trivia():
-    stop_scrolling()
-    trivia.init(thread_safe_display, (font_small, font_medium, font_large), show_main_menu)
-    menu_instance.current_screen = "trivia"
-    trivia.start()
-
-
-def handle_trivia_input(pin_name):
-    trivia.handle_input(pin_name)
-
-# --- Two Player Trivia Game ---
-
-def start_two_player_trivia():
-    stop_scrolling()
-    two_player_trivia.init(thread_safe_display, (font_small, font_medium, font_large), show_main_menu)
-    menu_instance.current_screen = "two_player_trivia"
-    two_player_trivia.start()
-
-
-def handle_two_player_trivia_input(pin_name):
-    two_player_trivia.handle_input(pin_name)
-
-# --- Pico WoW Game ---
-
-def start_pico_wow():
-    stop_scrolling()
-    pico_wow.init(thread_safe_display, (font_small, font_medium, font_large), show_main_menu)
-    menu_instance.current_screen = "pico_wow"
-    pico_wow.start()
-
-
-def handle_pico_wow_input(pin_name):
-    pico_wow.handle_input(pin_name)
-
-# --- Hack In Animation ---
-
-def start_hack_in():
-    stop_scrolling()
-    hack_in.init(thread_safe_display, (font_small, font_medium, font_large), show_main_menu)
-    menu_instance.current_screen = "hack_in"
-    hack_in.start()
-
-
-def handle_hack_in_input(pin_name):
-    hack_in.handle_input(pin_name)
-
-# --- GTA 1997 Style Game ---
-
-def start_gta_1997():
-    stop_scrolling()
-    gta_1997.init(thread_safe_display, (font_small, font_medium, font_large), show_main_menu)
-    menu_instance.current_screen = "gta_1997"
-    gta_1997.start()
-
-
-def handle_gta_1997_input(pin_name):
-    gta_1997.handle_input(pin_name)
-
-# --- Doctor Mode ---
-
-def start_doctor_mode():
-    stop_scrolling()
-    doctor_mode.init(thread_safe_display, (font_small, font_medium, font_large), show_main_menu)
-    menu_instance.current_screen = "doctor_mode"
-    doctor_mode.start()
+def exit_game():
+    """Return from a game to the main menu and unload its module."""
+    global active_game
+    name = active_game
+    active_game = None
+    show_main_menu()
+    if name:
+        games.unload(name)
 
 
-def handle_doctor_mode_input(pin_name):
-    doctor_mode.handle_input(pin_name)
+def handle_game_module_input(pin_name):
+    if active_game:
+        games.entry(active_game, "input")(pin_name)
 
 # --- Notes Program ---
 
@@ -2535,6 +2663,8 @@ note_offset = 0
 note_max_offset = 0
 note_render = None
 current_note_file = None  # filename of the note being viewed
+notes_search_query = ""
+notes_search_results = []
 editing_note_filename = None  # filename when editing an existing note
 
 
@@ -2553,7 +2683,7 @@ def draw_notes_screen():
     start = max(0, len(lines) - max_lines)
     y = 5
     for line in lines[start:]:
-        draw.text((5, y), line, font=font_medium, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, y), line, font=font_medium, fill=(255, 255, 255))
         y += line_h
 
     # Keyboard layout in bottom half
@@ -2579,11 +2709,11 @@ def draw_notes_screen():
             bbox = draw.textbbox((0, 0), ch, font=font_small)
             tx = x + (this_key_w - (bbox[2] - bbox[0])) // 2
             ty = y + (row_h - (bbox[3] - bbox[1])) // 2
-            draw.text((tx, ty), ch, font=font_small, fill=text_color)
+            font_atlas.text(draw, (tx, ty), ch, font=font_small, fill=text_color)
 
     tips_text = "1=Shift 2=Delete 3=Save"
-    draw.text((5, DISPLAY_HEIGHT - tips_height + 2), tips_text,
-              font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - tips_height + 2), tips_text,
+                    font=font_small, fill=(0, 255, 255))
 
     thread_safe_display(img)
 
@@ -2647,76 +2777,38 @@ def save_note(text, filename=None):
     if not text:
         return
     if filename:
-        path = os.path.join(NOTES_DIR, filename)
+        notes_store.write(filename, text)
     else:
-        pattern = re.compile(r"note(\d+)\.txt")
-        existing = [int(m.group(1)) for m in (pattern.match(f) for f in os.listdir(NOTES_DIR)) if m]
-        next_num = max(existing, default=0) + 1
-        path = os.path.join(NOTES_DIR, f"note{next_num}.txt")
-    with open(path, "w") as f:
-        f.write(text)
+        notes_store.create(text)
 
 
 def save_bt_failure(details):
     """Save bluetooth connection error details to the notes directory."""
-    pattern = re.compile(r"btfail(\d+)\.txt")
     try:
-        existing = [
-            int(m.group(1))
-            for m in (pattern.match(f) for f in os.listdir(NOTES_DIR))
-            if m
-        ]
-        next_num = max(existing, default=0) + 1
-        path = os.path.join(NOTES_DIR, f"btfail{next_num}.txt")
-        with open(path, "w") as f:
-            f.write(details)
+        notes_store.create(details, prefix="btfail")
     except Exception:
         pass
 
 
 def save_connect_failure(details):
     """Save incoming bluetooth connection errors to the notes directory."""
-    pattern = re.compile(r"connectfail(\d+)\.txt")
     try:
-        existing = [
-            int(m.group(1))
-            for m in (pattern.match(f) for f in os.listdir(NOTES_DIR))
-            if m
-        ]
-        next_num = max(existing, default=0) + 1
-        path = os.path.join(NOTES_DIR, f"connectfail{next_num}.txt")
-        with open(path, "w") as f:
-            f.write(details)
+        notes_store.create(details, prefix="connectfail")
     except Exception:
         pass
 
 
-def start_bt_log_monitor():
-    """Watch system bluetooth logs for failed incoming connections."""
-    if not shutil.which("journalctl"):
+def start_bluetooth_session():
+    """Start the Bluetooth session and log incoming connections that fail."""
+    if not shutil.which("bluetoothctl"):
         return
 
-    def monitor():
-        proc = subprocess.Popen(
-            ["journalctl", "-fu", "bluetooth", "-n", "0", "--since", "now"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-        )
-        buffer = []
-        for line in iter(proc.stdout.readline, ""):
-            if not line:
-                break
-            buffer.append(line.strip())
-            lower = line.lower()
-            if any(word in lower for word in ["failed", "error"]):
-                details = "\n".join(buffer[-20:])
-                save_connect_failure(details)
-                buffer = []
-
-    t = threading.Thread(target=monitor, daemon=True)
-    t.start()
+    def on_event(event):
+        if event["type"] == "failure" and event["op"] == "incoming":
+            save_connect_failure(f"Incoming connection from {event['address']} failed: {event['error']}\n{event['details']}")
 
+    bt_manager.add_listener(on_event)
+    bt_manager.start()
 
 
 def show_notes_list():
@@ -2725,9 +2817,8 @@ def show_notes_list():
     global notes_files, current_note_file
     current_note_file = None
     try:
-        notes_files = sorted(
-            f for f in os.listdir(NOTES_DIR) if f.lower().endswith(".txt")
-        )
+        # Names come from the notes index; no note bodies are opened
+        notes_files = [n["name"] for n in notes_store.list_notes()]
     except Exception:
         notes_files = []
 
@@ -2748,10 +2839,8 @@ def view_note(filename):
     stop_scrolling()
     menu_instance.current_screen = "note_view"
     current_note_file = filename
-    path = os.path.join(NOTES_DIR, filename)
     try:
-        with open(path, "r") as f:
-            text = f.read()
+        text = notes_store.read(filename)
     except Exception:
         text = "Error reading file"
 
@@ -2761,18 +2850,17 @@ def view_note(filename):
     note_lines = wrap_text(text, font_small, max_width, dummy_draw)
     note_line_h = dummy_draw.textbbox((0, 0), "A", font=font_small)[3] + 2
     note_offset = 0
-    available_h = DISPLAY_HEIGHT - 35
-    note_max_offset = max(0, len(note_lines) * note_line_h - available_h)
+    surface = TextSurface(note_lines, font_small, note_line_h, DISPLAY_WIDTH)
+    note_max_offset = surface.max_offset(SCROLL_VIEW_H)
+
+    # Title and footer are drawn once; each step only repaints the text window
+    img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
+    draw = ImageDraw.Draw(img)
+    font_atlas.text(draw, (5, 5), filename, font=font_large, fill=(255, 255, 0))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "1=Edit 2=Delete 3=Back", font=font_small, fill=(0, 255, 255))
 
     def render():
-        img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
-        draw = ImageDraw.Draw(img)
-        draw.text((5, 5), filename, font=font_large, fill=(255, 255, 0))
-        y = 25 - note_offset
-        for line in note_lines:
-            draw.text((5, y), line, font=font_small, fill=(255, 255, 255))
-            y += note_line_h
-        draw.text((5, DISPLAY_HEIGHT - 10), "1=Edit 2=Delete 3=Back", font=font_small, fill=(0, 255, 255))
+        surface.paste_window(img, (0, SCROLL_VIEW_TOP), note_offset, SCROLL_VIEW_H)
         thread_safe_display(img)
 
     note_render = render
@@ -2797,13 +2885,111 @@ def delete_current_note():
     if not current_note_file:
         return
     try:
-        os.remove(os.path.join(NOTES_DIR, current_note_file))
+        notes_store.delete(current_note_file)
     except Exception:
         pass
     current_note_file = None
     show_notes_list()
 
 
+def draw_notes_search_screen():
+    """Show the search query, the best matches so far and the keyboard."""
+    img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
+    draw = ImageDraw.Draw(img)
+    line_h = font_line_height(font_small) + 1
+    font_atlas.text(draw, (5, 2), f"Find: {notes_search_query}_", font=font_small, fill=(255, 255, 0))
+    kb_y = DISPLAY_HEIGHT // 2 - KEYBOARD_OFFSET
+    tips_height = 10
+    y = 2 + line_h
+    if notes_search_query and not notes_search_results:
+        font_atlas.text(draw, (5, y), "No matches", font=font_small, fill=(255, 0, 0))
+    for note in notes_search_results:
+        if y + line_h > kb_y:
+            break
+        font_atlas.text(draw, (5, y), note["name"], font=font_small, fill=(255, 255, 255))
+        y += line_h
+
+    row_h = (DISPLAY_HEIGHT - kb_y - tips_height) // len(KEYBOARD_LOWER)
+    key_w = DISPLAY_WIDTH // 10
+    for r, row in enumerate(KEYBOARD_LOWER):
+        if r == len(KEYBOARD_LOWER) - 1 and len(row) == 1:
+            offset_x = 5
+            this_key_w = DISPLAY_WIDTH - offset_x * 2
+        else:
+            offset_x = (DISPLAY_WIDTH - len(row) * key_w) // 2
+            this_key_w = key_w
+        for c, ch in enumerate(row):
+            x = offset_x + c * this_key_w
+            y = kb_y + r * row_h
+            rect = (x + 1, y + 1, x + this_key_w - 2, y + row_h - 2)
+            if r == typer_row and c == typer_col:
+                draw.rectangle(rect, fill=(0, 255, 0))
+                text_color = (0, 0, 0)
+            else:
+                draw.rectangle(rect, outline=(255, 255, 255))
+                text_color = (255, 255, 255)
+            bbox = draw.textbbox((0, 0), ch, font=font_small)
+            tx = x + (this_key_w - (bbox[2] - bbox[0])) // 2
+            ty = y + (row_h - (bbox[3] - bbox[1])) // 2
+            font_atlas.text(draw, (tx, ty), ch, font=font_small, fill=text_color)
+
+    tips = "Press=List 1=Add 2=Del 3=Back"
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - tips_height + 2), tips, font=font_small, fill=(0, 255, 255))
+    thread_safe_display(img)
+
+
+def start_notes_search():
+    """Open the notes search screen with an empty query."""
+    global notes_search_query, notes_search_results, typer_row, typer_col
+    stop_scrolling()
+    notes_search_query = ""
+    notes_search_results = []
+    typer_row = 0
+    typer_col = 0
+    menu_instance.current_screen = "notes_search"
+    draw_notes_search_screen()
+
+
+def handle_notes_search_input(pin_name):
+    """Type a query; every word matches as a prefix and results update per key."""
+    global notes_search_query, notes_search_results, typer_row, typer_col, notes_files
+    if pin_name == "JOY_LEFT" and typer_col > 0:
+        typer_col -= 1
+    elif pin_name == "JOY_RIGHT" and typer_col < len(KEYBOARD_LOWER[typer_row]) - 1:
+        typer_col += 1
+    elif pin_name == "JOY_UP" and typer_row > 0:
+        typer_row -= 1
+        typer_col = min(typer_col, len(KEYBOARD_LOWER[typer_row]) - 1)
+    elif pin_name == "JOY_DOWN" and typer_row < len(KEYBOARD_LOWER) - 1:
+        typer_row += 1
+        typer_col = min(typer_col, len(KEYBOARD_LOWER[typer_row]) - 1)
+    elif pin_name in ("KEY1", "KEY2"):
+        if pin_name == "KEY1":
+            notes_search_query += KEYBOARD_LOWER[typer_row][typer_col]
+        else:
+            notes_search_query = notes_search_query[:-1]
+        try:
+            notes_search_results = notes_store.search(notes_search_query)
+        except Exception as e:
+            print(f"Note search failed: {e}")
+            notes_search_results = []
+    elif pin_name == "JOY_PRESS":
+        if notes_search_results:
+            # Hand the matches to the regular notes list so viewing works as usual
+            notes_files = [note["name"] for note in notes_search_results]
+            menu_instance.max_visible_items = compute_max_visible_items(menu_instance.font)
+            menu_instance.items = notes_files
+            menu_instance.selected_item = 0
+            menu_instance.view_start = 0
+            menu_instance.current_screen = "notes_list"
+            menu_instance.draw()
+        return
+    elif pin_name == "KEY3":
+        show_notes_menu()
+        return
+    draw_notes_search_screen()
+
+
 # --- Novel Typer Program ---
 
 def draw_novel_typer_screen():
@@ -2820,7 +3006,7 @@ def draw_novel_typer_screen():
     start = max(0, len(lines) - max_lines)
     y = 5
     for line in lines[start:]:
-        draw.text((5, y), line, font=font_medium, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, y), line, font=font_medium, fill=(255, 255, 255))
         y += line_h
 
     group_map = NOVEL_GROUP_SETS[novel_page]
@@ -2839,10 +3025,10 @@ def draw_novel_typer_screen():
         for j, ch in enumerate(letters):
             color = (0, 255, 0) if (novel_selected_group == g and j == novel_group_index) else (255, 255, 255)
             ty = start_y + j * row_h
-            draw.text((x + 2, ty), ch, font=font_small, fill=color)
+            font_atlas.text(draw, (x + 2, ty), ch, font=font_small, fill=color)
 
-    draw.text((5, DISPLAY_HEIGHT - tips_height + 1), "1=Pg 2=Del 3=OK/Exit", font=font_small, fill=(0, 255, 255))
-    draw.text((DISPLAY_WIDTH - 20, 2), f"P{novel_page+1}", font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - tips_height + 1), "1=Pg 2=Del 3=OK/Exit", font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (DISPLAY_WIDTH - 20, 2), f"P{novel_page+1}", font=font_small, fill=(0, 255, 255))
 
     thread_safe_display(img)
 
@@ -2901,6 +3087,7 @@ shell_lines = []
 sudo_pre_output = ""
 console_mode = False
 console_log_path = os.path.join(os.path.dirname(__file__), "logs", "console.log")
+console_log = None  # log_sink.RotatingLog created when the console first opens
 
 # Variables for sudo password prompt
 sudo_pending_cmd = None
@@ -2931,7 +3118,8 @@ def draw_shell_screen():
     start = max(0, len(history_lines) - max_lines)
     y = 5
     for line in history_lines[start:]:
-        draw.text(
+        font_atlas.text(
+            draw,
             (5, y), line, font=font_small, fill=current_color_scheme["text"]
         )
         y += line_h
@@ -2953,14 +3141,15 @@ def draw_shell_screen():
             for j, ch in enumerate(letters):
                 color = (0, 255, 0) if (shell_selected_group == g and j == shell_group_index) else (255, 255, 255)
                 ty = start_y + j * row_h
-                draw.text((x + 2, ty), ch, font=font_small, fill=color)
+                font_atlas.text(draw, (x + 2, ty), ch, font=font_small, fill=color)
 
         tips = "1S=Select 1L=Del 2S=Next 2L=Hide 3S=Run 3L=Exit"
     else:
         tips = "1=Keyboard (3L Exit)"
 
     if not console_mode:
-        draw.text(
+        font_atlas.text(
+            draw,
             (5, DISPLAY_HEIGHT - tips_height + 2),
             tips,
             font=font_small,
@@ -2972,6 +3161,7 @@ def draw_shell_screen():
 
 def start_shell(show_keyboard=True):
     """Initialize the shell input program."""
+    import pexpect
     global shell_text, shell_page, shell_selected_group, shell_group_index, shell_proc, shell_keyboard_visible
     stop_scrolling()
     if shell_proc is None:
@@ -2988,31 +3178,205 @@ def start_shell(show_keyboard=True):
 
 def start_console():
     """Launch a minimalist console that logs output."""
-    global console_mode
+    global console_mode, console_log
     console_mode = True
-    os.makedirs(os.path.join(os.path.dirname(__file__), "logs"), exist_ok=True)
+    if console_log is None:
+        console_log = log_sink.RotatingLog(console_log_path)
     start_shell(show_keyboard=False)
 
 
-def start_pico8():
-    """Launch the Pico-8 fantasy console if installed."""
+# Hold KEY3 this long while Pico-8 runs to force it to quit
+PICO8_EXIT_HOLD = 2.0
+pico8_key3_down = None
+# Index entries shown in the carts list, in menu order
+pico8_carts_list = []
+
+
+def release_hardware():
+    """Hand the panel, backlight and buttons to a child program.
+
+    Drawing stops (frames are still remembered), the software PWM thread is
+    stopped with the backlight left fully on, and the button callbacks are
+    removed. Only KEY3 stays watched so a stuck program can be closed.
+    """
+    global display_released
+    with display_lock:
+        display_released = True
+    for pin_num in BUTTON_PINS.values():
+        GPIO.remove_event_detect(pin_num)
+    GPIO.add_event_detect(BUTTON_PINS["KEY3"], GPIO.BOTH, callback=pico8_exit_button, bouncetime=100)
+    if backlight_pwm:
+        backlight_pwm.stop()
+    GPIO.output(BL_PIN, GPIO.HIGH)
+
+
+def reclaim_hardware(frame=None):
+    """Take the panel, backlight and buttons back and redraw ``frame`` at once."""
+    global display_released
+    attach_buttons(button_event_handler)
+    if backlight_pwm:
+        backlight_pwm.start(brightness_level)
+    with display_lock:
+        display_released = False
+        frame = frame or last_frame
+    try:
+        device.show()
+    except Exception as e:
+        print(f"Display wake failed: {e}")
+    if frame is not None:
+        thread_safe_display(frame)
+
+
+def pico8_exit_button(channel):
+    """Watch KEY3 while Pico-8 runs; a long hold stops it."""
+    global pico8_key3_down
+    if GPIO.input(channel) == GPIO.LOW:
+        pico8_key3_down = time.monotonic()
+    elif pico8_key3_down is not None:
+        held = time.monotonic() - pico8_key3_down
+        pico8_key3_down = None
+        if held >= PICO8_EXIT_HOLD:
+            pico8_supervisor.stop()
+
+
+def start_pico8(cart=None):
+    """Launch the Pico-8 fantasy console in the background and hand it the display."""
+    if pico8_supervisor.running():
+        return
     stop_scrolling()
-    menu_instance.display_message_screen("PICO-8", "Launching...", delay=1)
     # Default to pico8 installed under the user's home directory
     default_cmd = os.path.expanduser("~/pico-8/pico8")
     cmd = os.environ.get("PICO8_PATH", default_cmd)
+    args = [cmd, "-width", str(DISPLAY_WIDTH), "-height", str(DISPLAY_HEIGHT)]
+    if cart:
+        args += ["-run", cart]
+    previous = menu_instance.current_screen
+    # Put the launcher back exactly as it was, not the "Launching..." frame
+    restore = last_frame
+    menu_instance.display_message_screen("PICO-8", "Launching...", delay=0, clear_after=False)
+    release_hardware()
+    menu_instance.current_screen = "pico8"
     try:
-        subprocess.run(
-            [cmd, "-width", str(DISPLAY_WIDTH), "-height", str(DISPLAY_HEIGHT)],
-            check=True,
+        pico8_supervisor.launch(
+            args,
+            on_exit=lambda result: pico8_finished(result, previous, restore),
+            cart=os.path.basename(cart) if cart else None,
         )
     except FileNotFoundError:
-        menu_instance.display_message_screen("PICO-8", "Command not found", delay=2)
-    except Exception as e:
-        menu_instance.display_message_screen("PICO-8", f"Failed: {e}", delay=2)
-    show_main_menu()
+        pico8_finished(None, previous, restore, "Command not found")
+    except OSError as e:
+        pico8_finished(None, previous, restore, f"Failed: {e}")
+
+
+def pico8_finished(result, previous, restore, error=None):
+    """Reclaim the hardware after Pico-8 exits and return to ``previous``."""
+    reclaim_hardware(restore)
+    menu_instance.current_screen = previous
+    if error is None and result["returncode"] and not result["stopped"]:
+        code = result["returncode"]
+        error = f"Killed by signal {-code}" if code < 0 else f"Exited with code {code}"
+    if error:
+        menu_instance.display_message_screen("PICO-8", error, delay=2, clear_after=False)
+        menu_instance.draw()
+
+
+def show_pico8_carts(keep_selection=False):
+    """List indexed carts at once; a rescan runs in the background when the list opens."""
+    with list_lock:
+        _show_pico8_carts(keep_selection)
+
+
+def _show_pico8_carts(keep_selection):
+    global pico8_carts_list
+    stop_scrolling()
+    if not keep_selection:
+        cart_index.refresh()
+    selected = None
+    if keep_selection and menu_instance.selected_item < len(pico8_carts_list):
+        selected = pico8_carts_list[menu_instance.selected_item]["path"]
+    pico8_carts_list = cart_index.entries()
+    paths = [e["path"] for e in pico8_carts_list]
+    if pico8_carts_list:
+        items = [e["title"] for e in pico8_carts_list]
+    else:
+        items = ["Scanning..." if cart_index.is_scanning() else "No carts found"]
+    menu_instance.items = items + ["Back"]
+    if selected in paths:
+        menu_instance.selected_item = paths.index(selected)
+    else:
+        menu_instance.selected_item = min(menu_instance.selected_item if keep_selection else 0, len(menu_instance.items) - 1)
+    menu_instance.max_visible_items = compute_max_visible_items(menu_instance.font)
+    if not keep_selection:
+        menu_instance.view_start = 0
+    if menu_instance.selected_item < menu_instance.view_start:
+        menu_instance.view_start = menu_instance.selected_item
+    elif menu_instance.selected_item >= menu_instance.view_start + menu_instance.max_visible_items:
+        menu_instance.view_start = menu_instance.selected_item - menu_instance.max_visible_items + 1
+    menu_instance.current_screen = "pico8_carts"
+    menu_instance.draw()
 
 
+def on_carts_indexed():
+    """Refresh an open cart list once a rescan finishes."""
+    with list_lock:
+        if menu_instance and menu_instance.current_screen == "pico8_carts":
+            show_pico8_carts(keep_selection=True)
+
+
+cart_index.add_listener(on_carts_indexed)
+
+
+def draw_cart_label(entry):
+    """Show a cart's label with its title and author."""
+    img = cart_index.label(entry) or Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), "black")
+    draw = ImageDraw.Draw(img)
+    line_h = font_line_height(font_small)
+    top = DISPLAY_HEIGHT - line_h * 3 - 4
+    draw.rectangle((0, top, DISPLAY_WIDTH, DISPLAY_HEIGHT), fill=(0, 0, 0))
+    font_atlas.text(draw, (3, top + 2), entry["title"], font=font_small, fill=(255, 255, 255))
+    if entry["author"]:
+        font_atlas.text(draw, (3, top + 2 + line_h), entry["author"], font=font_small, fill=(194, 195, 199))
+    font_atlas.text(draw, (3, top + 2 + line_h * 2), "Press=Run 1=Back", font=font_small, fill=(0, 255, 255))
+    thread_safe_display(img)
+
+
+def selected_cart():
+    """Return the index entry of the highlighted cart, or None on Back or the placeholder."""
+    with list_lock:
+        index = menu_instance.selected_item
+        return pico8_carts_list[index] if index < len(pico8_carts_list) else None
+
+
+def show_cart_label():
+    entry = selected_cart()
+    if entry is not None:
+        menu_instance.current_screen = "pico8_cart_label"
+        draw_cart_label(entry)
+
+
+def handle_cart_label_input(pin_name):
+    """Browse labels with up/down, run the cart or return to the list."""
+    if pin_name in ("JOY_UP", "JOY_DOWN"):
+        step = -1 if pin_name == "JOY_UP" else 1
+        with list_lock:
+            menu_instance.selected_item = (menu_instance.selected_item + step) % len(pico8_carts_list)
+            entry = pico8_carts_list[menu_instance.selected_item]
+        draw_cart_label(entry)
+    elif pin_name == "JOY_PRESS":
+        entry = selected_cart()
+        if entry is not None:
+            start_pico8(entry["path"])
+    elif pin_name in ("KEY1", "KEY3"):
+        show_pico8_carts(keep_selection=True)
+
+
+def handle_pico8_carts_selection():
+    entry = selected_cart()
+    if entry is not None:
+        start_pico8(entry["path"])
+    else:
+        # "Back", or the placeholder shown when there are no carts
+        show_main_menu()
 
 
 def draw_sudo_password_screen():
@@ -3029,10 +3393,10 @@ def draw_sudo_password_screen():
     max_lines = (kb_y - 10) // line_h
     start = max(0, len(lines) - max_lines)
     y = 5
-    draw.text((5, y), "sudo password:", font=font_small, fill=(255, 255, 0))
+    font_atlas.text(draw, (5, y), "sudo password:", font=font_small, fill=(255, 255, 0))
     y += line_h
     for line in lines[start:]:
-        draw.text((5, y), line, font=font_medium, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, y), line, font=font_medium, fill=(255, 255, 255))
         y += line_h
 
     row_h = (DISPLAY_HEIGHT - kb_y - tips_height) // len(KEY_LAYOUT)
@@ -3057,10 +3421,10 @@ def draw_sudo_password_screen():
             bbox = draw.textbbox((0, 0), ch, font=font_small)
             tx = x + (this_key_w - (bbox[2] - bbox[0])) // 2
             ty = yk + (row_h - (bbox[3] - bbox[1])) // 2
-            draw.text((tx, ty), ch, font=font_small, fill=text_color)
+            font_atlas.text(draw, (tx, ty), ch, font=font_small, fill=text_color)
 
     tips = "1=Shift 2=Del 3=OK/Exit"
-    draw.text((5, DISPLAY_HEIGHT - tips_height + 2), tips, font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - tips_height + 2), tips, font=font_small, fill=(0, 255, 255))
 
     thread_safe_display(img)
 
@@ -3082,6 +3446,7 @@ def start_sudo_password(cmd):
 
 def run_sudo_command(cmd, password):
     """Run a sudo command using the provided password."""
+    import pexpect
     global shell_text, sudo_pending_cmd, sudo_pre_output, shell_proc, shell_lines, shell_keyboard_visible
     if shell_proc is None:
         shell_proc = pexpect.spawn("/bin/bash", encoding="utf-8", echo=False)
@@ -3137,11 +3502,13 @@ def handle_sudo_password_input(pin_name):
 
 def run_shell_command(cmd):
     """Execute the given command in a persistent shell."""
+    import pexpect
     global shell_text, shell_proc, shell_lines, sudo_pending_cmd, sudo_pre_output, shell_keyboard_visible
     if not cmd.strip():
         return
     if shell_proc is None:
         shell_proc = pexpect.spawn("/bin/bash", encoding="utf-8", echo=False)
+    journal.record("subprocess", cmd=cmd.split()[0], shell=True)
     shell_proc.sendline(f"{cmd}; echo __CMD_DONE__")
     try:
         idx = shell_proc.expect(["sudo password:", "__CMD_DONE__"], timeout=20)
@@ -3155,9 +3522,9 @@ def run_shell_command(cmd):
         output = "Command timed out"
     shell_lines.append(f"$ {cmd}")
     shell_lines.extend(output.splitlines())
-    if console_mode:
-        with open(console_log_path, "a") as f:
-            f.write(f"$ {cmd}\n{output}\n")
+    if console_mode and console_log:
+        # Buffered; the sink's flusher thread does the disk write
+        console_log.write(f"$ {cmd}\n{output}\n")
     shell_text = ""
     shell_keyboard_visible = False
     draw_shell_screen()
@@ -3231,25 +3598,27 @@ def draw_raspi_screen():
     """Render output from raspi-config in a small font."""
     img = Image.new("RGB", (DISPLAY_WIDTH, DISPLAY_HEIGHT), color="black")
     draw = ImageDraw.Draw(img)
-    draw.text((5, 5), "raspi-config", font=font_small, fill=(255, 255, 0))
+    font_atlas.text(draw, (5, 5), "raspi-config", font=font_small, fill=(255, 255, 0))
     with raspi_lock:
         lines = raspi_lines[-10:]
     y = 15
     line_h = draw.textbbox((0, 0), "A", font=font_small)[3] + 2
     for line in lines:
-        draw.text((5, y), line[:20], font=font_small, fill=(255, 255, 255))
+        font_atlas.text(draw, (5, y), line[:20], font=font_small, fill=(255, 255, 255))
         y += line_h
-    draw.text((5, DISPLAY_HEIGHT - 10), "1=Exit", font=font_small, fill=(0, 255, 255))
+    font_atlas.text(draw, (5, DISPLAY_HEIGHT - 10), "1=Exit", font=font_small, fill=(0, 255, 255))
     thread_safe_display(img)
 
 
 def start_raspi_config():
     """Launch raspi-config using pexpect."""
+    import pexpect
     global raspi_proc, raspi_lines
     stop_scrolling()
     env = os.environ.copy()
     env["LINES"] = "15"
     env["COLUMNS"] = "32"
+    journal.record("subprocess", cmd="raspi-config")
     raspi_proc = pexpect.spawn("sudo raspi-config", env=env, encoding="utf-8")
     raspi_lines = []
     try:
@@ -3315,11 +3684,11 @@ def update_backlight():
 def draw_brightness_screen():
     img = Image.new('RGB', (DISPLAY_WIDTH, DISPLAY_HEIGHT), color='black')
     draw = ImageDraw.Draw(img)
-    draw.text((5, 5), "Brightness", font=font_large, fill=(255, 255, 0))
+    font_atlas.text(draw, (5, 5), "Brightness", font=font_large, fill=(255, 255, 0))
     bar_width = int((DISPLAY_WIDTH - 10) * brightness_level / 100)
     draw.rectangle([(5, 30), (5 + bar_width, 50)], fill=(0, 255, 0))
     draw.rectangle([(5, 30), (DISPLAY_WIDTH - 5, 50)], outline=(255, 255, 255))
-    draw.text((5, 55), f"{brightness_level}%", font=font_medium, fill=(255, 255, 255))
+    font_atlas.text(draw, (5, 55), f"{brightness_level}%", font=font_medium, fill=(255, 255, 255))
     thread_safe_display(img)
 
 
@@ -3477,27 +3846,21 @@ def handle_bluetooth_menu_selection(selection):
         show_settings_menu()
 
 
+# Games menu entries that live in this file, by the registry game they follow
+GAMES_MENU_EXTRAS = {
+    "Doctor Mode": ["Button Game", "Launch Codes"],
+    "Two Player Trivia": ["Mini Games"],
+}
+
+
 def show_games_menu():
     stop_scrolling()
     menu_instance.max_visible_items = compute_max_visible_items(menu_instance.font)
-    menu_instance.items = [
-        "Doctor Mode",
-        "Button Game",
-        "Launch Codes",
-        "Snake",
-        "Tetris",
-        "Rock Paper Scissors",
-        "Space Invaders",
-        "Vet Adventure",
-        "Axe",
-        "Trivia",
-        "Two Player Trivia",
-        "Mini Games",
-        "Hack In",
-        "Pico WoW",
-        "GTA 1997",
-        "Back",
-    ]
+    items = []
+    for label in games.labels():
+        items.append(label)
+        items.extend(GAMES_MENU_EXTRAS.get(label, []))
+    menu_instance.items = items + ["Back"]
     menu_instance.selected_item = 0
     menu_instance.view_start = 0
     menu_instance.current_screen = "games"
@@ -3505,60 +3868,28 @@ def show_games_menu():
 
 
 def handle_games_selection(selection):
-    if selection == "Doctor Mode":
-        start_doctor_mode()
-        return
     if selection == "Button Game":
         start_button_game()
         return
     elif selection == "Launch Codes":
         start_launch_codes()
         return
-    elif selection == "Snake":
-        start_snake()
-        return
-    elif selection == "Tetris":
-        start_tetris()
-        return
-    elif selection == "Rock Paper Scissors":
-        start_rps()
-        return
-    elif selection == "Space Invaders":
-        start_space_invaders()
-        return
-    elif selection == "Vet Adventure":
-        start_vet_adventure()
-        return
-    elif selection == "Axe":
-        start_axe()
-        return
-    elif selection == "Trivia":
-        start_trivia()
-        return
-    elif selection == "Two Player Trivia":
-        start_two_player_trivia()
-        return
     elif selection == "Mini Games":
         start_mini_games()
         return
-    elif selection == "Hack In":
-        start_hack_in()
-        return
-    elif selection == "Pico WoW":
-        start_pico_wow()
-        return
-    elif selection == "GTA 1997":
-        start_gta_1997()
-        return
     elif selection == "Back":
         show_main_menu()
+        return
+    name = games.by_label(selection)
+    if name:
+        start_game(name)
 
 
 def show_notes_menu():
     """Submenu for Notes with write/read options."""
     stop_scrolling()
     menu_instance.max_visible_items = compute_max_visible_items(menu_instance.font)
-    menu_instance.items = ["Novel Typer", "Write Note", "Read Note"]
+    menu_instance.items = ["Novel Typer", "Write Note", "Read Note", "Search Notes"]
     menu_instance.selected_item = 0
     menu_instance.view_start = 0
     menu_instance.current_screen = "notes_menu"
@@ -3575,6 +3906,9 @@ def handle_notes_menu_selection(selection):
     elif selection == "Read Note":
         show_notes_list()
         return
+    elif selection == "Search Notes":
+        start_notes_search()
+        return
     show_main_menu()
 
 
@@ -3584,6 +3918,7 @@ def show_utilities_menu():
     menu_instance.max_visible_items = compute_max_visible_items(menu_instance.font)
     menu_instance.items = [
         "System Monitor",
+        "Profiler",
         "Network Info",
         "Date & Time",
         "Show Info",
@@ -3601,6 +3936,8 @@ def show_utilities_menu():
 def handle_utilities_selection(selection):
     if selection == "System Monitor":
         run_system_monitor()
+    elif selection == "Profiler":
+        show_profiler()
     elif selection == "Network Info":
         show_network_info()
     elif selection == "Date & Time":
@@ -3627,6 +3964,7 @@ def show_main_menu():
         "Utilities",
         "Settings",
         "Launch Pico-8",
+        "Pico-8 Carts",
     ]
     menu_instance.selected_item = 0
     menu_instance.view_start = 0
@@ -3670,24 +4008,54 @@ def handle_menu_selection(selection):
     elif selection == "Settings":
         show_settings_menu()
     elif selection == "Launch Pico-8":
+        # Runs in the background; the menu comes back when it exits
         start_pico8()
+        return
+    elif selection == "Pico-8 Carts":
+        show_pico8_carts()
     
     # After any program finishes, redraw the menu
     menu_instance.draw()
 
+# Hot paths timed while the profiler is switched on
+profiler.wrap_globals(globals(), lambda n: n in ("thread_safe_display", "wrap_text") or n.startswith("draw_"))
+Menu.draw = profiler.wrap(Menu.draw, "Menu.draw")
+
+
+def start_background_services():
+    """Bring up non-essential services after the menu is on screen.
+
+    The web server is not started here; it still starts on demand from
+    Utilities. Chat keeps reconnecting in the background, sooner when Wi-Fi
+    comes back.
+    """
+    def task():
+        try:
+            metrics_store.start()
+        except (OSError, ValueError) as e:
+            print(f"Metrics history unavailable: {e}")
+            metrics.start()
+        start_bluetooth_session()
+        font_atlas.prebuild(AVAILABLE_FONTS.values(), font_sizes())
+        connect_irc()
+        net_monitor.start()
+        mark_boot("services")
+        save_boot_times()
+
+    threading.Thread(target=task, daemon=True).start()
+
+
 # --- Main Execution ---
 if __name__ == "__main__":
+    journal.start()
     load_settings()
     menu_instance = Menu([])
-    connect_irc()
     show_main_menu()
-    start_bt_log_monitor()
+    mark_boot("menu")
+    start_background_services()
 
     # Attach event detection to all desired pins after the menu is ready
-    for pin_name, pin_num in BUTTON_PINS.items():
-        # Detect both rising and falling edges to track press/release for robustness
-        GPIO.add_event_detect(pin_num, GPIO.BOTH, callback=button_event_handler, bouncetime=100)
-        # bouncetime in ms helps filter out noise.
+    attach_buttons(button_event_handler)
 
     try:
         # Initialize backlight PWM for brightness control
@@ -3723,4 +4091,5 @@ if __name__ == "__main__":
         except Exception as cleanup_e:
             print(f"Error during cleanup: {cleanup_e}")
         GPIO.cleanup() # Always clean up GPIO 
+        journal.stop()
         print("Mini-OS Exited.")
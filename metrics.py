@@ -0,0 +1,200 @@
+"""System metrics read straight from procfs and sysfs.
+
+Each source file is opened once and re-read with ``os.pread`` at offset 0,
+which makes the kernel regenerate its contents without another open/close
+pair. Temperature comes from ``/sys/class/thermal`` instead of spawning
+``vcgencmd``, and per-core CPU utilization is computed from ``/proc/stat``
+deltas between samples. A background thread samples once per interval and
+keeps a fixed-size history for each metric so screens can draw sparklines
+without doing any I/O themselves.
+"""
+
+import glob
+import os
+import threading
+import time
+from collections import deque
+
+THERMAL_GLOB = "/sys/class/thermal/thermal_zone*"
+CPUFREQ_PATH = "/sys/devices/system/cpu/cpu0/cpufreq/scaling_cur_freq"
+INTERVAL = 1.0
+HISTORY = 120
+# Disk usage changes slowly, so statvfs runs less often than the rest
+DISK_INTERVAL = 30.0
+READ_SIZE = 16384
+
+SERIES = ("temp_c", "cpu_pct", "mem_pct", "freq_mhz", "load1")
+
+_fds = {}
+_fd_lock = threading.Lock()
+_history = {name: deque(maxlen=HISTORY) for name in SERIES}
+_latest = {}
+_cores = []
+_prev_stat = None
+_disk_checked = 0.0
+_thread = None
+_listeners = []
+
+
+def _read(path):
+    """Return the current contents of ``path`` through a cached descriptor, or None."""
+    with _fd_lock:
+        if path not in _fds:
+            try:
+                _fds[path] = os.open(path, os.O_RDONLY)
+            except OSError:
+                # Remember missing sources so they are not retried every sample
+                _fds[path] = None
+        fd = _fds[path]
+        if fd is None:
+            return None
+        try:
+            return os.pread(fd, READ_SIZE, 0).decode("ascii", "replace")
+        except OSError:
+            return None
+
+
+def _thermal_path():
+    """Prefer the CPU thermal zone; fall back to the first one."""
+    zones = sorted(glob.glob(THERMAL_GLOB))
+    for zone in zones:
+        try:
+            with open(os.path.join(zone, "type")) as f:
+                if "cpu" in f.read().lower():
+                    return os.path.join(zone, "temp")
+        except OSError:
+            continue
+    return os.path.join(zones[0], "temp") if zones else None
+
+
+_thermal = _thermal_path()
+
+
+def _parse_stat(text):
+    """Return {cpu name: (busy, total)} jiffies from /proc/stat."""
+    times = {}
+    for line in text.splitlines():
+        if not line.startswith("cpu"):
+            break
+        parts = line.split()
+        values = [int(v) for v in parts[1:9]]
+        idle = values[3] + values[4]
+        total = sum(values)
+        times[parts[0]] = (total - idle, total)
+    return times
+
+
+def _parse_meminfo(text):
+    info = {}
+    for line in text.splitlines():
+        key, _, rest = line.partition(":")
+        if key in ("MemTotal", "MemAvailable"):
+            info[key] = int(rest.split()[0])
+            if len(info) == 2:
+                break
+    return info
+
+
+def sample():
+    """Read every source once, update the history and return the new values."""
+    global _prev_stat, _cores, _disk_checked
+    values = {}
+
+    text = _read(_thermal) if _thermal else None
+    if text:
+        values["temp_c"] = int(text.strip()) / 1000
+
+    text = _read("/proc/stat")
+    if text:
+        stat = _parse_stat(text)
+        if _prev_stat:
+            usage = {}
+            for name, (busy, total) in stat.items():
+                prev_busy, prev_total = _prev_stat.get(name, (busy, total))
+                span = total - prev_total
+                usage[name] = 100.0 * (busy - prev_busy) / span if span > 0 else 0.0
+            values["cpu_pct"] = usage.get("cpu", 0.0)
+            _cores = [usage[n] for n in sorted((n for n in usage if n != "cpu"), key=lambda n: int(n[3:]))]
+        _prev_stat = stat
+
+    text = _read("/proc/meminfo")
+    if text:
+        info = _parse_meminfo(text)
+        total = info.get("MemTotal", 0)
+        if total:
+            used = total - info.get("MemAvailable", 0)
+            values["mem_used_mb"] = used // 1024
+            values["mem_total_mb"] = total // 1024
+            values["mem_pct"] = 100.0 * used / total
+
+    text = _read(CPUFREQ_PATH)
+    if text:
+        values["freq_mhz"] = int(text.strip()) / 1000
+
+    text = _read("/proc/loadavg")
+    if text:
+        values["load1"] = float(text.split()[0])
+
+    now = time.monotonic()
+    if now - _disk_checked >= DISK_INTERVAL or "disk_used_gb" not in _latest:
+        _disk_checked = now
+        try:
+            st = os.statvfs("/")
+            values["disk_used_gb"] = (st.f_blocks - st.f_bfree) * st.f_frsize / 1024 ** 3
+            values["disk_total_gb"] = st.f_blocks * st.f_frsize / 1024 ** 3
+        except OSError:
+            pass
+    else:
+        values["disk_used_gb"] = _latest["disk_used_gb"]
+        values["disk_total_gb"] = _latest.get("disk_total_gb")
+
+    for name in SERIES:
+        if name in values:
+            _history[name].append(values[name])
+    values["time"] = time.time()
+    _latest.clear()
+    _latest.update(values)
+    for listener in list(_listeners):
+        try:
+            listener(values)
+        except Exception as e:
+            print(f"Metrics listener failed: {e}")
+    return values
+
+
+def _run(interval):
+    while True:
+        try:
+            sample()
+        except Exception as e:
+            print(f"Metrics sample failed: {e}")
+        time.sleep(interval)
+
+
+def start(interval=INTERVAL):
+    """Start sampling in the background. Safe to call more than once."""
+    global _thread
+    if _thread is not None:
+        return
+    _thread = threading.Thread(target=_run, args=(interval,), daemon=True)
+    _thread.start()
+
+
+def add_listener(callback):
+    """Call ``callback(values)`` after every sample."""
+    _listeners.append(callback)
+
+
+def latest():
+    """Return the most recent sample."""
+    return dict(_latest)
+
+
+def history(name):
+    """Return the recorded values of one metric, oldest first."""
+    return list(_history.get(name, ()))
+
+
+def cores():
+    """Return the latest utilization of each core in percent."""
+    return list(_cores)
@@ -0,0 +1,183 @@
+"""Fixed-size, memory-mapped history of the system metrics.
+
+The store keeps round-robin archives at several resolutions (by default 1 s
+for an hour, 1 min for a day and 1 h for 90 days) in a single file that is
+created at its final size and never grows. Each row holds its slot's start
+time and, per metric, the sum, count and maximum of the samples that fell
+into it, so coarse archives keep both the average and short spikes such as
+thermal throttling. Updates are plain writes into the mapping; the kernel
+writes dirty pages back and ``flush`` forces it periodically.
+
+A row whose timestamp does not match the slot being read is stale (left over
+from an earlier lap around the ring) and is treated as missing.
+"""
+
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+import metrics
+
+STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "metrics.rrd")
+# (seconds per row, rows)
+ARCHIVES = ((1, 3600), (60, 1440), (3600, 90 * 24))
+MAGIC = b"PICORRD1"
+HEADER_SIZE = 256
+FLUSH_INTERVAL = 300
+
+
+class RoundRobinStore:
+    """Round-robin archives of several series in one memory-mapped file."""
+
+    def __init__(self, path, series=metrics.SERIES, archives=ARCHIVES, writable=True):
+        self.path = path
+        self.series = tuple(series)
+        self.archives = tuple(archives)
+        # Slot start, then sum, count and max for every series
+        self.row = struct.Struct("<q" + "ddd" * len(self.series))
+        layout = ",".join(self.series) + "|" + ",".join(f"{s}x{n}" for s, n in self.archives)
+        self.header = (MAGIC + layout.encode("ascii")).ljust(HEADER_SIZE, b"\0")
+        if len(self.header) > HEADER_SIZE:
+            raise ValueError("Store layout does not fit in the header")
+        self.bases = []
+        offset = HEADER_SIZE
+        for _, rows in self.archives:
+            self.bases.append(offset)
+            offset += rows * self.row.size
+        self.size = offset
+        self._lock = threading.Lock()
+        self._mm = self._open(writable)
+        self._flushed = time.monotonic()
+
+    def _open(self, writable):
+        if not writable:
+            with open(self.path, "rb") as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            if len(mm) != self.size or mm[:HEADER_SIZE] != self.header:
+                mm.close()
+                raise ValueError(f"{self.path} has a different layout")
+            return mm
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            with os.fdopen(os.dup(fd), "r+b") as f:
+                f.seek(0)
+                current = f.read(HEADER_SIZE)
+                if current != self.header or os.fstat(fd).st_size != self.size:
+                    # New file or a different layout: start over at the final size
+                    f.truncate(0)
+                    f.truncate(self.size)
+                    f.seek(0)
+                    f.write(self.header)
+                    f.flush()
+            return mmap.mmap(fd, self.size)
+        finally:
+            os.close(fd)
+
+    def _slot(self, archive, t):
+        step, rows = self.archives[archive]
+        start = int(t) // step * step
+        return start, self.bases[archive] + (start // step) % rows * self.row.size
+
+    def update(self, values, t=None):
+        """Fold one sample of ``values`` (a dict of series -> number) into every archive."""
+        t = time.time() if t is None else t
+        with self._lock:
+            for archive in range(len(self.archives)):
+                start, offset = self._slot(archive, t)
+                fields = list(self.row.unpack_from(self._mm, offset))
+                if fields[0] != start:
+                    fields = [start] + [0.0, 0.0, math.nan] * len(self.series)
+                for i, name in enumerate(self.series):
+                    value = values.get(name)
+                    if value is None:
+                        continue
+                    j = 1 + i * 3
+                    fields[j] += value
+                    fields[j + 1] += 1
+                    if not fields[j + 2] >= value:
+                        fields[j + 2] = value
+                self.row.pack_into(self._mm, offset, *fields)
+            if time.monotonic() - self._flushed >= FLUSH_INTERVAL:
+                self.flush()
+
+    def flush(self):
+        """Write dirty pages back to the file."""
+        self._mm.flush()
+        self._flushed = time.monotonic()
+
+    def close(self):
+        try:
+            self.flush()
+        except (ValueError, OSError):
+            pass
+        self._mm.close()
+
+    def archive_for(self, span):
+        """Return the finest archive that covers ``span`` seconds."""
+        for i, (step, rows) in enumerate(self.archives):
+            if step * rows >= span:
+                return i
+        return len(self.archives) - 1
+
+    def fetch(self, name, start, end=None, archive=None):
+        """Return ``(time, mean, max)`` points for one series between ``start`` and ``end``."""
+        end = time.time() if end is None else end
+        if archive is None:
+            archive = self.archive_for(end - start)
+        step, rows = self.archives[archive]
+        i = self.series.index(name)
+        start = max(start, end - step * rows)
+        points = []
+        slot = int(start) // step * step
+        while slot <= end:
+            _, offset = self._slot(archive, slot)
+            fields = self.row.unpack_from(self._mm, offset)
+            total, count, peak = fields[1 + i * 3: 4 + i * 3]
+            if fields[0] == slot and count:
+                points.append((slot, total / count, peak))
+            slot += step
+        return points
+
+    def latest(self):
+        """Return the newest complete values from the finest archive."""
+        now = time.time()
+        for t in (now - 1, now):
+            _, offset = self._slot(0, t)
+            fields = self.row.unpack_from(self._mm, offset)
+            if fields[0] == int(t) // self.archives[0][0] * self.archives[0][0]:
+                values = {}
+                for i, name in enumerate(self.series):
+                    total, count, _ = fields[1 + i * 3: 4 + i * 3]
+                    if count:
+                        values[name] = total / count
+                if values:
+                    return values
+        return {}
+
+
+_store = None
+
+
+def start(path=STORE_PATH):
+    """Record every metrics sample into the store from now on."""
+    global _store
+    if _store is not None:
+        return _store
+    _store = RoundRobinStore(path)
+    metrics.add_listener(_store.update)
+    metrics.start()
+    return _store
+
+
+def get(path=STORE_PATH):
+    """Return the recording store, or a read-only view of the file if nothing records here."""
+    if _store is not None:
+        return _store
+    try:
+        return RoundRobinStore(path, writable=False)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,196 @@
+"""Event-driven Wi-Fi connectivity state.
+
+A netlink route socket delivers link and address changes as they happen,
+so the state only has to be refreshed when the kernel reports one. Reading
+the current state runs no subprocess:
+
+- The IPv4 address comes from an ioctl.
+- The link state comes from sysfs.
+- Signal strength comes from ``/proc/net/wireless``. It changes without a
+  netlink event, so it is re-read every ``SIGNAL_INTERVAL`` seconds.
+
+``iwgetid`` is only run to learn the SSID after the link changes.
+
+``state()`` returns the cached values for any screen or the web server, and
+listeners are called whenever something they could display changes.
+"""
+
+import errno
+import fcntl
+import glob
+import os
+import socket
+import struct
+import subprocess
+import threading
+import time
+
+import journal
+
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV6_IFADDR = 0x100
+SIOCGIFADDR = 0x8915
+SIGNAL_INTERVAL = 30
+# Netlink events arrive in bursts while associating; settle before re-reading
+SETTLE_TIME = 0.5
+# /proc/net/wireless reports link quality out of 70 on most drivers
+LINK_QUALITY_MAX = 70
+
+
+def _wifi_interface():
+    found = sorted(glob.glob("/sys/class/net/*/wireless"))
+    return found[0].split("/")[4] if found else "wlan0"
+
+
+INTERFACE = _wifi_interface()
+
+_state = {"interface": INTERFACE, "connected": False, "ssid": None, "signal": None, "ip": None, "changed": 0.0}
+_lock = threading.Lock()
+_listeners = []
+_wake = threading.Event()
+_thread = None
+
+
+def add_listener(callback):
+    """Call ``callback(state)`` after the connection, SSID, IP or signal changes."""
+    _listeners.append(callback)
+
+
+def state():
+    """Return the cached connectivity state."""
+    with _lock:
+        return dict(_state)
+
+
+def is_connected():
+    return _state["connected"]
+
+
+def _ipv4(ifname):
+    s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        packed = fcntl.ioctl(s.fileno(), SIOCGIFADDR, struct.pack("256s", ifname[:15].encode()))
+        return socket.inet_ntoa(packed[20:24])
+    except OSError:
+        return None
+    finally:
+        s.close()
+
+
+def _link_up(ifname):
+    try:
+        with open(f"/sys/class/net/{ifname}/operstate") as f:
+            return f.read().strip() in ("up", "unknown")
+    except OSError:
+        return False
+
+
+def _signal(ifname):
+    """Return link quality in percent from /proc/net/wireless, or None."""
+    try:
+        with open("/proc/net/wireless") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name.strip() == ifname:
+                    quality = float(rest.split()[1].rstrip("."))
+                    return max(0, min(100, round(quality * 100 / LINK_QUALITY_MAX)))
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _ssid(ifname):
+    try:
+        return subprocess.check_output(["iwgetid", "-r", ifname], stderr=subprocess.DEVNULL, text=True).strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def refresh(link_changed=True):
+    """Re-read the state now; the SSID is only looked up when the link changed."""
+    up = _link_up(INTERFACE)
+    ip = _ipv4(INTERFACE) if up else None
+    signal = _signal(INTERFACE) if up else None
+    with _lock:
+        ssid = _state["ssid"]
+    if link_changed or (up and ssid is None):
+        ssid = _ssid(INTERFACE) if up else None
+    connected = bool(up and ip and ssid)
+    with _lock:
+        before = dict(_state)
+        _state.update(connected=connected, ssid=ssid, signal=signal, ip=ip)
+        changed = any(_state[k] != before[k] for k in ("connected", "ssid", "signal", "ip"))
+        if changed:
+            _state["changed"] = time.time()
+        current = dict(_state)
+    if changed:
+        if current["connected"] != before["connected"] or current["ssid"] != before["ssid"]:
+            journal.record("wifi", connected=connected, ssid=ssid, ip=ip)
+        for listener in list(_listeners):
+            try:
+                listener(current)
+            except Exception as e:
+                print(f"Network listener failed: {e}")
+    return current
+
+
+def _netlink_socket():
+    s = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+    s.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV6_IFADDR))
+    return s
+
+
+def _listen(sock):
+    while True:
+        try:
+            sock.recv(65536)
+        except OSError as e:
+            # ENOBUFS means a burst overflowed the socket and events were lost;
+            # the refresh re-reads everything, so just keep listening
+            if e.errno != errno.ENOBUFS:
+                print(f"Netlink receive failed: {e}")
+                time.sleep(SETTLE_TIME)
+        _wake.set()
+
+
+def _run():
+    try:
+        sock = _netlink_socket()
+        threading.Thread(target=_listen, args=(sock,), daemon=True).start()
+    except OSError as e:
+        # Without netlink the state is simply re-read on the signal timer
+        print(f"Netlink unavailable, polling network state: {e}")
+    refresh()
+    while True:
+        link_changed = _wake.wait(SIGNAL_INTERVAL)
+        if link_changed:
+            time.sleep(SETTLE_TIME)
+            _wake.clear()
+        try:
+            refresh(link_changed)
+        except Exception as e:
+            print(f"Network refresh failed: {e}")
+
+
+def start():
+    """Start following network changes in the background. Safe to call more than once."""
+    global _thread
+    if _thread is not None:
+        return
+    _thread = threading.Thread(target=_run, daemon=True)
+    _thread.start()
+
+
+def radio_enabled():
+    """Return False if the Wi-Fi radio is soft-blocked, True otherwise."""
+    for path in glob.glob("/sys/class/rfkill/rfkill*"):
+        try:
+            with open(os.path.join(path, "type")) as f:
+                if f.read().strip() != "wlan":
+                    continue
+            with open(os.path.join(path, "soft")) as f:
+                return f.read().strip() == "0"
+        except OSError:
+            continue
+    return True
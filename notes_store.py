@@ -0,0 +1,340 @@
+"""Notes storage shared by the device and the web interface.
+
+Notes stay plain ``.txt`` files in ``notes/`` so they can still be copied off
+the SD card, but their metadata (title, size, mtime) lives in a small SQLite
+index under ``cache/``. Listing a page of notes only reads the index. New file
+numbers come from a per-prefix counter that is bumped inside a transaction,
+so concurrent writers never pick the same name. Bodies are written to a
+temporary file and renamed into place, so a crash leaves either the old note
+or the new one and never a truncated file.
+
+The same index holds an inverted word index for full-text search. It is
+updated with each write, delete or re-sync, so queries never scan note bodies.
+
+Files added or removed behind the store's back (for example over scp) are
+picked up the next time the directory's mtime changes.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+NOTES_DIR = os.path.join(BASE_DIR, "notes")
+# Kept outside notes/ so SQLite's journal files don't touch the directory mtime
+DB_PATH = os.path.join(BASE_DIR, "cache", "notes_index.db")
+TITLE_LENGTH = 40
+# Bump when the index layout changes so existing notes are re-indexed
+SCHEMA_VERSION = "2"
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+NAME_PATTERN = re.compile(r"^([A-Za-z_-]*?)(\d*)\.txt$")
+
+_conn = None
+_lock = threading.Lock()
+
+
+def _connect():
+    global _conn
+    if _conn is None:
+        os.makedirs(NOTES_DIR, exist_ok=True)
+        os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+        _conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        _conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS notes (
+                name TEXT PRIMARY KEY,
+                prefix TEXT NOT NULL,
+                num INTEGER,
+                title TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS notes_prefix ON notes (prefix, num);
+            CREATE INDEX IF NOT EXISTS notes_mtime ON notes (mtime);
+            CREATE TABLE IF NOT EXISTS counters (
+                prefix TEXT PRIMARY KEY,
+                next INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS terms (
+                term TEXT NOT NULL,
+                name TEXT NOT NULL,
+                hits INTEGER NOT NULL,
+                PRIMARY KEY (term, name)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS terms_name ON terms (name);
+            """
+        )
+        row = _conn.execute("SELECT value FROM meta WHERE key='schema'").fetchone()
+        if not row or row[0] != SCHEMA_VERSION:
+            # Forget the directory stamp so the next sync re-reads every note
+            _conn.execute("DELETE FROM notes")
+            _conn.execute("DELETE FROM terms")
+            _conn.execute("DELETE FROM meta WHERE key='dir_mtime'")
+            _conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('schema', ?)", (SCHEMA_VERSION,))
+    return _conn
+
+
+def _split_name(name):
+    m = NAME_PATTERN.match(name)
+    if not m:
+        return "", None
+    return m.group(1), int(m.group(2)) if m.group(2) else None
+
+
+def _title(text):
+    for line in text.splitlines():
+        line = line.strip()
+        if line:
+            return line[:TITLE_LENGTH]
+    return ""
+
+
+def _check_name(name):
+    if not name or os.path.basename(name) != name or not name.lower().endswith(".txt"):
+        raise ValueError(f"Invalid note name: {name!r}")
+
+
+def _dir_mtime():
+    try:
+        return str(os.stat(NOTES_DIR).st_mtime_ns)
+    except OSError:
+        return ""
+
+
+def words(text):
+    """Return how often each searchable word occurs in ``text``."""
+    counts = {}
+    for word in WORD_PATTERN.findall(text.lower()):
+        counts[word] = counts.get(word, 0) + 1
+    return counts
+
+
+def _index_file(db, name, text=None):
+    path = os.path.join(NOTES_DIR, name)
+    st = os.stat(path)
+    if text is None:
+        with open(path, errors="replace") as f:
+            text = f.read()
+    prefix, num = _split_name(name)
+    db.execute("DELETE FROM terms WHERE name=?", (name,))
+    db.executemany(
+        "INSERT INTO terms (term, name, hits) VALUES (?, ?, ?)",
+        ((word, name, hits) for word, hits in words(text).items()),
+    )
+    db.execute(
+        "INSERT OR REPLACE INTO notes (name, prefix, num, title, size, mtime) VALUES (?, ?, ?, ?, ?, ?)",
+        (name, prefix, num, _title(text), st.st_size, st.st_mtime),
+    )
+    if num is not None:
+        db.execute(
+            "INSERT INTO counters (prefix, next) VALUES (?, ?)"
+            " ON CONFLICT(prefix) DO UPDATE SET next=MAX(next, excluded.next)",
+            (prefix, num + 1),
+        )
+
+
+def _reconcile(db):
+    """Index files added, changed or removed on disk; callers hold an open transaction.
+
+    The directory stamp is taken before scanning and returned, so a file that
+    lands during the scan changes the stamp again and is picked up next time.
+    """
+    stamp = _dir_mtime()
+    on_disk = {}
+    for entry in os.scandir(NOTES_DIR):
+        if entry.is_file() and entry.name.lower().endswith(".txt"):
+            st = entry.stat()
+            on_disk[entry.name] = (st.st_size, st.st_mtime)
+    indexed = {r[0]: (r[1], r[2]) for r in db.execute("SELECT name, size, mtime FROM notes")}
+    changed = []
+    for name in indexed.keys() - on_disk.keys():
+        db.execute("DELETE FROM notes WHERE name=?", (name,))
+        db.execute("DELETE FROM terms WHERE name=?", (name,))
+        changed.append(("delete", name))
+    for name, stat in on_disk.items():
+        if indexed.get(name) != stat:
+            _index_file(db, name)
+            changed.append(("write", name))
+    db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('dir_mtime', ?)", (stamp,))
+    return changed
+
+
+def _sync(db):
+    """Bring the index in line with the directory if it changed on disk."""
+    row = db.execute("SELECT value FROM meta WHERE key='dir_mtime'").fetchone()
+    if row and row[0] == _dir_mtime():
+        return []
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        changed = _reconcile(db)
+        db.execute("COMMIT")
+    except Exception:
+        db.execute("ROLLBACK")
+        raise
+    return changed
+
+
+def sync():
+    """Re-index notes that were added, changed or removed outside the store."""
+    with _lock:
+        _sync(_connect())
+
+
+def allocate(prefix="note"):
+    """Reserve and return the next unused file name for ``prefix``."""
+    sync()
+    with _lock:
+        db = _connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT next FROM counters WHERE prefix=?", (prefix,)).fetchone()
+            num = row[0] if row else 1
+            db.execute("INSERT OR REPLACE INTO counters (prefix, next) VALUES (?, ?)", (prefix, num + 1))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+    return f"{prefix}{num}.txt"
+
+
+def write(name, text):
+    """Atomically replace the body of ``name`` and update its index entry."""
+    _check_name(name)
+    sync()
+    path = os.path.join(NOTES_DIR, name)
+    tmp = os.path.join(NOTES_DIR, f".{name}.tmp")
+    with open(tmp, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    with _lock:
+        db = _connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            _index_file(db, name, text)
+            # Our own write changed the directory stamp; anything else that
+            # arrived meanwhile must be indexed before the stamp is stored
+            _reconcile(db)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+    return name
+
+
+def create(text, prefix="note"):
+    """Save ``text`` as a new note and return its file name."""
+    return write(allocate(prefix), text)
+
+
+def read(name):
+    """Return the full body of a note."""
+    _check_name(name)
+    with open(os.path.join(NOTES_DIR, name)) as f:
+        return f.read()
+
+
+def path(name):
+    """Return the file path of a note."""
+    _check_name(name)
+    return os.path.join(NOTES_DIR, name)
+
+
+def delete(name):
+    """Remove a note and its index entry."""
+    _check_name(name)
+    try:
+        os.remove(os.path.join(NOTES_DIR, name))
+    except FileNotFoundError:
+        pass
+    with _lock:
+        db = _connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM notes WHERE name=?", (name,))
+            db.execute("DELETE FROM terms WHERE name=?", (name,))
+            _reconcile(db)
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+
+def _row(r):
+    return {"name": r[0], "title": r[1], "size": r[2], "mtime": r[3]}
+
+
+def get(name):
+    """Return the index entry for ``name`` or None."""
+    sync()
+    with _lock:
+        r = _connect().execute(
+            "SELECT name, title, size, mtime FROM notes WHERE name=?", (name,)
+        ).fetchone()
+    return _row(r) if r else None
+
+
+def list_notes(offset=0, limit=-1, prefix=None, newest_first=False):
+    """Return a page of note entries without opening any note bodies."""
+    sync()
+    order = "mtime DESC, name" if newest_first else "name"
+    where, args = "", []
+    if prefix is not None:
+        where, args = "WHERE prefix=?", [prefix]
+    with _lock:
+        rows = _connect().execute(
+            f"SELECT name, title, size, mtime FROM notes {where} ORDER BY {order} LIMIT ? OFFSET ?",
+            args + [limit, offset],
+        ).fetchall()
+    return [_row(r) for r in rows]
+
+
+def count(prefix=None):
+    """Return how many notes exist, optionally only those with ``prefix``."""
+    sync()
+    with _lock:
+        db = _connect()
+        if prefix is None:
+            return db.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+        return db.execute("SELECT COUNT(*) FROM notes WHERE prefix=?", (prefix,)).fetchone()[0]
+
+
+def search(query, limit=50):
+    """Return notes containing every word of ``query``, best matches first.
+
+    Each query word matches as a prefix, so ``blue`` also finds ``bluetooth``.
+    """
+    query_words = list(dict.fromkeys(WORD_PATTERN.findall(query.lower())))
+    if not query_words:
+        return []
+    sync()
+    scores = None
+    with _lock:
+        db = _connect()
+        for word in query_words:
+            # Every term starting with ``word`` sorts between word and word + U+FFFF
+            found = dict(db.execute(
+                "SELECT name, SUM(hits) FROM terms WHERE term >= ? AND term < ? GROUP BY name",
+                (word, word + "\uffff"),
+            ))
+            if scores is None:
+                scores = found
+            else:
+                scores = {name: scores[name] + hits for name, hits in found.items() if name in scores}
+            if not scores:
+                return []
+        best = sorted(scores, key=lambda name: (-scores[name], name))[:limit]
+        placeholders = ",".join("?" * len(best))
+        rows = db.execute(
+            f"SELECT name, title, size, mtime FROM notes WHERE name IN ({placeholders})", best
+        ).fetchall()
+    entries = {r[0]: _row(r) for r in rows}
+    return [entries[name] for name in best if name in entries]
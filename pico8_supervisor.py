@@ -0,0 +1,119 @@
+"""Run Pico-8 as a supervised child process.
+
+``launch`` starts the console and returns immediately. A monitor thread
+waits for it to exit. Once a second it also reads the child's CPU time and
+resident memory from ``/proc/<pid>``, so ``stats()`` can report them while
+it runs. When the child exits, the session is recorded as a ``pico8``
+journal event (runtime, CPU seconds, mean CPU and peak memory). Then
+``on_exit(result)`` is called on the monitor thread, so the launcher can
+take the display back.
+"""
+
+import os
+import subprocess
+import threading
+import time
+
+import journal
+
+POLL_INTERVAL = 1.0
+STOP_TIMEOUT = 3.0
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_KB = os.sysconf("SC_PAGE_SIZE") // 1024
+
+_proc = None
+_stats = {}
+_lock = threading.Lock()
+
+
+def running():
+    return _proc is not None and _proc.poll() is None
+
+
+def stats():
+    """Return the current session's figures, or the last session's once it ended."""
+    with _lock:
+        return dict(_stats)
+
+
+def _cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as f:
+        # The command name may contain spaces; fields resume after its ')'
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+
+def _rss_kb(pid):
+    with open(f"/proc/{pid}/statm") as f:
+        return int(f.read().split()[1]) * PAGE_KB
+
+
+def launch(args, on_exit=None, cart=None):
+    """Start ``args`` unless Pico-8 is already running; raises OSError if it cannot start."""
+    global _proc
+    if running():
+        return False
+    proc = subprocess.Popen(args, stdin=subprocess.DEVNULL)
+    started = time.monotonic()
+    with _lock:
+        _proc = proc
+        _stats.clear()
+        _stats.update(pid=proc.pid, cart=cart, running=True, seconds=0.0, cpu_s=0.0,
+                      cpu_pct=0.0, rss_kb=0, peak_rss_kb=0, returncode=None, stopped=False)
+    threading.Thread(target=_monitor, args=(proc, started, on_exit), daemon=True).start()
+    return True
+
+
+def _monitor(proc, started, on_exit):
+    last_cpu, last_time = 0.0, started
+    while True:
+        try:
+            proc.wait(POLL_INTERVAL)
+            break
+        except subprocess.TimeoutExpired:
+            pass
+        now = time.monotonic()
+        try:
+            cpu, rss = _cpu_seconds(proc.pid), _rss_kb(proc.pid)
+        except (OSError, IndexError, ValueError):
+            # Exited between the wait and the read
+            continue
+        with _lock:
+            _stats.update(seconds=round(now - started, 1), cpu_s=round(cpu, 2), rss_kb=rss,
+                          cpu_pct=round(100 * (cpu - last_cpu) / max(now - last_time, 1e-6), 1),
+                          peak_rss_kb=max(_stats["peak_rss_kb"], rss))
+        last_cpu, last_time = cpu, now
+    seconds = time.monotonic() - started
+    with _lock:
+        _stats.update(running=False, returncode=proc.returncode, seconds=round(seconds, 1))
+        result = dict(_stats)
+    journal.record(
+        "pico8",
+        cart=result["cart"],
+        code=proc.returncode,
+        stopped=result["stopped"],
+        seconds=result["seconds"],
+        cpu_s=result["cpu_s"],
+        cpu_pct=round(100 * result["cpu_s"] / seconds, 1) if seconds else 0.0,
+        peak_rss_kb=result["peak_rss_kb"],
+    )
+    if on_exit:
+        try:
+            on_exit(result)
+        except Exception as e:
+            print(f"Pico-8 exit handler failed: {e}")
+
+
+def stop():
+    """Ask Pico-8 to quit, killing it if it does not within ``STOP_TIMEOUT``."""
+    proc = _proc
+    if proc is None or proc.poll() is not None:
+        return
+    with _lock:
+        # The exit that follows was asked for, not a crash
+        _stats["stopped"] = True
+    proc.terminate()
+    try:
+        proc.wait(STOP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        proc.kill()
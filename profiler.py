@@ -0,0 +1,155 @@
+"""Lightweight timers for the render and game hot paths.
+
+Functions are wrapped once at startup with ``wrap`` or ``wrap_globals``.
+While profiling is off, a wrapper only checks a module flag and calls
+through. While it is on, each call adds its duration to a per-name counter
+and to a histogram of power-of-two microsecond buckets, so percentiles can be
+estimated without storing samples.
+
+For questions the timers can't answer, ``sample`` polls every thread's stack
+and returns them in the folded "frame;frame;frame count" format written by
+``py-spy record --format raw``, which flamegraph tools read directly.
+"""
+
+import functools
+import sys
+import threading
+import time
+
+BUCKETS = 25  # 1 us .. ~16 s
+
+_enabled = False
+_stats = {}
+_lock = threading.Lock()
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(on):
+    """Turn timing on or off at runtime."""
+    global _enabled
+    _enabled = bool(on)
+
+
+def reset():
+    """Forget all collected timings."""
+    with _lock:
+        _stats.clear()
+
+
+def _add(name, elapsed_ns):
+    us = elapsed_ns // 1000
+    bucket = min(BUCKETS - 1, us.bit_length())
+    with _lock:
+        stat = _stats.get(name)
+        if stat is None:
+            stat = _stats[name] = [0, 0, 0, [0] * BUCKETS]
+        stat[0] += 1
+        stat[1] += elapsed_ns
+        if elapsed_ns > stat[2]:
+            stat[2] = elapsed_ns
+        stat[3][bucket] += 1
+
+
+def wrap(fn, name=None):
+    """Return ``fn`` wrapped so its calls are timed while profiling is on."""
+    if getattr(fn, "__profiled__", False):
+        return fn
+    label = name or fn.__qualname__
+
+    @functools.wraps(fn)
+    def timed(*args, **kwargs):
+        if not _enabled:
+            return fn(*args, **kwargs)
+        start = time.perf_counter_ns()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _add(label, time.perf_counter_ns() - start)
+
+    timed.__profiled__ = True
+    return timed
+
+
+def wrap_globals(namespace, names, prefix=""):
+    """Wrap functions in a module namespace in place.
+
+    ``names`` is an iterable of names or a predicate called with each name.
+    Calls made through the module's globals pick up the wrapper.
+    """
+    if callable(names):
+        names = [n for n, v in list(namespace.items()) if callable(v) and names(n)]
+    for n in names:
+        fn = namespace.get(n)
+        if callable(fn) and not isinstance(fn, type):
+            namespace[n] = wrap(fn, prefix + n)
+
+
+def _percentile(buckets, count, fraction):
+    target = count * fraction
+    seen = 0
+    for i, hits in enumerate(buckets):
+        seen += hits
+        if seen >= target:
+            # Upper edge of the bucket, in ms
+            return (1 << i) / 1000
+    return (1 << (len(buckets) - 1)) / 1000
+
+
+def report(top=20, sort="total"):
+    """Return the hottest timers, sorted by ``total``, ``mean``, ``max`` or ``count``."""
+    with _lock:
+        rows = [
+            {
+                "name": name,
+                "count": count,
+                "total_ms": round(total / 1e6, 3),
+                "mean_ms": round(total / count / 1e6, 3),
+                "max_ms": round(worst / 1e6, 3),
+                "p50_ms": _percentile(buckets, count, 0.5),
+                "p95_ms": _percentile(buckets, count, 0.95),
+            }
+            for name, (count, total, worst, buckets) in _stats.items()
+            if count
+        ]
+    key = {"total": "total_ms", "mean": "mean_ms", "max": "max_ms", "count": "count"}.get(sort, "total_ms")
+    rows.sort(key=lambda r: r[key], reverse=True)
+    return rows[:top]
+
+
+def _folded(frame):
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def dump_stacks():
+    """Return one folded stack per running thread, right now."""
+    me = threading.get_ident()
+    names = {t.ident: t.name for t in threading.enumerate()}
+    lines = []
+    for ident, frame in sys._current_frames().items():
+        if ident != me:
+            lines.append(f"{names.get(ident, ident)};{_folded(frame)} 1")
+    return "\n".join(lines) + "\n"
+
+
+def sample(duration=5.0, interval=0.01):
+    """Sample every thread's stack for ``duration`` seconds and return folded counts."""
+    me = threading.get_ident()
+    counts = {}
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = f"{names.get(ident, ident)};{_folded(frame)}"
+            counts[stack] = counts.get(stack, 0) + 1
+        time.sleep(interval)
+    return "".join(f"{stack} {n}\n" for stack, n in sorted(counts.items(), key=lambda kv: -kv[1]))
@@ -0,0 +1,266 @@
+"""Background Wi-Fi and Bluetooth scanning.
+
+``scan`` starts a scan on a worker thread and returns immediately. Networks
+and devices are added to an in-memory cache as soon as they are seen, and
+listeners are told after each change, so menus can fill in while a scan is
+still running. The cache keeps signal strength and when each result was last
+seen, so reopening a list shows recent results straight away.
+
+NetworkManager and BlueZ are queried over D-Bus when ``dbus-python`` is
+installed (it ships with Raspberry Pi OS as ``python3-dbus``). Otherwise
+``nmcli``/``iwlist`` and a streaming ``bluetoothctl scan`` are used.
+"""
+
+import re
+import subprocess
+import threading
+import time
+
+import journal
+
+try:
+    import dbus
+except ImportError:
+    dbus = None
+
+SCAN_SECONDS = 10
+# Results not seen for this long are dropped from lists
+CACHE_TTL = 300
+POLL_INTERVAL = 1.0
+
+NM = "org.freedesktop.NetworkManager"
+BLUEZ = "org.bluez"
+PROPS = "org.freedesktop.DBus.Properties"
+ANSI_PATTERN = re.compile(r"\x1b\[[0-9;]*[A-Za-z]|\x01|\x02")
+BT_NEW_PATTERN = re.compile(r"\[(?:NEW|CHG)\] Device ([0-9A-F:]{17}) (.+)")
+RSSI_PATTERN = re.compile(r"RSSI: (?:0x[0-9a-f]+ \()?(-?\d+)")
+
+_results = {"wifi": {}, "bt": {}}
+_scanning = {"wifi": False, "bt": False}
+_lock = threading.Lock()
+_listeners = []
+
+
+def add_listener(callback):
+    """Call ``callback(kind)`` whenever results for ``kind`` change or a scan ends."""
+    _listeners.append(callback)
+
+
+def _notify(kind):
+    for listener in list(_listeners):
+        try:
+            listener(kind)
+        except Exception as e:
+            print(f"Scan listener failed: {e}")
+
+
+def _seen(kind, key, name=None, strength=None):
+    """Add or refresh one result and notify listeners if anything visible changed."""
+    with _lock:
+        entry = _results[kind].get(key)
+        if entry is None:
+            entry = _results[kind][key] = {"id": key, "name": name or key, "strength": strength}
+            changed = True
+        else:
+            changed = (name and name != entry["name"]) or (strength is not None and strength != entry["strength"])
+            if name:
+                entry["name"] = name
+            if strength is not None:
+                entry["strength"] = strength
+        entry["seen"] = time.monotonic()
+    if changed:
+        _notify(kind)
+
+
+def results(kind, max_age=CACHE_TTL):
+    """Return cached results, strongest first.
+
+    Each entry has ``id`` (SSID or address), ``name``, ``strength`` (percent
+    for Wi-Fi, dBm for Bluetooth, or None) and ``age`` in seconds.
+    """
+    now = time.monotonic()
+    with _lock:
+        found = [dict(e, age=now - e["seen"]) for e in _results[kind].values() if now - e["seen"] <= max_age]
+    return sorted(found, key=lambda e: (e["strength"] is None, -(e["strength"] or 0), e["name"].lower()))
+
+
+def is_scanning(kind):
+    return _scanning[kind]
+
+
+def scan(kind, duration=SCAN_SECONDS):
+    """Start a background scan for ``kind`` ("wifi" or "bt") unless one is running."""
+    with _lock:
+        if _scanning[kind]:
+            return
+        _scanning[kind] = True
+    threading.Thread(target=_run_scan, args=(kind, duration), daemon=True).start()
+
+
+def _backends(kind):
+    cli = _scan_wifi_cli if kind == "wifi" else _scan_bt_cli
+    if dbus is None:
+        return [("cli", cli)]
+    # The service may not be on the bus; the command-line tools can still work
+    return [("dbus", _scan_wifi_dbus if kind == "wifi" else _scan_bt_dbus), ("cli", cli)]
+
+
+def _run_scan(kind, duration):
+    try:
+        for backend, run in _backends(kind):
+            try:
+                with journal.timed("radio_scan", radio=kind, backend=backend) as fields:
+                    run(duration)
+                    fields["found"] = len(results(kind))
+                break
+            except Exception as e:
+                print(f"{kind} scan via {backend} failed: {e}")
+    finally:
+        _scanning[kind] = False
+        _notify(kind)
+
+
+# --- Wi-Fi ---
+
+def _scan_wifi_dbus(duration):
+    bus = dbus.SystemBus()
+    nm = dbus.Interface(bus.get_object(NM, "/org/freedesktop/NetworkManager"), NM)
+    radios = []
+    for path in nm.GetDevices():
+        device = bus.get_object(NM, path)
+        # DeviceType 2 is NM_DEVICE_TYPE_WIFI
+        if device.Get(f"{NM}.Device", "DeviceType", dbus_interface=PROPS) == 2:
+            radios.append(dbus.Interface(device, f"{NM}.Device.Wireless"))
+    for radio in radios:
+        try:
+            radio.RequestScan({})
+        except dbus.DBusException:
+            # NetworkManager refuses scans shortly after the previous one
+            pass
+    deadline = time.monotonic() + duration
+    while True:
+        for radio in radios:
+            for ap_path in radio.GetAllAccessPoints():
+                props = bus.get_object(NM, ap_path).GetAll(f"{NM}.AccessPoint", dbus_interface=PROPS)
+                ssid = bytes(props.get("Ssid", b"")).decode("utf-8", "replace")
+                if ssid:
+                    _seen("wifi", ssid, strength=int(props.get("Strength", 0)))
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(POLL_INTERVAL)
+
+
+def _nmcli_fields(line):
+    """Split one line of ``nmcli -t`` output, which escapes ':' and '\\'."""
+    fields, current, escaped = [], "", False
+    for ch in line:
+        if escaped:
+            current += ch
+            escaped = False
+        elif ch == "\\":
+            escaped = True
+        elif ch == ":":
+            fields.append(current)
+            current = ""
+        else:
+            current += ch
+    fields.append(current)
+    return fields
+
+
+def _scan_wifi_cli(duration):
+    try:
+        rescan = subprocess.Popen(
+            ["nmcli", "device", "wifi", "rescan"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+    except FileNotFoundError:
+        _scan_wifi_iwlist()
+        return
+    deadline = time.monotonic() + duration
+    while True:
+        output = subprocess.run(
+            ["nmcli", "-t", "-f", "SSID,SIGNAL", "device", "wifi", "list", "--rescan", "no"],
+            capture_output=True, text=True,
+        ).stdout
+        for line in output.splitlines():
+            fields = _nmcli_fields(line)
+            if len(fields) == 2 and fields[0]:
+                _seen("wifi", fields[0], strength=int(fields[1]) if fields[1].isdigit() else None)
+        if time.monotonic() >= deadline:
+            break
+        time.sleep(POLL_INTERVAL)
+    if rescan.poll() is None:
+        rescan.terminate()
+
+
+def _scan_wifi_iwlist():
+    output = subprocess.check_output(["iwlist", "wlan0", "scan"], stderr=subprocess.DEVNULL).decode()
+    for cell in output.split("Cell ")[1:]:
+        ssid = re.search(r'ESSID:"([^"]+)"', cell)
+        quality = re.search(r"Quality=(\d+)/(\d+)", cell)
+        if ssid:
+            strength = int(100 * int(quality.group(1)) / int(quality.group(2))) if quality else None
+            _seen("wifi", ssid.group(1), strength=strength)
+
+
+# --- Bluetooth ---
+
+def _scan_bt_dbus(duration):
+    bus = dbus.SystemBus()
+    manager = dbus.Interface(bus.get_object(BLUEZ, "/"), "org.freedesktop.DBus.ObjectManager")
+    objects = manager.GetManagedObjects()
+    adapter_path = next((p for p, ifaces in objects.items() if f"{BLUEZ}.Adapter1" in ifaces), None)
+    if adapter_path is None:
+        raise RuntimeError("No Bluetooth adapter")
+    adapter = dbus.Interface(bus.get_object(BLUEZ, adapter_path), f"{BLUEZ}.Adapter1")
+    adapter.StartDiscovery()
+    try:
+        deadline = time.monotonic() + duration
+        while True:
+            for path, ifaces in manager.GetManagedObjects().items():
+                device = ifaces.get(f"{BLUEZ}.Device1")
+                if device is None or not path.startswith(adapter_path):
+                    continue
+                rssi = device.get("RSSI")
+                _seen(
+                    "bt",
+                    str(device["Address"]),
+                    name=str(device.get("Alias") or device.get("Name") or device["Address"]),
+                    strength=int(rssi) if rssi is not None else None,
+                )
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(POLL_INTERVAL)
+    finally:
+        try:
+            adapter.StopDiscovery()
+        except dbus.DBusException:
+            pass
+
+
+def _scan_bt_cli(duration):
+    proc = subprocess.Popen(
+        ["bluetoothctl", "--timeout", str(int(duration)), "scan", "on"],
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace",
+    )
+    try:
+        for line in proc.stdout:
+            line = ANSI_PATTERN.sub("", line).strip()
+            m = BT_NEW_PATTERN.search(line)
+            if not m:
+                continue
+            addr, rest = m.groups()
+            rssi = RSSI_PATTERN.search(rest)
+            if rssi:
+                _seen("bt", addr, strength=int(rssi.group(1)))
+            elif ": " not in rest:
+                # "[NEW] Device <addr> <name>" rather than a property change
+                _seen("bt", addr, name=rest)
+    finally:
+        proc.wait()
+    # Paired devices that are not advertising still belong in the list
+    output = subprocess.run(["bluetoothctl", "devices"], capture_output=True, text=True).stdout
+    for line in output.splitlines():
+        m = re.search(r"Device\s+([0-9A-F:]{17})\s+(.+)", ANSI_PATTERN.sub("", line).strip())
+        if m:
+            _seen("bt", m.group(1), name=m.group(2))
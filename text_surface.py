@@ -0,0 +1,67 @@
+"""Off-screen text surface for long scrolling views.
+
+Wrapped lines are rendered once into tall tiles of ``TILE_LINES`` lines each.
+A scroll step only crops the visible window out of at most two tiles, so it
+costs the same for a five line note as for a five hundred line log. Tiles are
+rendered on first use and only a few are kept, which bounds memory for very
+long documents.
+"""
+
+from PIL import Image, ImageDraw
+
+import font_atlas
+
+TILE_LINES = 32
+MAX_TILES = 3
+
+
+class TextSurface:
+    """A scrollable column of pre-wrapped lines drawn in a single font."""
+
+    def __init__(self, lines, font, line_h, width=128, fill=(255, 255, 255), background="black", x=5):
+        self.lines = list(lines)
+        self.font = font
+        self.line_h = line_h
+        self.width = width
+        self.fill = fill
+        self.background = background
+        self.x = x
+        self.height = len(self.lines) * line_h
+        self.tile_h = TILE_LINES * line_h
+        self._tiles = {}
+
+    def max_offset(self, view_h):
+        """Return the largest offset that still fills a window ``view_h`` tall."""
+        return max(0, self.height - view_h)
+
+    def _tile(self, index):
+        tile = self._tiles.get(index)
+        if tile is not None:
+            return tile
+        tile = Image.new("RGB", (self.width, self.tile_h), self.background)
+        draw = ImageDraw.Draw(tile)
+        first = index * TILE_LINES
+        # Redraw the line above so its descenders reach into this tile
+        start = max(0, first - 1)
+        y = (start - first) * self.line_h
+        for line in self.lines[start:first + TILE_LINES]:
+            font_atlas.text(draw, (self.x, y), line, font=self.font, fill=self.fill)
+            y += self.line_h
+        if len(self._tiles) >= MAX_TILES:
+            self._tiles.pop(next(iter(self._tiles)))
+        self._tiles[index] = tile
+        return tile
+
+    def paste_window(self, img, xy, offset, view_h):
+        """Paste the ``view_h`` pixel window starting at ``offset`` into ``img``."""
+        x, y = xy
+        img.paste(self.background, (x, y, x + self.width, y + view_h))
+        top = max(0, offset)
+        bottom = min(self.height, offset + view_h)
+        while top < bottom:
+            index = top // self.tile_h
+            tile_top = index * self.tile_h
+            part_bottom = min(bottom, tile_top + self.tile_h)
+            part = self._tile(index).crop((0, top - tile_top, self.width, part_bottom - tile_top))
+            img.paste(part, (x, y + top - offset))
+            top = part_bottom
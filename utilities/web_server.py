@@ -1,24 +1,29 @@
 """Simple Flask-based web server for Mini OS."""
 
 import os
-import re
+import sys
 import json
 import threading
+import time
 import importlib
 import subprocess
 import pexpect
-from flask import Flask, request, redirect, send_from_directory
+from html import escape
+from urllib.parse import quote
+from flask import Flask, request, redirect, send_from_directory, jsonify
 from flask_sock import Sock
 
 app = Flask(__name__)
 sock = Sock(app)
 
+# Project root, used to reach shared modules such as the trivia question bank
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 # Directory for notes relative to this file
 NOTES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "notes")
 os.makedirs(NOTES_DIR, exist_ok=True)
 
 NYT_API_KEY = None
-CHAT_LOG = []
 
 WEB_GAMES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "web_games")
 os.makedirs(WEB_GAMES_DIR, exist_ok=True)
@@ -70,16 +75,29 @@ def load_nyt_api_key():
 
 @app.route("/")
 def index():
+    import net_monitor
+
+    # A no-op when the device already runs the monitor in this process
+    net_monitor.start()
+    state = net_monitor.state()
+    if state["connected"]:
+        signal = f", {state['signal']}%" if state["signal"] is not None else ""
+        status = f"Wi-Fi: {escape(state['ssid'])} ({escape(state['ip'])}{signal})"
+    else:
+        status = "Wi-Fi: not connected"
     return (
         "<h1>Mini OS Web Interface</h1>"
+        f"<p>{status}</p>"
         "<ul>"
         "<li><a href='/settings'>Settings</a></li>"
         "<li><a href='/notes'>Notes</a></li>"
         "<li><a href='/chat'>Chat</a></li>"
         "<li><a href='/shell'>Shell</a></li>"
         "<li><a href='/weather'>Weather</a></li>"
+        "<li><a href='/metrics'>Metrics</a></li>"
         "<li><a href='/top-stories'>Top Stories</a></li>"
         "<li><a href='/mini-games'>Mini Games</a></li>"
+        "<li><a href='/trivia'>Trivia Quiz</a></li>"
         "</ul>"
     )
 
@@ -164,52 +182,444 @@ def toggle_wifi_route():
     return redirect("/settings")
 
 
+NOTES_PAGE_SIZE = 20
+
+
 @app.route("/notes", methods=["GET", "POST"])
 def notes():
+    """List one page of note metadata; bodies are fetched only when opened."""
+    import notes_store
+
     if request.method == "POST":
         text = request.form.get("text", "").strip()
         if text:
-            pattern = re.compile(r"note(\d+)\.txt")
-            existing = [
-                int(m.group(1))
-                for m in (pattern.match(f) for f in os.listdir(NOTES_DIR))
-                if m
-            ]
-            next_num = max(existing, default=0) + 1
-            with open(os.path.join(NOTES_DIR, f"note{next_num}.txt"), "w") as f:
-                f.write(text)
+            notes_store.create(text)
         return redirect("/notes")
 
-    notes_list = []
-    for fname in sorted(os.listdir(NOTES_DIR)):
-        if fname.lower().endswith(".txt"):
-            with open(os.path.join(NOTES_DIR, fname)) as f:
-                notes_list.append((fname, f.read()))
+    page = max(1, request.args.get("page", 1, type=int))
+    total = notes_store.count()
+    pages = max(1, (total + NOTES_PAGE_SIZE - 1) // NOTES_PAGE_SIZE)
+    page = min(page, pages)
+    entries = notes_store.list_notes(offset=(page - 1) * NOTES_PAGE_SIZE, limit=NOTES_PAGE_SIZE)
+
     html = ["<h1>Notes</h1>"]
+    html.append("<form action='/notes/search'><input name='q' placeholder='Search notes'>"
+                "<button type='submit'>Search</button></form>")
     html.append("<form method='post'><textarea name='text'></textarea><br>"
                 "<button type='submit'>Save</button></form>")
-    for name, content in notes_list:
-        html.append(f"<h3>{name}</h3><pre>{content}</pre>")
+    html.append(f"<p>{total} notes, page {page} of {pages}</p>")
+    for note in entries:
+        name = quote(note["name"])
+        html.append(
+            f"<details data-src='/notes/{name}/raw'><summary>{escape(note['name'])}"
+            f" - {escape(note['title'])} ({note['size']} bytes)</summary>"
+            f"<pre></pre><a href='/notes/{name}'>Open</a></details>"
+        )
+    nav = []
+    if page > 1:
+        nav.append(f"<a href='/notes?page={page - 1}'>Previous</a>")
+    if page < pages:
+        nav.append(f"<a href='/notes?page={page + 1}'>Next</a>")
+    html.append("<p>" + " | ".join(nav) + "</p>")
+    # Load a note's body the first time it is expanded, capped at 64 KB
+    html.append(
+        "<script>document.querySelectorAll('details[data-src]').forEach(function (d) {"
+        "d.addEventListener('toggle', function () {"
+        "var pre = d.querySelector('pre');"
+        "if (!d.open || pre.dataset.loaded) return;"
+        "pre.dataset.loaded = '1';"
+        "fetch(d.dataset.src, {headers: {Range: 'bytes=0-65535'}})"
+        ".then(function (r) { return r.text(); })"
+        ".then(function (t) { pre.textContent = t; });"
+        "});});</script>"
+    )
     html.append("<p><a href='/'>Back</a></p>")
     return "\n".join(html)
 
 
+@app.route("/notes/<name>")
+def note_view(name):
+    """Show one note; its body is streamed from the raw endpoint."""
+    import notes_store
+
+    try:
+        note = notes_store.get(name)
+    except ValueError:
+        note = None
+    if note is None:
+        return "Note not found", 404
+    html = [f"<h1>{escape(note['name'])}</h1>"]
+    html.append(f"<p>{note['size']} bytes - <a href='/notes/{quote(name)}/raw'>raw</a></p>")
+    html.append(f"<iframe src='/notes/{quote(name)}/raw' style='width:100%;height:70vh'></iframe>")
+    html.append("<p><a href='/notes'>Back</a></p>")
+    return "\n".join(html)
+
+
+@app.route("/notes/<name>/raw")
+def note_raw(name):
+    """Stream a note body from disk, honouring HTTP Range requests."""
+    import notes_store
+
+    try:
+        notes_store.path(name)
+    except ValueError:
+        return "Note not found", 404
+    return send_from_directory(
+        notes_store.NOTES_DIR, name, mimetype="text/plain", conditional=True, max_age=0
+    )
+
+
+@app.route("/notes/search")
+def notes_search():
+    """Full-text note search; add ``format=json`` for a machine-readable list."""
+    import notes_store
+
+    query = request.args.get("q", "").strip()
+    limit = request.args.get("limit", 50, type=int)
+    results = notes_store.search(query, limit=max(1, min(limit, 500))) if query else []
+    if request.args.get("format") == "json":
+        return jsonify({"query": query, "results": results})
+
+    html = ["<h1>Search Notes</h1>"]
+    html.append(f"<form><input name='q' value='{escape(query)}'>"
+                "<button type='submit'>Search</button></form>")
+    if query and not results:
+        html.append("<p>No matching notes.</p>")
+    html.append("<ul>")
+    for note in results:
+        html.append(
+            f"<li><a href='/notes/{quote(note['name'])}'>{escape(note['name'])}</a>"
+            f" - {escape(note['title'])}</li>"
+        )
+    html.append("</ul>")
+    html.append("<p><a href='/notes'>Back</a></p>")
+    return "\n".join(html)
+
+
+@app.route("/logs/console")
+def console_log_tail():
+    """Return the newest console log lines, including rotated segments."""
+    import log_sink
+
+    lines = max(1, min(request.args.get("lines", 200, type=int), 5000))
+    path = os.path.join(BASE_DIR, "logs", "console.log")
+    return app.response_class("\n".join(log_sink.tail(path, lines)) + "\n", mimetype="text/plain")
+
+
+@app.route("/events")
+def events():
+    """Query the diagnostics journal as JSON.
+
+    ``kind`` filters by event kind (comma-separated), ``since`` returns only
+    events after a sequence number and ``limit`` caps the result.
+    """
+    import journal
+
+    kind = request.args.get("kind") or None
+    since = request.args.get("since", type=int)
+    limit = max(1, min(request.args.get("limit", 200, type=int), 2000))
+    if journal.stats()["buffered"]:
+        found = journal.query(kind=kind, since=since, limit=limit)
+    else:
+        # Standalone web server: the device's events are only on disk
+        found = journal.load(kind=kind, since=since, limit=limit)
+    return jsonify({"events": found, "stats": journal.stats()})
+
+
+@app.route("/profile")
+def profile():
+    """Return the hottest profiled functions as JSON.
+
+    ``enabled=1``/``enabled=0`` switches timing on or off and ``reset=1``
+    clears collected timings before the report is built. ``sort`` is one of
+    ``total``, ``mean``, ``max`` or ``count``.
+    """
+    import profiler
+
+    if "enabled" in request.args:
+        profiler.set_enabled(request.args.get("enabled") not in ("0", "false", "off"))
+    if request.args.get("reset"):
+        profiler.reset()
+    top = max(1, min(request.args.get("top", 20, type=int), 200))
+    sort = request.args.get("sort", "total")
+    return jsonify({"enabled": profiler.enabled(), "hotspots": profiler.report(top=top, sort=sort)})
+
+
+@app.route("/profile/stacks")
+def profile_stacks():
+    """Return folded stacks of every thread for flamegraph tools.
+
+    Without ``seconds`` this is a single snapshot. With ``seconds`` the
+    request samples all threads for that long (at most 60 s).
+    """
+    import profiler
+
+    seconds = request.args.get("seconds", 0, type=float)
+    if seconds > 0:
+        folded = profiler.sample(min(seconds, 60.0))
+    else:
+        folded = profiler.dump_stacks()
+    return app.response_class(folded, mimetype="text/plain")
+
+
+# Time ranges offered on /metrics, in seconds
+METRIC_RANGES = {"1h": 3600, "1d": 86400, "7d": 7 * 86400, "90d": 90 * 86400}
+# Series -> (chart title, Prometheus name, scale to base units, help text)
+METRIC_INFO = {
+    "temp_c": ("Temperature (C)", "pico_cpu_temperature_celsius", 1, "SoC temperature."),
+    "cpu_pct": ("CPU (%)", "pico_cpu_utilization_percent", 1, "CPU utilization across all cores."),
+    "mem_pct": ("Memory (%)", "pico_memory_used_percent", 1, "Memory in use, excluding reclaimable cache."),
+    "freq_mhz": ("CPU clock (MHz)", "pico_cpu_frequency_hertz", 1e6, "Current clock of cpu0."),
+    "load1": ("Load (1 min)", "pico_load1", 1, "One-minute load average."),
+}
+
+
+def svg_chart(points, width=600, height=120):
+    """Render ``(time, mean, max)`` points as an SVG line chart."""
+    if len(points) < 2:
+        return f"<svg width='{width}' height='{height}'><text x='10' y='20' fill='#888'>No data</text></svg>"
+    t0, t1 = points[0][0], points[-1][0]
+    lo = min(p[1] for p in points)
+    hi = max(p[2] for p in points)
+    span_t = (t1 - t0) or 1
+    span_v = (hi - lo) or 1
+
+    def line(index):
+        return " ".join(
+            f"{(p[0] - t0) * width / span_t:.1f},{height - 2 - (p[index] - lo) * (height - 4) / span_v:.1f}"
+            for p in points
+        )
+
+    return (
+        f"<svg width='{width}' height='{height}' style='background:#222'>"
+        f"<polyline fill='none' stroke='#a52' points='{line(2)}'/>"
+        f"<polyline fill='none' stroke='#4c4' points='{line(1)}'/>"
+        f"<text x='4' y='12' fill='#888'>{hi:.1f}</text>"
+        f"<text x='4' y='{height - 4}' fill='#888'>{lo:.1f}</text>"
+        "</svg>"
+    )
+
+
+@app.route("/metrics")
+def metrics_page():
+    """Chart the stored metrics history; ``range`` is one of 1h, 1d, 7d or 90d."""
+    import metrics_store
+
+    span_name = request.args.get("range", "1d")
+    span = METRIC_RANGES.get(span_name, METRIC_RANGES["1d"])
+    store = metrics_store.get()
+    html = [
+        "<!doctype html><html><head><meta charset='utf-8'><title>Metrics</title>",
+        "<style>body{font-family:Arial, sans-serif;background:#111;color:#eee;padding:1em;}"
+        "a{color:#8cf;}</style></head><body>",
+        "<h1>Metrics</h1>",
+        "<p>" + " | ".join(f"<a href='/metrics?range={name}'>{name}</a>" for name in METRIC_RANGES) + "</p>",
+    ]
+    if store is None:
+        html.append("<p>No metrics recorded yet.</p>")
+    else:
+        step = store.archives[store.archive_for(span)][0]
+        html.append(f"<p>Average (green) and peak (orange) per {step} s over the last {escape(span_name)}.</p>")
+        now = time.time()
+        for name, (title, _, _, _) in METRIC_INFO.items():
+            html.append(f"<h2>{escape(title)}</h2>")
+            html.append(svg_chart(store.fetch(name, now - span, now)))
+        if store is not metrics_store._store:
+            store.close()
+    html.append("<p><a href='/metrics/prometheus'>Prometheus</a> | <a href='/'>Back</a></p>")
+    html.append("</body></html>")
+    return "\n".join(html)
+
+
+@app.route("/metrics/prometheus")
+def metrics_prometheus():
+    """Current metrics in the Prometheus text exposition format."""
+    import metrics
+    import metrics_store
+
+    values = metrics.latest()
+    if not values:
+        # Standalone web server: use the newest values the device recorded
+        store = metrics_store.get()
+        if store is not None:
+            values = store.latest()
+            store.close()
+    lines = []
+
+    def gauge(name, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{labels} {float(value)!r}")
+
+    for key, (_, name, scale, help_text) in METRIC_INFO.items():
+        if values.get(key) is not None:
+            gauge(name, help_text, [("", values[key] * scale)])
+    cores = metrics.cores()
+    if cores:
+        gauge("pico_cpu_core_utilization_percent", "CPU utilization per core.",
+              [(f'{{core="{i}"}}', pct) for i, pct in enumerate(cores)])
+    if values.get("mem_total_mb") is not None:
+        gauge("pico_memory_used_bytes", "Memory in use.", [("", values["mem_used_mb"] * 1024 ** 2)])
+        gauge("pico_memory_total_bytes", "Total memory.", [("", values["mem_total_mb"] * 1024 ** 2)])
+    if values.get("disk_total_gb") is not None:
+        gauge("pico_disk_used_bytes", "Used space on the root filesystem.", [("", values["disk_used_gb"] * 1024 ** 3)])
+        gauge("pico_disk_total_bytes", "Size of the root filesystem.", [("", values["disk_total_gb"] * 1024 ** 3)])
+    return app.response_class("\n".join(lines) + "\n", mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/chat", methods=["GET", "POST"])
 def chat():
+    """Channel history with live updates; the form still works without JavaScript."""
+    import chat_bus
+
     if request.method == "POST":
-        msg = request.form.get("msg", "").strip()
-        if msg:
-            CHAT_LOG.append(msg)
+        chat_bus.post(request.form.get("msg", ""))
         return redirect("/chat")
 
     html = ["<h1>Chat</h1>"]
-    html.append("<form method='post'><input name='msg'><button type='submit'>Send</button></form>")
-    for line in CHAT_LOG[-50:]:
-        html.append(f"<div>{line}</div>")
+    html.append("<form id='chat-form' method='post'><input name='msg' id='msg' autocomplete='off'>"
+                "<button type='submit'>Send</button></form>")
+    html.append("<div id='log'>")
+    for entry in chat_bus.history()[-50:]:
+        html.append(f"<div>{escape(chat_bus.format_entry(entry))}</div>")
+    html.append("</div>")
+    html.append(
+        """<script>
+        const log = document.getElementById('log');
+        const input = document.getElementById('msg');
+        const protocol = location.protocol === 'https:' ? 'wss://' : 'ws://';
+        const socket = new WebSocket(protocol + location.host + '/chat/ws');
+        const show = e => {
+            const div = document.createElement('div');
+            div.textContent = e.nick ? e.nick + '> ' + e.text : e.text;
+            log.appendChild(div);
+        };
+        socket.onmessage = m => {
+            const data = JSON.parse(m.data);
+            if (Array.isArray(data)) {
+                log.replaceChildren();
+                data.forEach(show);
+            } else {
+                show(data);
+            }
+            window.scrollTo(0, document.body.scrollHeight);
+        };
+        document.getElementById('chat-form').onsubmit = ev => {
+            if (socket.readyState !== WebSocket.OPEN) return;
+            ev.preventDefault();
+            if (input.value.trim()) socket.send(input.value);
+            input.value = '';
+        };
+        </script>"""
+    )
     html.append("<p><a href='/'>Back</a></p>")
     return "\n".join(html)
 
 
+@sock.route("/chat/ws")
+def chat_ws(ws):
+    """Send the recent history, then push each new message; text received is posted."""
+    import queue
+    import chat_bus
+
+    pending = queue.Queue()
+    chat_bus.subscribe(pending.put)
+    recent = chat_bus.history()[-50:]
+    ws.send(json.dumps(recent))
+    # Messages that arrived while subscribing may already be in ``recent``
+    sent = recent[-1]["seq"] if recent else 0
+
+    def push():
+        while True:
+            entry = pending.get()
+            if entry is None:
+                break
+            if entry["seq"] <= sent:
+                continue
+            try:
+                ws.send(json.dumps(entry))
+            except Exception:
+                break
+
+    t = threading.Thread(target=push, daemon=True)
+    t.start()
+    try:
+        while True:
+            msg = ws.receive()
+            if msg is None:
+                break
+            chat_bus.post(msg)
+    finally:
+        chat_bus.unsubscribe(pending.put)
+        pending.put(None)
+
+
+@app.route("/trivia", methods=["GET", "POST"])
+def trivia_quiz():
+    """Multiple choice quiz drawn from the shared question bank."""
+    from games import question_bank, study
+
+    user = request.values.get("user", "").strip() or study.DEFAULT_USER
+    if request.method == "POST":
+        ids = request.form.getlist("id")
+        questions = question_bank.get_many(ids)
+        score = 0
+        missed = []
+        for q in questions:
+            choice = request.form.get(f"q{q['id']}")
+            correct = choice is not None and choice.isdigit() and int(choice) == q["a"]
+            if correct:
+                score += 1
+            else:
+                missed.append(q)
+            try:
+                study.record_answer(q, study.quality_for(correct) if choice else 0, user=user)
+            except Exception as e:
+                # Still show the results if the study history cannot be written
+                print(f"Failed to record answer: {e}")
+        html = ["<h1>Quiz Results</h1>", f"<p>Score: {score}/{len(questions)}</p>"]
+        if missed:
+            html.append("<h2>Review</h2><ul>")
+            for q in missed:
+                html.append(f"<li>{escape(q['q'])}<br>Answer: <b>{escape(q['opts'][q['a']])}</b></li>")
+            html.append("</ul>")
+        html.append(
+            f"<p><a href='/trivia?user={quote(user)}'>New quiz</a> | <a href='/'>Back</a></p>"
+        )
+        return "\n".join(html)
+
+    topic = request.args.get("topic")
+    if not topic:
+        html = ["<h1>Trivia Quiz</h1>", "<ul>"]
+        for t in question_bank.topics():
+            st = study.stats(t, user=user)
+            html.append(
+                f"<li><a href='/trivia?topic={quote(t)}&user={quote(user)}'>{escape(t)}</a>"
+                f" ({st['due']} due, {st['seen']}/{st['total']} studied)</li>"
+            )
+        html.append("</ul>")
+        html.append(
+            f"<form method='get'>Studying as: <input name='user' value='{escape(user, quote=True)}'>"
+            "<button type='submit'>Switch</button></form>"
+        )
+        html.append("<p><a href='/'>Back</a></p>")
+        return "\n".join(html)
+
+    html = [f"<h1>{escape(topic)}</h1>", "<form method='post'>"]
+    html.append(f"<input type='hidden' name='user' value='{escape(user, quote=True)}'>")
+    for n, q in enumerate(study.pick_questions(topic, 15, user=user), 1):
+        html.append(f"<input type='hidden' name='id' value='{escape(str(q['id']), quote=True)}'>")
+        html.append(f"<p>{n}. {escape(q['q'])}</p>")
+        for idx, opt in enumerate(q["opts"]):
+            html.append(
+                f"<label><input type='radio' name='q{escape(str(q['id']), quote=True)}' value='{idx}'> {escape(opt)}</label><br>"
+            )
+    html.append("<button type='submit'>Submit</button></form>")
+    html.append("<p><a href='/trivia'>Back</a></p>")
+    return "\n".join(html)
+
+
 @app.route("/shell")
 def shell():
     """Serve interactive shell page."""
@@ -452,4 +862,6 @@ def run(host="0.0.0.0", port=8000):
 
 
 if __name__ == "__main__":
+    # Allow "python3 utilities/web_server.py" to import shared project modules
+    sys.path.insert(0, BASE_DIR)
     run()